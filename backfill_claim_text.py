@@ -0,0 +1,21 @@
+"""
+Script para calcular los tokens del detalle de reclamos existentes.
+Ejecutar (después de python migrate_db.py): python backfill_claim_text.py
+"""
+
+from modules.config import create_app
+from modules.claim import Claim
+
+
+def backfill():
+    """Completa detail_tokens de los reclamos que no los tienen"""
+    app = create_app()
+
+    with app.app_context():
+        print("\n=== Calculando tokens de reclamos ===\n")
+        updated = Claim.backfill_text_fields()
+        print(f"✅ Reclamos actualizados: {updated}\n")
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,73 @@
+"""
+Benchmark del costo por reclamo de Classifier.classify vs. Classifier.classify_batch.
+Ejecutar: python -m benchmarks.classifier_batch [--sizes 1 100 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import PROBLEMS, synthetic_detail
+from modules.classifier import Classifier
+
+
+def train_classifier(temp_dir: str, rng: random.Random) -> Classifier:
+    """Entrena un clasificador con textos sintéticos etiquetados por problema"""
+    classifier = Classifier()
+    classifier.model_path = os.path.join(temp_dir, "classifier.joblib")
+    classifier.vectorizer_path = os.path.join(temp_dir, "vectorizer.joblib")
+
+    texts, labels = [], []
+    for _ in range(2000):
+        text = synthetic_detail(rng)
+        texts.append(text)
+        labels.append(
+            next(f"problema_{i}" for i, p in enumerate(PROBLEMS) if p in text)
+        )
+    classifier.train(texts, labels)
+    return classifier
+
+
+def per_claim_us(func, texts: list[str], repetitions: int) -> float:
+    """Mejor tiempo de `repetitions` corridas, en microsegundos por reclamo"""
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func(texts)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        classifier = train_classifier(temp_dir, rng)
+
+        def one_by_one(texts):
+            for text in texts:
+                classifier.classify(text)
+                classifier.get_confidence(text)
+
+        print("\n=== Costo de clasificación por reclamo (µs) ===\n")
+        print(
+            f"{'lote':>6} | {'classify + get_confidence':>25} | {'classify_batch':>14}"
+        )
+        for size in args.sizes:
+            texts = [synthetic_detail(rng) for _ in range(size)]
+            single = per_claim_us(one_by_one, texts, args.repetitions)
+            batch = per_claim_us(classifier.classify_batch, texts, args.repetitions)
+            print(f"{size:>6} | {single:>25.1f} | {batch:>14.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
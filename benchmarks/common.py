@@ -0,0 +1,151 @@
+"""Utilidades compartidas por los benchmarks (app aislada y datos sintéticos)"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from modules.config import create_app, db
+from modules.utils.text import detail_tokens
+
+# Fragmentos para generar reclamos sintéticos con vocabulario variado
+SUBJECTS = [
+    "El aire acondicionado",
+    "La computadora",
+    "El proyector",
+    "La canilla del baño",
+    "La luz del pasillo",
+    "La puerta del laboratorio",
+    "El WiFi",
+    "La impresora",
+    "El techo",
+    "La ventana",
+    "El ascensor",
+    "La calefacción",
+    "El bebedero",
+    "La silla",
+    "El pizarrón",
+]
+PROBLEMS = [
+    "no funciona",
+    "está rota",
+    "hace mucho ruido",
+    "tiene filtraciones",
+    "no enciende",
+    "se apaga sola",
+    "pierde agua",
+    "está muy lenta",
+    "tiene grietas",
+    "no cierra correctamente",
+]
+PLACES = [
+    "del aula",
+    "del edificio",
+    "de la biblioteca",
+    "del laboratorio",
+    "del salón de actos",
+    "de la sala de profesores",
+]
+
+
+def synthetic_detail(rng: random.Random) -> str:
+    """Genera un texto de reclamo sintético"""
+    return (
+        f"{rng.choice(SUBJECTS)} {rng.choice(PLACES)} {rng.randint(100, 999)} "
+        f"{rng.choice(PROBLEMS)} desde hace {rng.randint(2, 30)} días"
+    )
+
+
+def create_benchmark_app():
+    """Crea una app con base de datos SQLite en memoria y el esquema creado"""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SIMILARITY_INDEX_PATH": None,
+            "NOTIFICATION_DISPATCH_INLINE": True,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed_claims(
+    count: int, department_count: int = 4, seed: int = 42
+) -> tuple[list[int], int]:
+    """
+    Inserta departamentos, un usuario y `count` reclamos pendientes.
+    Debe ejecutarse dentro de un app context.
+
+    Returns:
+        (department_ids, user_id)
+    """
+    from modules.claim import Claim, ClaimStatus
+    from modules.department import Department
+    from modules.end_user import Cloister, EndUser
+
+    rng = random.Random(seed)
+
+    departments = [
+        Department(
+            name=f"departamento_{i}",
+            display_name=f"Departamento {i}",
+            is_technical_secretariat=(i == 0),
+        )
+        for i in range(department_count)
+    ]
+    user = EndUser(
+        first_name="Bench",
+        last_name="User",
+        email="bench@example.com",
+        username="bench",
+        cloister=Cloister.STUDENT,
+    )
+    user.password_hash = "-"
+    db.session.add_all(departments + [user])
+    db.session.commit()
+
+    department_ids = [d.id for d in departments]
+    start = datetime.now() - timedelta(days=365)
+    rows = []
+    for i in range(count):
+        created_at = start + timedelta(seconds=i)
+        detail = synthetic_detail(rng)
+        rows.append(
+            {
+                "detail": detail,
+                "detail_tokens": detail_tokens(detail),
+                "status": ClaimStatus.PENDING,
+                "department_id": rng.choice(department_ids),
+                "creator_id": user.id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+    for start_row in range(0, len(rows), 10_000):
+        db.session.execute(
+            Claim.__table__.insert(), rows[start_row : start_row + 10_000]
+        )
+    db.session.commit()
+
+    return department_ids, user.id
+
+
+def measure(func, repetitions: int) -> list[float]:
+    """Ejecuta func `repetitions` veces y retorna las latencias en milisegundos"""
+    samples = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Percentil por interpolación lineal"""
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(pct) - 1]
@@ -0,0 +1,79 @@
+"""
+Benchmark del reporte PDF según la cantidad de reclamos: una sola pasada de
+pisa.CreatePDF sobre el HTML completo vs. PDFReport.generate() (partes de
+PDF_CHUNK_SIZE reclamos en un pool de procesos, unidas con pypdf).
+xhtml2pdf tarda más que linealmente con el largo de la tabla: la pasada única
+se omite por encima de --single-pass-limit reclamos.
+Ejecutar: python -m benchmarks.report_pdf [--sizes 1000 10000 50000] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from io import BytesIO
+
+from benchmarks.common import create_benchmark_app, seed_claims
+from modules.department_status_counter import DepartmentStatusCounter
+from modules.report_generator import HTMLReport, PDFReport
+
+
+def single_pass(department_ids: list[int]) -> bytes:
+    """Versión anterior: todo el HTML en una llamada a pisa.CreatePDF"""
+    from xhtml2pdf import pisa
+
+    html = HTMLReport(department_ids, is_technical_secretary=True).generate()
+    buffer = BytesIO()
+    pisa.CreatePDF(src=html, dest=buffer)
+    return buffer.getvalue()
+
+
+def timed(func) -> float:
+    """Segundos que tarda func()"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(size: int, workers: int, chunk_size: int, single_pass_limit: int) -> None:
+    app = create_benchmark_app()
+    app.config["PDF_RENDER_WORKERS"] = workers
+    app.config["PDF_CHUNK_SIZE"] = chunk_size
+    with app.app_context():
+        department_ids, _ = seed_claims(size)
+        # seed_claims inserta con Core: recalcular los contadores de estados
+        DepartmentStatusCounter.rebuild()
+
+        single = "omitido"
+        if size <= single_pass_limit:
+            single = f"{timed(lambda: single_pass(department_ids)):.1f}"
+        report = PDFReport(department_ids, is_technical_secretary=True)
+        chunked = timed(report.generate)
+
+    print(f"{size:>8} | {single:>12} | {chunked:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--single-pass-limit", type=int, default=10_000)
+    args = parser.parse_args()
+    # xhtml2pdf avisa por cada parte de las propiedades CSS que no soporta
+    logging.getLogger("xhtml2pdf").setLevel(logging.ERROR)
+
+    print(
+        f"\n=== Reporte PDF (s): pasada única vs. {args.workers} procesos, "
+        f"partes de {args.chunk_size} ===\n"
+    )
+    print("reclamos | pasada única | en partes")
+    for size in args.sizes:
+        run(size, args.workers, args.chunk_size, args.single_pass_limit)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark del reporte HTML según la cantidad de reclamos: HTMLReport.generate()
+(arma el documento entero con objetos Claim) vs. HTMLReport.stream() (filas
+del cursor de a lotes, escritas a medida que se generan).
+Mide el pico de memoria de Python (tracemalloc), el tiempo al primer bloque
+y el tiempo total.
+Ejecutar: python -m benchmarks.report_stream [--sizes 10000 100000 500000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import create_benchmark_app, seed_claims
+from modules.config import db
+from modules.department_status_counter import DepartmentStatusCounter
+from modules.report_generator import HTMLReport
+
+
+def profile(produce) -> tuple[float, float, float]:
+    """
+    Consume los bloques de produce() descartándolos, como un cliente.
+
+    Returns:
+        (pico de memoria en MB, primer bloque en ms, total en ms)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_chunk = None
+    for _ in produce():
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - start
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024**2, first_chunk * 1000, total * 1000
+
+
+def run(size: int) -> None:
+    app = create_benchmark_app()
+    with app.app_context():
+        department_ids, _ = seed_claims(size)
+        # seed_claims inserta con Core: recalcular los contadores de estados
+        DepartmentStatusCounter.rebuild()
+        report = HTMLReport(department_ids, is_technical_secretary=True)
+
+        full = profile(lambda: [report.generate()])
+        db.session.expunge_all()
+        streamed = profile(report.stream)
+
+    print(
+        f"{size:>8} | {full[0]:>9.1f} | {streamed[0]:>9.1f} | "
+        f"{full[1]:>10.0f} | {streamed[1]:>10.1f} | "
+        f"{full[2]:>9.0f} | {streamed[2]:>9.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000]
+    )
+    args = parser.parse_args()
+
+    print("\n=== Reporte HTML: generate() vs stream() ===\n")
+    print(
+        "reclamos | MB entero | MB stream | 1er bloque | 1er bloque | "
+        "ms entero | ms stream"
+    )
+    for size in args.sizes:
+        run(size)
+    print()
+
+
+if __name__ == "__main__":
+    main()
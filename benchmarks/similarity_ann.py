@@ -0,0 +1,78 @@
+"""
+Reporte de recall vs. latencia: búsqueda exacta vs. LSH por proyecciones aleatorias.
+Ejecutar: python -m benchmarks.similarity_ann [--sizes 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+
+from benchmarks.common import measure, percentile, synthetic_detail
+from modules.similarity import ExactBackend, RandomProjectionBackend, SimilarityIndex
+
+# (bands, bits) evaluados para el backend aproximado
+LSH_CONFIGS = [(8, 8), (16, 8), (32, 8), (16, 6), (32, 6)]
+
+
+def build_index(backend, rows) -> SimilarityIndex:
+    index = SimilarityIndex(backend)
+    index.build(rows)
+    return index
+
+
+def run(size: int, queries: int, threshold: float, limit: int) -> None:
+    rng = random.Random(42)
+    rows = [(i, i % 4, synthetic_detail(rng), 0.0) for i in range(size)]
+    texts = [synthetic_detail(rng) for _ in range(queries)]
+
+    exact = build_index(ExactBackend(), rows)
+    # Con empates de score, cualquier reclamo con score >= al k-ésimo exacto
+    # es una respuesta igual de buena
+    expected = []
+    for text in texts:
+        scores = [
+            score for _, score in exact.query(text, threshold=threshold, limit=limit)
+        ]
+        expected.append((len(scores), min(scores) if scores else None))
+
+    def latency(index):
+        it = iter(texts * 2)
+        return measure(
+            lambda: index.query(next(it), threshold=threshold, limit=limit), queries
+        )
+
+    def report(label, index, samples):
+        hits = total = 0
+        for text, (count, kth_score) in zip(texts, expected):
+            found = index.query(text, threshold=threshold, limit=limit)
+            hits += sum(1 for _, score in found if score >= kth_score - 1e-9)
+            total += count
+        recall = hits / total if total else 1.0
+        print(
+            f"{size:>8} | {label:<12} | {recall:>7.1%} | "
+            f"{percentile(samples, 50):>8.2f} | {percentile(samples, 99):>8.2f}"
+        )
+
+    report("exact", exact, latency(exact))
+    for bands, bits in LSH_CONFIGS:
+        index = build_index(RandomProjectionBackend(bands=bands, bits=bits), rows)
+        report(f"lsh {bands}x{bits}", index, latency(index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n=== Recall@limit vs. latencia de consulta (ms) ===\n")
+    print("    filas | backend      |  recall |      p50 |      p99")
+    for size in args.sizes:
+        run(size, args.queries, args.threshold, args.limit)
+
+
+if __name__ == "__main__":
+    main()
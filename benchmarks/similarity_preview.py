@@ -0,0 +1,89 @@
+"""
+Benchmark de latencia de /claims/preview: refit TF-IDF por consulta vs. índice persistente.
+Ejecutar: python -m benchmarks.similarity_preview [--sizes 1000 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from benchmarks.common import (
+    create_benchmark_app,
+    measure,
+    percentile,
+    seed_claims,
+    synthetic_detail,
+)
+from modules.claim import Claim
+from modules.config import db
+from modules.similarity import similarity_finder
+from modules.utils.constants import SPANISH_STOPWORDS
+from modules.utils.text import normalize_text
+
+
+def legacy_find_similar(text: str, threshold: float = 0.25, limit: int = 5):
+    """Implementación anterior: carga todos los pendientes y reajusta TF-IDF"""
+    vectorizer = TfidfVectorizer(
+        stop_words=SPANISH_STOPWORDS,
+        min_df=1,
+        ngram_range=(1, 2),
+        max_features=1000,
+        preprocessor=normalize_text,
+    )
+    claims = Claim.get_pending()
+    tfidf_matrix = vectorizer.fit_transform([text] + [c.detail for c in claims])
+    similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
+    similar = [
+        (claims[i], float(sim)) for i, sim in enumerate(similarities) if sim > threshold
+    ]
+    similar.sort(key=lambda x: x[1], reverse=True)
+    return similar[:limit]
+
+
+def run(size: int, queries: int, legacy_queries: int) -> None:
+    app = create_benchmark_app()
+    rng = random.Random(7)
+    with app.app_context():
+        seed_claims(size)
+        texts = [synthetic_detail(rng) for _ in range(max(queries, legacy_queries))]
+
+        def indexed():
+            similarity_finder.find_similar_claims(text=texts[rng.randrange(len(texts))])
+            db.session.expunge_all()
+
+        def legacy():
+            legacy_find_similar(texts[rng.randrange(len(texts))])
+            db.session.expunge_all()
+
+        # La primera consulta construye el índice (costo único)
+        build_ms = measure(indexed, 1)[0]
+        indexed_samples = measure(indexed, queries)
+        legacy_samples = measure(legacy, legacy_queries)
+
+    print(
+        f"{size:>10} | {percentile(legacy_samples, 50):>10.1f} | {percentile(legacy_samples, 99):>10.1f} | "
+        f"{percentile(indexed_samples, 50):>10.1f} | {percentile(indexed_samples, 99):>10.1f} | {build_ms:>10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--legacy-queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print("\n=== Latencia de búsqueda de similares (ms) ===\n")
+    print("pendientes | refit p50  | refit p99  | índice p50 | índice p99 | build")
+    for size in args.sizes:
+        run(size, args.queries, args.legacy_queries)
+
+
+if __name__ == "__main__":
+    main()
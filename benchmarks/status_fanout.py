@@ -0,0 +1,141 @@
+"""
+Benchmark de latencia de Claim.update_status según la cantidad de adherentes:
+un objeto UserNotification por adherente vs. INSERT ... SELECT en la petición
+vs. evento en notification_outbox (las notificaciones las crea el worker).
+Ejecutar: python -m benchmarks.status_fanout [--sizes 10 1000 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+
+from benchmarks.common import create_benchmark_app, measure, percentile, seed_claims
+from modules.admin_user import AdminRole, AdminUser
+from modules.claim import Claim, ClaimStatus
+from modules.claim_status_history import ClaimStatusHistory
+from modules.claim_supporter import ClaimSupporter
+from modules.config import db
+from modules.end_user import Cloister, EndUser
+from modules.user_notification import UserNotification
+
+# Estados que se alternan para que cada corrida sea un cambio real
+STATUSES = [ClaimStatus.IN_PROGRESS, ClaimStatus.PENDING]
+
+
+def seed_supporters(claim_id: int, count: int) -> None:
+    """Inserta `count` usuarios adheridos al reclamo"""
+    users = [
+        {
+            "first_name": "Adherente",
+            "last_name": str(i),
+            "email": f"adherente{i}@example.com",
+            "username": f"adherente{i}",
+            "password_hash": "-",
+            "user_type": "end_user",
+            "cloister": Cloister.STUDENT,
+            "unread_notifications_count": 0,
+        }
+        for i in range(count)
+    ]
+    for start in range(0, count, 10_000):
+        db.session.execute(EndUser.__table__.insert(), users[start : start + 10_000])
+    user_ids = db.session.scalars(
+        db.select(EndUser.id).where(EndUser.username.like("adherente%"))
+    ).all()
+    db.session.execute(
+        ClaimSupporter.__table__.insert(),
+        [{"claim_id": claim_id, "user_id": user_id} for user_id in user_ids],
+    )
+    db.session.commit()
+
+
+def legacy_update_status(
+    claim_id: int, new_status: ClaimStatus, admin_user_id: int
+) -> None:
+    """Versión anterior: carga los adherentes y agrega una notificación por objeto"""
+    claim = db.session.get(Claim, claim_id)
+    history_entry = ClaimStatusHistory(
+        claim_id=claim_id,
+        old_status=claim.status,
+        new_status=new_status,
+        changed_by_id=admin_user_id,
+    )
+    claim.status = new_status
+    db.session.add(history_entry)
+    db.session.flush()
+
+    db.session.add(
+        UserNotification(
+            user_id=claim.creator_id, claim_status_history_id=history_entry.id
+        )
+    )
+    supporters = db.session.query(ClaimSupporter).filter_by(claim_id=claim_id).all()
+    for supporter in supporters:
+        db.session.add(
+            UserNotification(
+                user_id=supporter.user_id, claim_status_history_id=history_entry.id
+            )
+        )
+    UserNotification.adjust_unread_counts(
+        Counter([claim.creator_id] + [supporter.user_id for supporter in supporters])
+    )
+    db.session.commit()
+
+
+def run(size: int, repetitions: int) -> None:
+    app = create_benchmark_app()
+    with app.app_context():
+        department_ids, _ = seed_claims(1)
+        claim_id = db.session.scalar(db.select(Claim.id))
+        admin, _ = AdminUser.create(
+            first_name="Bench",
+            last_name="Admin",
+            email="admin@example.com",
+            username="admin",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            password="admin123",
+            department_id=department_ids[0],
+        )
+        admin_id = admin.id
+        seed_supporters(claim_id, size)
+        turn = iter(range(10**9))
+
+        def set_based():
+            Claim.update_status(claim_id, STATUSES[next(turn) % 2], admin_id)
+            db.session.expunge_all()
+
+        def legacy():
+            legacy_update_status(claim_id, STATUSES[next(turn) % 2], admin_id)
+            db.session.expunge_all()
+
+        legacy_samples = measure(legacy, repetitions)
+        set_samples = measure(set_based, repetitions)
+
+        # Solo se encola: el worker (que acá no corre) crea las notificaciones
+        app.config["NOTIFICATION_DISPATCH_INLINE"] = False
+        app.config["NOTIFICATION_DISPATCH_WORKER"] = False
+        outbox_samples = measure(set_based, repetitions)
+
+    print(
+        f"{size:>10} | {percentile(legacy_samples, 50):>12.1f} | "
+        f"{percentile(set_samples, 50):>13.1f} | "
+        f"{percentile(outbox_samples, 50):>8.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 50_000])
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    print("\n=== Latencia de Claim.update_status (ms, p50) ===\n")
+    print("adherentes | por objeto   | INSERT/SELECT | outbox")
+    for size in args.sizes:
+        run(size, args.repetitions)
+    print()
+
+
+if __name__ == "__main__":
+    main()
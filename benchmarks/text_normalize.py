@@ -0,0 +1,100 @@
+"""
+Benchmark de normalize_text: versión original (NFD + unicodedata.category) vs.
+tabla de traducción, caché LRU y API por lotes. Verifica que la salida sea idéntica.
+Ejecutar: python -m benchmarks.text_normalize [--size 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from benchmarks.common import synthetic_detail
+from modules.utils.text import (
+    _normalize,
+    _normalize_exact,
+    normalize_text,
+    normalize_texts,
+)
+
+# Caracteres extra para ejercitar acentos, mayúsculas y el camino de respaldo
+EXTRA_CHARS = "ÁÉÍÓÚÜÑáéíóúüñÀÂÇÈÊËÎÏÔÙÛàâçèêëîïôùûİıŁłØøßÆæœﬁ№€°ªº¿¡ΩΣ東京Ⅻ́̃"
+
+
+def build_corpus(size: int, seed: int = 42) -> list[str]:
+    """Reclamos sintéticos con acentos; el 20% con caracteres poco comunes"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        text = synthetic_detail(rng)
+        if rng.random() < 0.5:
+            text = text.upper() if rng.random() < 0.2 else text.capitalize()
+        if rng.random() < 0.8:
+            corpus.append(text)
+            continue
+        extra = "".join(rng.choice(EXTRA_CHARS) for _ in range(rng.randint(1, 6)))
+        position = rng.randint(0, len(text))
+        corpus.append(text[:position] + extra + text[position:])
+    return corpus
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def _warm_and_time(texts: list[str]) -> float:
+    """Tiempo de normalize_text sobre textos que ya están en la caché"""
+    normalize_text.cache_clear()
+    for text in texts:
+        normalize_text(text)
+    return timed(lambda: [normalize_text(t) for t in texts])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+
+    expected = [_normalize_exact(text) for text in corpus]
+    mismatches = sum(
+        1 for text, exp in zip(corpus, expected) if _normalize(text) != exp
+    )
+    mismatches += sum(
+        1 for got, exp in zip(normalize_texts(corpus), expected) if got != exp
+    )
+    print(
+        f"\nCorpus: {len(corpus)} textos, diferencias con la versión original: {mismatches}"
+    )
+    if mismatches:
+        raise SystemExit(1)
+
+    normalize_text.cache_clear()
+    cold = timed(lambda: [normalize_text(t) for t in corpus])
+    # Textos repetidos: se mide un subconjunto que entra en la caché y se escala
+    warm = corpus[: min(5000, len(corpus))]
+    results = [
+        ("original", timed(lambda: [_normalize_exact(t) for t in corpus])),
+        ("tabla (sin caché)", timed(lambda: [_normalize(t) for t in corpus])),
+        ("normalize_text (caché fría)", cold),
+        (
+            "normalize_text (caché caliente)",
+            _warm_and_time(warm) * len(corpus) / len(warm),
+        ),
+        ("normalize_texts (lote)", timed(lambda: normalize_texts(corpus))),
+    ]
+
+    print("\n=== Normalización de texto (ms totales) ===\n")
+    for name, elapsed in results:
+        print(
+            f"{name:<32} | {elapsed:>9.1f} ms | {elapsed * 1000 / len(corpus):>6.2f} µs/texto"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Script para verificar que las consultas de Claim, UserNotification,
+NotificationOutbox, ReportJob, las exportaciones de datos y AdminHelper usen índices. Ejecuta cada consulta sobre una
+base en memoria con datos de ejemplo, obtiene su EXPLAIN QUERY PLAN y falla si
+alguna recorre una tabla completa.
+Ejecutar: python check_query_plans.py
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from collections.abc import Callable
+from contextlib import contextmanager
+from datetime import datetime as Datetime
+
+from sqlalchemy import event
+
+from modules.config import create_app, db
+
+# Importar todos los modelos para que SQLAlchemy los reconozca
+import modules  # noqa: F401
+from modules.admin_helper import AdminHelper
+from modules.admin_user import AdminRole, AdminUser
+from modules.claim import Claim, ClaimStatus
+from modules.department import Department
+from modules.end_user import Cloister, EndUser
+from modules.notification_outbox import NotificationOutbox
+from modules.report_generator import CSVReport
+from modules.report_job import ReportJob
+from modules.user_notification import UserNotification
+from modules.utils.pagination import encode_cursor
+
+# "SCAN claim" (recorre la tabla) o "SCAN claim USING INDEX ..." (recorre el
+# índice completo); "SEARCH" usa el índice para acotar las filas
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?( USING (?:COVERING )?INDEX)?")
+
+# Tablas chicas (catálogo y contadores por departamento y estado) que se leen
+# completas a propósito
+ALLOWED_FULL_SCANS = {"department", "department_status_counter"}
+
+# Consultas que leen toda la tabla por definición (listado sin filtros, conteos
+# globales): se acepta que recorran un índice, pero no la tabla
+WHOLE_TABLE_CASES = {
+    "Claim.get_all_with_filters",
+    "Claim.get_status_counts",
+    "Claim.get_dashboard_counts",
+}
+
+
+def seed_sample_data() -> dict[str, int]:
+    """
+    Crea departamentos, usuarios, reclamos, adherentes y notificaciones mínimos.
+
+    Returns:
+        dict con los IDs usados por los casos de consulta
+    """
+    technical = Department(
+        name="secretaria_tecnica",
+        display_name="Secretaría Técnica",
+        is_technical_secretariat=True,
+    )
+    department = Department(name="mantenimiento", display_name="Mantenimiento")
+    db.session.add_all([technical, department])
+    db.session.commit()
+
+    creator = EndUser(
+        first_name="Ana",
+        last_name="Pérez",
+        email="ana@example.com",
+        username="ana",
+        cloister=Cloister.STUDENT,
+    )
+    supporter = EndUser(
+        first_name="Luis",
+        last_name="Gómez",
+        email="luis@example.com",
+        username="luis",
+        cloister=Cloister.TEACHER,
+    )
+    creator.set_password("test123")
+    supporter.set_password("test123")
+    db.session.add_all([creator, supporter])
+    db.session.commit()
+
+    head, _ = AdminUser.create(
+        first_name="Jefe",
+        last_name="Mantenimiento",
+        email="jefe@example.com",
+        username="jefe",
+        admin_role=AdminRole.DEPARTMENT_HEAD,
+        password="admin123",
+        department_id=department.id,
+    )
+    secretary, _ = AdminUser.create(
+        first_name="Secretaría",
+        last_name="Técnica",
+        email="secretaria@example.com",
+        username="secretaria",
+        admin_role=AdminRole.TECHNICAL_SECRETARY,
+        password="admin123",
+        department_id=technical.id,
+    )
+
+    claim, _ = Claim.create(
+        user_id=creator.id,
+        detail="La canilla del baño pierde agua",
+        department_id=department.id,
+    )
+    Claim.add_supporter(claim.id, supporter.id)
+    Claim.update_status(claim.id, ClaimStatus.IN_PROGRESS, head.id)
+
+    return {
+        "department_id": department.id,
+        "creator_id": creator.id,
+        "supporter_id": supporter.id,
+        "head_id": head.id,
+        "secretary_id": secretary.id,
+        "claim_id": claim.id,
+    }
+
+
+def query_cases(ids: dict[str, int]) -> list[tuple[str, Callable[[], object]]]:
+    """Consultas a verificar: (nombre, función que las ejecuta)"""
+    department_ids = [ids["department_id"]]
+    head = db.session.get(AdminUser, ids["head_id"])
+    secretary = db.session.get(AdminUser, ids["secretary_id"])
+    # Cursor posterior a todos los reclamos: ejercita el filtro por keyset
+    cursor = encode_cursor(Datetime.now(), ids["claim_id"] + 1)
+
+    return [
+        ("Claim.get_pending", lambda: Claim.get_pending()),
+        (
+            "Claim.get_pending(departamento)",
+            lambda: Claim.get_pending(ids["department_id"]),
+        ),
+        ("Claim.get_all_with_filters", lambda: Claim.get_all_with_filters()),
+        (
+            "Claim.get_all_with_filters(departamento, estado)",
+            lambda: Claim.get_all_with_filters(
+                ids["department_id"], ClaimStatus.IN_PROGRESS
+            ),
+        ),
+        (
+            "Claim.get_all_with_filters(estado)",
+            lambda: Claim.get_all_with_filters(status_filter=ClaimStatus.PENDING),
+        ),
+        (
+            "Claim.get_all_with_filters_page(cursor)",
+            lambda: Claim.get_all_with_filters_page(cursor=cursor),
+        ),
+        ("Claim.get_status_counts", lambda: Claim.get_status_counts()),
+        (
+            "Claim.get_status_counts(departamentos)",
+            lambda: Claim.get_status_counts(department_ids),
+        ),
+        ("Claim.get_dashboard_counts", lambda: Claim.get_dashboard_counts()),
+        (
+            "Claim.get_department_dashboard_counts",
+            lambda: Claim.get_department_dashboard_counts(department_ids),
+        ),
+        ("Claim.get_by_user", lambda: Claim.get_by_user(ids["creator_id"])),
+        (
+            "Claim.get_by_user_page(cursor)",
+            lambda: Claim.get_by_user_page(ids["creator_id"], cursor),
+        ),
+        (
+            "Claim.get_supported_by_user",
+            lambda: Claim.get_supported_by_user(ids["supporter_id"]),
+        ),
+        (
+            "Claim.get_by_departments",
+            lambda: Claim.get_by_departments(department_ids),
+        ),
+        (
+            "Claim.iter_report_rows",
+            lambda: list(Claim.iter_report_rows(department_ids)),
+        ),
+        (
+            "Claim.get_by_departments_page(cursor)",
+            lambda: Claim.get_by_departments_page(department_ids, cursor),
+        ),
+        (
+            "Claim.is_user_supporter",
+            lambda: Claim.is_user_supporter(ids["claim_id"], ids["supporter_id"]),
+        ),
+        ("Claim.get_supporter_ids", lambda: Claim.get_supporter_ids(ids["claim_id"])),
+        (
+            "Claim.get_supporter_ids_by_claim",
+            lambda: Claim.get_supporter_ids_by_claim([ids["claim_id"]]),
+        ),
+        (
+            "Claim.update_status",
+            lambda: Claim.update_status(
+                ids["claim_id"], ClaimStatus.RESOLVED, ids["head_id"]
+            ),
+        ),
+        (
+            "UserNotification.get_pending_for_user",
+            lambda: UserNotification.get_pending_for_user(ids["supporter_id"]),
+        ),
+        (
+            "UserNotification.get_feed_for_user(cursor)",
+            lambda: UserNotification.get_feed_for_user(ids["supporter_id"], cursor),
+        ),
+        (
+            "UserNotification.get_unread_count",
+            lambda: UserNotification.get_unread_count(ids["supporter_id"]),
+        ),
+        (
+            "UserNotification.mark_all_as_read_for_user",
+            lambda: UserNotification.mark_all_as_read_for_user(ids["supporter_id"]),
+        ),
+        (
+            "UserNotification.mark_as_read_by_ids",
+            lambda: UserNotification.mark_as_read_by_ids(ids["supporter_id"], [1, 2]),
+        ),
+        (
+            "NotificationOutbox.dispatch_pending",
+            lambda: NotificationOutbox.dispatch_pending(),
+        ),
+        ("NotificationOutbox.get_lag", lambda: NotificationOutbox.get_lag()),
+        (
+            "ReportJob.get_active_by_key",
+            lambda: ReportJob.get_active_by_key(
+                ReportJob.make_dedup_key("pdf", department_ids, False)
+            ),
+        ),
+        (
+            "ReportJob.get_recent_for_admin",
+            lambda: ReportJob.get_recent_for_admin(head),
+        ),
+        *[
+            (
+                f"CSVReport({dataset}, since)",
+                lambda dataset=dataset: CSVReport(
+                    None, dataset=dataset, since=Datetime(2000, 1, 1)
+                ).generate(),
+            )
+            for dataset in ("claims", "status_history", "transfers", "supporters")
+        ],
+        (
+            "AdminHelper.get_claims_for_admin(jefe)",
+            lambda: AdminHelper.get_claims_for_admin(head),
+        ),
+        (
+            "AdminHelper.get_claims_for_admin(secretaría)",
+            lambda: AdminHelper.get_claims_for_admin(secretary),
+        ),
+        (
+            "AdminHelper.get_claims_for_admin_page(secretaría)",
+            lambda: AdminHelper.get_claims_for_admin_page(secretary, cursor=cursor),
+        ),
+        (
+            "AdminHelper.get_claim_for_admin",
+            lambda: AdminHelper.get_claim_for_admin(head, ids["claim_id"]),
+        ),
+    ]
+
+
+@contextmanager
+def _capture_statements():
+    """Registra las sentencias SELECT/UPDATE/DELETE ejecutadas en el bloque"""
+    statements: list[tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not many and statement.lstrip().upper().startswith(
+            ("SELECT", "UPDATE", "DELETE")
+        ):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(statement: str, parameters) -> list[str]:
+    """Retorna las líneas de EXPLAIN QUERY PLAN de una sentencia"""
+    rows = db.session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    )
+    return [row[-1] for row in rows]
+
+
+def find_full_scans(
+    cases: list[tuple[str, Callable[[], object]]],
+) -> dict[str, list[tuple[str, list[str]]]]:
+    """
+    Ejecuta cada caso y busca recorridos completos (de tabla o de índice) en
+    sus planes.
+
+    Returns:
+        dict {caso: [(sentencia, plan), ...]} solo con los casos que fallan
+    """
+    failures: dict[str, list[tuple[str, list[str]]]] = {}
+    for name, run in cases:
+        db.session.expire_all()
+        with _capture_statements() as statements:
+            run()
+
+        for statement, parameters in statements:
+            plan = explain(statement, parameters)
+            scanned = {
+                match.group(1)
+                for line in plan
+                if (match := _SCAN.match(line))
+                and match.group(1) not in ALLOWED_FULL_SCANS
+                and not (match.group(2) and name in WHOLE_TABLE_CASES)
+            }
+            if scanned:
+                failures.setdefault(name, []).append((statement, plan))
+    return failures
+
+
+def check() -> int:
+    """Verifica todos los planes; retorna la cantidad de casos que fallan"""
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "NOTIFICATION_DISPATCH_INLINE": True,
+        }
+    )
+
+    with app.app_context():
+        print("\n=== Verificando planes de consulta ===\n")
+        db.create_all()
+        cases = query_cases(seed_sample_data())
+        failures = find_full_scans(cases)
+
+        for name, _ in cases:
+            print(f"{'❌' if name in failures else '✅'} {name}")
+            for statement, plan in failures.get(name, []):
+                print(f"   {' '.join(statement.split())[:160]}")
+                for line in plan:
+                    print(f"      {line}")
+
+        print(f"\n{len(cases) - len(failures)}/{len(cases)} consultas usan índices\n")
+        return len(failures)
+
+
+if __name__ == "__main__":
+    sys.exit(1 if check() else 0)
@@ -0,0 +1,52 @@
+"""
+Script para procesar la cola de notificaciones (notification_outbox) en un
+proceso aparte del servidor. Usar con NOTIFICATION_DISPATCH_WORKER = False.
+Ejecutar: python dispatch_notifications.py [--once | --status]
+"""
+
+import sys
+import time
+
+from modules.config import create_app
+from modules.notification_dispatcher import NotificationDispatcher
+from modules.notification_outbox import NotificationOutbox
+
+
+def print_status():
+    """Muestra eventos pendientes, fallidos y el retraso de la cola"""
+    lag = NotificationOutbox.get_lag()
+    print(
+        f"Pendientes: {lag['pending']} | Fallidos: {lag['failed']} | "
+        f"Retraso: {lag['lag_seconds']:.1f} s"
+    )
+
+
+def run(once: bool = False):
+    """Procesa la cola; con once=True termina cuando no quedan eventos listos"""
+    app = create_app()
+    batch_size = app.config["NOTIFICATION_DISPATCH_BATCH_SIZE"]
+    max_attempts = app.config["NOTIFICATION_DISPATCH_MAX_ATTEMPTS"]
+    interval = app.config["NOTIFICATION_DISPATCH_INTERVAL"]
+
+    print("\n=== Procesando notificaciones ===\n")
+    while True:
+        with app.app_context():
+            processed = NotificationDispatcher.drain(batch_size, max_attempts)
+            if processed:
+                print(f"✅ Eventos procesados: {processed}")
+            if once:
+                print_status()
+                print()
+                return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        with create_app().app_context():
+            print_status()
+    else:
+        try:
+            run(once="--once" in sys.argv)
+        except KeyboardInterrupt:
+            pass
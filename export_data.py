@@ -0,0 +1,87 @@
+"""
+Script para exportar reclamos, historial de estados, derivaciones y adhesiones
+en CSV o Parquet (requiere pyarrow) para el equipo de datos.
+Con --state se guarda la marca de agua de cada conjunto de datos y la siguiente
+ejecución exporta solo lo creado o modificado desde entonces (con un margen: una
+fila puede repetirse entre exportaciones y se deduplica por id).
+Ejecutar: python export_data.py [--format csv|parquet] [--output DIR] [--state FILE]
+                                [--dataset claims status_history transfers supporters]
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from modules.config import create_app
+from modules.report_generator import EXPORT_DATASETS, create_report
+
+
+def load_state(path: str | None) -> dict[str, datetime]:
+    """Marcas de agua de la exportación anterior"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return {
+            dataset: datetime.fromisoformat(value)
+            for dataset, value in json.load(file).items()
+        }
+
+
+def save_state(path: str, state: dict[str, datetime]) -> None:
+    """Guarda las marcas de agua (a un temporal y renombrando)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {dataset: value.isoformat() for dataset, value in state.items()},
+            file,
+            indent=2,
+        )
+    os.replace(temp_path, path)
+
+
+def export(
+    report_format: str, datasets: list[str], output_dir: str, state_path: str | None
+) -> None:
+    """Exporta cada conjunto de datos a un archivo en output_dir"""
+    state = load_state(state_path)
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    print(f"\n=== Exportando datos ({report_format}) ===\n")
+    for dataset in datasets:
+        report = create_report(
+            report_format, None, True, dataset=dataset, since=state.get(dataset)
+        )
+        path = os.path.join(output_dir, f"{dataset}_{timestamp}.{report_format}")
+        if report_format == "parquet":
+            if not report.write(path):
+                print("❌ Parquet requiere pyarrow: pip install pyarrow")
+                return
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.writelines(report.stream())
+
+        print(f"✅ {dataset}: {report.exported_rows} registros -> {path}")
+        if report.watermark is not None:
+            state[dataset] = report.watermark
+        if state_path:
+            save_state(state_path, state)
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument(
+        "--dataset",
+        nargs="+",
+        choices=list(EXPORT_DATASETS),
+        default=list(EXPORT_DATASETS),
+    )
+    parser.add_argument("--output", default="exports")
+    parser.add_argument("--state", help="Archivo JSON con las marcas de agua")
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        export(args.format, args.dataset, args.output, args.state)
@@ -0,0 +1,98 @@
+"""
+Script para actualizar el esquema de una base de datos existente.
+Crea las tablas nuevas y agrega las columnas e índices que falten en las existentes.
+Ejecutar: python migrate_db.py
+"""
+
+from sqlalchemy import inspect, text
+
+from modules.config import create_app, db
+
+# Importar todos los modelos para que SQLAlchemy los reconozca
+import modules  # noqa: F401
+from modules.user_notification import UserNotification
+
+
+def add_missing_columns() -> list[str]:
+    """
+    Agrega a cada tabla las columnas del modelo que todavía no existen.
+    Solo se agregan columnas que admiten NULL o tienen valor por defecto.
+
+    Returns:
+        Lista de columnas agregadas ("tabla.columna")
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+
+    for table in db.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                print(
+                    f"⚠️  {table.name}.{column.name} es NOT NULL sin valor por "
+                    "defecto: debe migrarse a mano"
+                )
+                continue
+
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(
+                text(
+                    f"ALTER TABLE {preparer.quote(table.name)} "
+                    f"ADD COLUMN {preparer.quote(column.name)} {column_type}"
+                )
+            )
+            added.append(f"{table.name}.{column.name}")
+
+    db.session.commit()
+    return added
+
+
+def add_missing_indexes() -> list[str]:
+    """
+    Crea los índices declarados en los modelos que todavía no existen.
+
+    Returns:
+        Lista de índices creados
+    """
+    inspector = inspect(db.engine)
+    created = []
+
+    for table in db.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing:
+                continue
+            index.create(db.engine)
+            created.append(index.name)
+
+    return created
+
+
+def migrate():
+    """Crea tablas nuevas y agrega columnas e índices faltantes"""
+    app = create_app()
+
+    with app.app_context():
+        print("\n=== Migrando base de datos ===\n")
+        db.create_all()
+
+        added = add_missing_columns()
+        for column in added:
+            print(f"✅ Columna agregada: {column}")
+        if "user.unread_notifications_count" in added:
+            users = UserNotification.rebuild_unread_counts()
+            print(f"✅ Contador de notificaciones calculado para {users} usuarios")
+
+        created = add_missing_indexes()
+        for index in created:
+            print(f"✅ Índice creado: {index}")
+        if not added and not created:
+            print("La base de datos ya está actualizada.")
+        print()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -11,6 +11,11 @@ from modules.claim_supporter import ClaimSupporter  # noqa: F401
 from modules.claim_status_history import ClaimStatusHistory  # noqa: F401
 from modules.claim_transfer import ClaimTransfer  # noqa: F401
 from modules.user_notification import UserNotification  # noqa: F401
+from modules.notification_outbox import NotificationOutbox  # noqa: F401
+from modules.report_job import ReportJob, ReportJobStatus  # noqa: F401
+from modules.department_keyword import DepartmentKeyword  # noqa: F401
+from modules.department_status_counter import DepartmentStatusCounter  # noqa: F401
+from modules.data_version import DataVersion  # noqa: F401
 
 # Infrastructure modules
 from modules.classifier import classifier, Classifier
@@ -19,7 +24,14 @@ from modules.image_handler import ImageHandler
 
 # Generator modules
 from modules.analytics_generator import AnalyticsGenerator
-from modules.report_generator import create_report, Report, HTMLReport, PDFReport
+from modules.report_generator import (
+    create_report,
+    Report,
+    HTMLReport,
+    PDFReport,
+    CSVReport,
+    ParquetReport,
+)
 
 # Helper modules
 from modules.admin_helper import AdminHelper
@@ -43,6 +43,29 @@ class AdminHelper:
             .all()
         )
 
+    @staticmethod
+    def get_claims_for_admin_page(
+        admin_user: AdminUser,
+        department_id: int | None = None,
+        cursor: str | None = None,
+        page_size: int | None = None,
+    ) -> tuple[list[Claim], str | None]:
+        """Página de reclamos visibles para un admin (mismas reglas que get_claims_for_admin).
+
+        Returns:
+            tuple[list[Claim], str | None]: (reclamos, cursor de la página siguiente)
+        """
+        visible_department_ids = [d.id for d in Department.get_for_admin(admin_user)]
+
+        if department_id is not None:
+            if department_id not in visible_department_ids:
+                return [], None
+            department_ids = [department_id]
+        else:
+            department_ids = visible_department_ids
+
+        return Claim.get_by_departments_page(department_ids, cursor, page_size)
+
     @staticmethod
     def get_claim_for_admin(admin_user: AdminUser, claim_id: int) -> Claim | None:
         claim = db.session.query(Claim).filter_by(id=claim_id).first()
@@ -3,31 +3,19 @@
 from __future__ import annotations
 
 import base64
-import io
-import re
-from collections import Counter
-
-import matplotlib
-
-matplotlib.use("Agg")  # Backend sin GUI - DEBE estar antes de importar pyplot
-import matplotlib.pyplot as plt
 
 from modules.config import db
+from modules.chart_cache import NO_IMAGE, chart_cache
 from modules.claim import Claim, ClaimStatus
-from modules.utils.constants import SPANISH_STOPWORDS_SET
-from modules.utils.text import normalize_text
+from modules.department_keyword import DepartmentKeyword
+from rendering import charts
 
 
 class AnalyticsGenerator:
     """Generador de métricas y visualizaciones de reclamos."""
 
     # Colores por estado para el gráfico circular
-    STATUS_COLORS = {
-        "Pendiente": "#ffc107",
-        "En proceso": "#17a2b8",
-        "Resuelto": "#28a745",
-        "Inválido": "#dc3545",
-    }
+    STATUS_COLORS = charts.STATUS_COLORS
 
     # Mapeo de ClaimStatus a nombres legibles
     STATUS_LABELS = {
@@ -98,36 +86,8 @@ class AnalyticsGenerator:
         Returns:
             dict con palabras y sus frecuencias, ordenado por frecuencia descendente
         """
-        query = db.session.query(Claim.detail)
-
-        if department_ids is not None:
-            if len(department_ids) == 0:
-                return {}
-            query = query.filter(Claim.department_id.in_(department_ids))
-
-        details = [row[0] for row in query.all()]
-
-        if not details:
-            return {}
-
-        # Extraer y filtrar palabras (normalizando texto para match con stopwords)
-        all_words: list[str] = []
-        for detail in details:
-            normalized = normalize_text(detail)
-            words = re.findall(r"\b\w+\b", normalized)
-            filtered = [
-                w
-                for w in words
-                if w not in SPANISH_STOPWORDS_SET and len(w) > 2 and not w.isdigit()
-            ]
-            all_words.extend(filtered)
-
-        if not all_words:
-            return {}
-
-        # Obtener las top_n palabras más comunes
-        word_counts = Counter(all_words).most_common(top_n)
-        return dict(word_counts)
+        # Tabla mantenida al crear/derivar reclamos: no se recorren los detalles
+        return DepartmentKeyword.get_top(department_ids, top_n)
 
     @staticmethod
     def generate_pie_chart(status_counts: dict[str, int]) -> str | None:
@@ -141,49 +101,18 @@ class AnalyticsGenerator:
         Returns:
             String base64 de la imagen PNG o None si no hay datos
         """
-        if not status_counts:
-            return None
-
-        # Filtrar estados con valor > 0
-        filtered_stats = {k: v for k, v in status_counts.items() if v > 0}
-
-        if not filtered_stats:
-            return None
-
-        fig, ax = plt.subplots(figsize=(8, 6))
-        colors = [
-            AnalyticsGenerator.STATUS_COLORS.get(k, "#6c757d")
-            for k in filtered_stats.keys()
-        ]
+        _, png = AnalyticsGenerator.get_chart("pie", status_counts)
+        return AnalyticsGenerator._to_base64(png)
 
-        wedges, texts, autotexts = ax.pie(  # type: ignore
-            filtered_stats.values(),  # type: ignore
-            labels=filtered_stats.keys(),  # type: ignore
-            colors=colors,
-            autopct="%1.1f%%",
-            startangle=90,
-            textprops={"fontsize": 11},
-        )
-
-        # Estilizar los porcentajes
-        for autotext in autotexts:
-            autotext.set_color("white")
-            autotext.set_fontweight("bold")
-
-        ax.set_title(
-            "Distribución de Reclamos por Estado", fontsize=14, fontweight="bold"
-        )
-        plt.tight_layout()
-
-        # Convertir a base64
-        buffer = io.BytesIO()
-        plt.savefig(
-            buffer, format="png", dpi=100, bbox_inches="tight", facecolor="white"
-        )
-        plt.close(fig)  # Liberar memoria
-        buffer.seek(0)
+    @staticmethod
+    def render_pie_chart(status_counts: dict[str, int]) -> bytes | None:
+        """
+        Dibuja el gráfico circular (sin caché).
 
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        Returns:
+            Imagen PNG o None si no hay datos
+        """
+        return charts.render_pie_chart(status_counts)
 
     @staticmethod
     def generate_wordcloud(word_frequencies: dict[str, int]) -> str | None:
@@ -197,58 +126,128 @@ class AnalyticsGenerator:
         Returns:
             String base64 de la imagen PNG o None si no hay datos/wordcloud no disponible
         """
-        if not word_frequencies:
-            return None
+        _, png = AnalyticsGenerator.get_chart("wordcloud", word_frequencies)
+        return AnalyticsGenerator._to_base64(png)
 
-        try:
-            from wordcloud import WordCloud
-        except ImportError:
-            # Si wordcloud no está instalado, retornar None
-            return None
+    @staticmethod
+    def render_wordcloud(word_frequencies: dict[str, int]) -> bytes | None:
+        """
+        Dibuja la nube de palabras (sin caché).
 
-        wc = WordCloud(
-            width=800,
-            height=400,
-            background_color="white",
-            colormap="viridis",
-            max_words=50,
-            min_font_size=10,
-            prefer_horizontal=0.7,
-        ).generate_from_frequencies(word_frequencies)
+        Returns:
+            Imagen PNG o None si no hay datos/wordcloud no disponible
+        """
+        return charts.render_wordcloud(word_frequencies)
+
+    # ── Caché de gráficos ────────────────────────────────────────────
 
-        buffer = io.BytesIO()
-        wc.to_image().save(buffer, format="PNG")
-        buffer.seek(0)
+    @staticmethod
+    def _to_base64(png: bytes | None) -> str | None:
+        return base64.b64encode(png).decode("utf-8") if png is not None else None
 
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    @staticmethod
+    def render_chart(kind: str, data: dict) -> bytes | None:
+        """Dibuja un gráfico por tipo ('pie' o 'wordcloud')"""
+        if kind == "pie":
+            return AnalyticsGenerator.render_pie_chart(data)
+        if kind == "wordcloud":
+            return AnalyticsGenerator.render_wordcloud(data)
+        raise ValueError(f"Tipo de gráfico desconocido: {kind}")
 
     @staticmethod
-    def get_full_analytics(department_ids: list[int] | None = None) -> dict:
+    def get_chart(
+        kind: str, data: dict, department_ids: list[int] | None = None
+    ) -> tuple[str | None, bytes | None]:
+        """
+        Obtiene un gráfico desde la caché o lo dibuja y lo guarda.
+
+        Args:
+            kind: Tipo de gráfico ('pie' o 'wordcloud')
+            data: status_counts o word_frequencies
+            department_ids: Departamentos de los datos (None = todos)
+
+        Returns:
+            tuple[str | None, bytes | None]: (clave, PNG) o (None, None) si no hay gráfico
+        """
+        key = chart_cache.make_key(kind, data, department_ids)
+        png = chart_cache.get(key)
+        if png is None:
+            png = AnalyticsGenerator.render_chart(kind, data) or NO_IMAGE
+            chart_cache.put(key, png)
+        if png == NO_IMAGE:
+            return None, None
+        return key, png
+
+    @staticmethod
+    def get_chart_data(kind: str, department_ids: list[int] | None) -> dict:
+        """
+        Datos de entrada actuales de un gráfico.
+
+        Raises:
+            ValueError: Si el tipo de gráfico no existe
+        """
+        if kind == "pie":
+            stats = AnalyticsGenerator.get_claim_stats(department_ids)
+            return stats.get("status_counts", {})
+        if kind == "wordcloud":
+            return AnalyticsGenerator.get_keyword_frequencies(department_ids)
+        raise ValueError(f"Tipo de gráfico desconocido: {kind}")
+
+    @staticmethod
+    def get_full_analytics(
+        department_ids: list[int] | None = None, inline_charts: bool = True
+    ) -> dict:
         """
         Obtiene todas las analíticas en una sola llamada.
 
         Args:
             department_ids: Lista de IDs de departamentos a considerar.
                            None = todos los departamentos
+            inline_charts: Si es False, no se incluyen las imágenes en base64:
+                           se encolan en el pool de dibujo y la página las
+                           pide por URL usando las claves
 
         Returns:
             dict con:
             - stats: estadísticas de reclamos
             - pie_chart: gráfico circular en base64
             - wordcloud: nube de palabras en base64
+            - pie_chart_key / wordcloud_key: claves de los gráficos en la caché
             - keywords: dict de palabras frecuentes
         """
         stats = AnalyticsGenerator.get_claim_stats(department_ids)
         keywords = AnalyticsGenerator.get_keyword_frequencies(department_ids)
+        status_counts = stats.get("status_counts", {})
 
-        pie_chart = AnalyticsGenerator.generate_pie_chart(
-            stats.get("status_counts", {})
+        if not inline_charts:
+            # Se encolan en el pool de dibujo; la página pide las imágenes después
+            from modules.chart_renderer import chart_renderer
+
+            return {
+                "stats": stats,
+                "pie_chart": None,
+                "wordcloud": None,
+                "pie_chart_key": chart_renderer.submit(
+                    "pie", status_counts, department_ids
+                ),
+                "wordcloud_key": chart_renderer.submit(
+                    "wordcloud", keywords, department_ids
+                ),
+                "keywords": keywords,
+            }
+
+        pie_chart_key, pie_chart = AnalyticsGenerator.get_chart(
+            "pie", status_counts, department_ids
+        )
+        wordcloud_key, wordcloud = AnalyticsGenerator.get_chart(
+            "wordcloud", keywords, department_ids
         )
-        wordcloud = AnalyticsGenerator.generate_wordcloud(keywords)
 
         return {
             "stats": stats,
-            "pie_chart": pie_chart,
-            "wordcloud": wordcloud,
+            "pie_chart": AnalyticsGenerator._to_base64(pie_chart),
+            "wordcloud": AnalyticsGenerator._to_base64(wordcloud),
+            "pie_chart_key": pie_chart_key,
+            "wordcloud_key": wordcloud_key,
             "keywords": keywords,
         }
@@ -0,0 +1,126 @@
+"""
+Caché en memoria de gráficos PNG indexada por la huella de sus datos y de los
+departamentos a los que corresponden.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Valor guardado cuando el gráfico no tiene imagen (sin datos o wordcloud no instalado)
+NO_IMAGE = b""
+
+
+class ChartCache:
+    """
+    Caché LRU acotada en cantidad de imágenes y en bytes. Una entrada puede
+    tener vencimiento (por ejemplo, un dibujo fallido que se reintenta luego).
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._expires_at: dict[str, float] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_scope(department_ids: list[int] | None) -> str:
+        """
+        Prefijo de las claves de un conjunto de departamentos.
+
+        Args:
+            department_ids: Departamentos del administrador (None = todos)
+
+        Returns:
+            "all" o los primeros 16 caracteres del SHA-256 de los IDs ordenados
+        """
+        if department_ids is None:
+            return "all"
+        payload = json.dumps(sorted(department_ids))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(kind: str, data: dict, department_ids: list[int] | None = None) -> str:
+        """
+        Huella de un gráfico: mismo tipo, mismos datos y mismos departamentos
+        producen la misma clave.
+
+        Args:
+            kind: Tipo de gráfico ('pie', 'wordcloud')
+            data: Datos de entrada del gráfico
+            department_ids: Departamentos de los datos (None = todos)
+
+        Returns:
+            "<alcance>-<SHA-256 en hexadecimal>": el alcance permite comprobar
+            que la clave corresponde a los departamentos de quien la pide
+        """
+        payload = json.dumps([kind, data], sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{ChartCache.make_scope(department_ids)}-{digest}"
+
+    def _discard_expired(self, key: str) -> None:
+        """Quita la entrada si venció (con el lock tomado)"""
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._expires_at[key]
+            self._size -= len(self._entries.pop(key))
+
+    def get(self, key: str) -> bytes | None:
+        """Retorna la imagen guardada (y la marca como usada) o None"""
+        with self._lock:
+            self._discard_expired(key)
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+            return png
+
+    def put(self, key: str, png: bytes, ttl: float | None = None) -> None:
+        """
+        Guarda una imagen, descartando las menos usadas si se supera el límite.
+
+        Args:
+            key: Huella del gráfico
+            png: Imagen (o NO_IMAGE)
+            ttl: Segundos hasta que la entrada vence (None: no vence)
+        """
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = png
+            self._size += len(png)
+            if ttl is None:
+                self._expires_at.pop(key, None)
+            else:
+                self._expires_at[key] = time.monotonic() + ttl
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._expires_at.pop(evicted_key, None)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expires_at.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._discard_expired(key)
+            return key in self._entries
+
+
+# Instancia global de la caché de gráficos
+chart_cache = ChartCache()
@@ -0,0 +1,142 @@
+"""
+Dibujo de gráficos de analíticas en un pool de procesos.
+
+matplotlib y WordCloud consumen CPU y retienen el GIL: se dibujan fuera del
+hilo de la petición y el resultado queda en la caché de gráficos. El pool usa
+procesos "spawn": se crea desde los hilos del servidor, donde un fork podría
+heredar locks tomados por otros hilos. Los procesos ejecutan
+rendering.charts.render_chart, que no importa la app.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+from modules.chart_cache import NO_IMAGE, ChartCache, chart_cache
+from rendering.charts import render_chart
+
+
+class ChartRenderer:
+    """Encola dibujos de gráficos y comparte los que ya están en curso"""
+
+    READY = "ready"
+    PENDING = "pending"
+    MISSING = "missing"
+    # Segundos que se recuerda un dibujo fallido antes de volver a intentarlo
+    FAILURE_TTL = 30.0
+
+    def __init__(self, cache: ChartCache):
+        self.cache = cache
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def submit(
+        self, kind: str, data: dict, department_ids: list[int] | None = None
+    ) -> str | None:
+        """
+        Encola el dibujo de un gráfico si no está en caché ni en curso.
+
+        Con ANALYTICS_RENDER_WORKERS = 0 se dibuja en el hilo actual.
+
+        Args:
+            kind: Tipo de gráfico ('pie' o 'wordcloud')
+            data: status_counts o word_frequencies
+            department_ids: Departamentos de los datos (None = todos)
+
+        Returns:
+            Clave del gráfico o None si no hay datos para dibujar
+        """
+        if not data:
+            return None
+
+        key = self.cache.make_key(kind, data, department_ids)
+        max_workers = current_app.config.get(
+            "ANALYTICS_RENDER_WORKERS", min(4, os.cpu_count() or 1)
+        )
+
+        with self._lock:
+            if key in self.cache or key in self._in_flight:
+                return key
+
+            if max_workers <= 0:
+                future: Future = Future()
+                try:
+                    future.set_result(render_chart(kind, data))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                try:
+                    future = self._get_executor(max_workers).submit(
+                        render_chart, kind, data
+                    )
+                except BrokenProcessPool:
+                    # Un worker murió: se descarta el pool y se crea otro
+                    self._executor = None
+                    future = self._get_executor(max_workers).submit(
+                        render_chart, kind, data
+                    )
+            self._in_flight[key] = future
+
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return key
+
+    def _finish(self, key: str, future: Future) -> None:
+        """Guarda el resultado en la caché y libera la clave"""
+        with self._lock:
+            if future.exception() is None:
+                self.cache.put(key, future.result() or NO_IMAGE)
+            else:
+                # Sin imagen por un rato: los pedidos siguientes no reencolan
+                # el mismo dibujo fallido en cada consulta
+                self.cache.put(key, NO_IMAGE, ttl=self.FAILURE_TTL)
+            self._in_flight.pop(key, None)
+
+    def status(self, key: str) -> str:
+        """Estado de un gráfico: 'ready', 'pending' o 'missing'"""
+        with self._lock:
+            if key in self.cache:
+                return self.READY
+            if key in self._in_flight:
+                return self.PENDING
+            return self.MISSING
+
+    def wait(self, key: str, timeout: float | None = None) -> bytes | None:
+        """
+        Espera a que termine el dibujo en curso de una clave.
+
+        Returns:
+            Imagen PNG (vacía si no hay imagen) o None si la clave no existe
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+        if future is not None:
+            future.exception(timeout=timeout)
+            # El callback puede no haber corrido todavía en el hilo del pool
+            self._finish(key, future)
+        return self.cache.get(key)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._in_flight.clear()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Instancia global del pool de dibujo
+chart_renderer = ChartRenderer(chart_cache)
@@ -4,15 +4,25 @@ from datetime import datetime as Datetime
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, Select, bindparam, func, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import (
+    Mapped,
+    column_property,
+    mapped_column,
+    relationship,
+    selectinload,
+    undefer,
+)
 
 from modules.config import db
+from modules.claim_supporter import ClaimSupporter
+from modules.data_version import DataVersion
+from modules.utils.pagination import keyset_page
+from modules.utils.text import detail_tokens, normalize_texts, tokenize
 
 if TYPE_CHECKING:
     from modules.claim_status_history import ClaimStatusHistory
-    from modules.claim_supporter import ClaimSupporter
     from modules.claim_transfer import ClaimTransfer
     from modules.department import Department
     from modules.end_user import EndUser
@@ -31,10 +41,35 @@ class Claim(db.Model):
     """Reclamo creado por un usuario final"""
 
     __tablename__ = "claim"
+    # En SQLite cada índice termina implícitamente en el rowid (id), así que
+    # (..., created_at) también resuelve el orden (created_at, id) de los listados
+    __table_args__ = (
+        Index("ix_claim_created_at", "created_at"),
+        Index("ix_claim_department_created_at", "department_id", "created_at"),
+        Index("ix_claim_creator_created_at", "creator_id", "created_at"),
+        Index("ix_claim_status_created_at", "status", "created_at"),
+        Index(
+            "ix_claim_status_department_created_at",
+            "status",
+            "department_id",
+            "created_at",
+        ),
+        # Conteos por estado de un conjunto de departamentos (índice cubriente)
+        Index("ix_claim_department_status", "department_id", "status"),
+        # Exportación incremental (reclamos modificados desde una fecha)
+        Index("ix_claim_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     detail: Mapped[str] = mapped_column(nullable=False)
-    status: Mapped[ClaimStatus] = mapped_column(default=ClaimStatus.PENDING)
+    # Tokens de detail (normalizados y sin stopwords), calculados al crear el
+    # reclamo (NULL hasta el backfill)
+    detail_tokens: Mapped[str | None] = mapped_column(nullable=True)
+    # active_history: los contadores necesitan el valor anterior aunque el
+    # objeto esté expirado (ver department_status_counter)
+    status: Mapped[ClaimStatus] = mapped_column(
+        default=ClaimStatus.PENDING, active_history=True
+    )
     image_path: Mapped[str | None] = mapped_column(nullable=True)
     created_at: Mapped[Datetime] = mapped_column(default=Datetime.now)
     updated_at: Mapped[Datetime] = mapped_column(
@@ -43,7 +78,7 @@ class Claim(db.Model):
 
     # Foreign Keys
     department_id: Mapped[int] = mapped_column(
-        ForeignKey("department.id"), nullable=False
+        ForeignKey("department.id"), nullable=False, active_history=True
     )
     creator_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
 
@@ -64,6 +99,16 @@ class Claim(db.Model):
         "ClaimTransfer", back_populates="claim", cascade="all, delete-orphan"
     )
 
+    # Cantidad de adherentes como subconsulta: diferida para no sumarla a cada
+    # consulta, los listados la cargan en el mismo SELECT con listing_options()
+    supporters_count: Mapped[int] = column_property(
+        select(func.count(ClaimSupporter.id))
+        .where(ClaimSupporter.claim_id == id)
+        .correlate_except(ClaimSupporter)
+        .scalar_subquery(),
+        deferred=True,
+    )
+
     def __init__(
         self,
         detail: str,
@@ -72,14 +117,29 @@ class Claim(db.Model):
         image_path: str | None = None,
     ):
         self.detail = detail
+        self.detail_tokens = detail_tokens(detail)
         self.department_id = department_id
         self.creator_id = creator_id
         self.image_path = image_path
 
     @property
-    def supporters_count(self) -> int:
-        """Retorna el número de adherentes"""
-        return len(self.supporters)
+    def tokens(self) -> list[str]:
+        """Retorna los tokens normalizados y sin stopwords del detalle"""
+        if self.detail_tokens is None:
+            return detail_tokens(self.detail).split()
+        return self.detail_tokens.split()
+
+    @staticmethod
+    def listing_options() -> tuple:
+        """
+        Opciones de carga para listados: creador y departamento en una consulta
+        por relación y conteo de adherentes en el SELECT principal (evita N+1).
+        """
+        return (
+            selectinload(Claim.creator),
+            selectinload(Claim.department),
+            undefer(Claim.supporters_count),
+        )
 
     def __repr__(self):
         return f"<Claim {self.id} - {self.status.value}>"
@@ -158,6 +218,18 @@ class Claim(db.Model):
 
         return technical_id, None
 
+    @staticmethod
+    def _sync_similarity_index(claim: "Claim") -> None:
+        """
+        Actualiza el índice de similitud luego de confirmar un cambio.
+
+        Args:
+            claim: Reclamo creado o modificado
+        """
+        from modules.similarity import similarity_finder
+
+        similarity_finder.sync_claim(claim)
+
     # ── Métodos estáticos de creación / actualización ────────────────
 
     @staticmethod
@@ -197,8 +269,11 @@ class Claim(db.Model):
         )
 
         db.session.add(claim)
+        DataVersion.bump()
         db.session.commit()
 
+        Claim._sync_similarity_index(claim)
+
         return claim, None
 
     @staticmethod
@@ -207,7 +282,8 @@ class Claim(db.Model):
     ) -> tuple[bool, str | None]:
         """
         Actualiza el estado de un reclamo y crea un registro en el historial.
-        Esto genera notificaciones individuales para el creador y cada adherente.
+        Esto encola las notificaciones individuales para el creador y cada
+        adherente (ver NotificationDispatcher).
 
         Args:
             claim_id: ID del reclamo
@@ -218,8 +294,8 @@ class Claim(db.Model):
             tuple[bool, str | None]: (success, error_message)
         """
         from modules.claim_status_history import ClaimStatusHistory
-        from modules.claim_supporter import ClaimSupporter
-        from modules.user_notification import UserNotification
+        from modules.notification_dispatcher import notification_dispatcher
+        from modules.notification_outbox import NotificationOutbox
 
         claim = db.session.get(Claim, claim_id)
 
@@ -246,25 +322,70 @@ class Claim(db.Model):
         db.session.add(history_entry)
         db.session.flush()  # Para obtener el ID de history_entry
 
-        # Crear notificaciones individuales para cada usuario afectado
-        # 1. Notificación para el creador del reclamo
-        creator_notification = UserNotification(
-            user_id=claim.creator_id, claim_status_history_id=history_entry.id
-        )
-        db.session.add(creator_notification)
-
-        # 2. Notificaciones para cada adherente
-        supporters = db.session.query(ClaimSupporter).filter_by(claim_id=claim_id).all()
-        for supporter in supporters:
-            supporter_notification = UserNotification(
-                user_id=supporter.user_id, claim_status_history_id=history_entry.id
-            )
-            db.session.add(supporter_notification)
+        # Las notificaciones para el creador y cada adherente las crea el
+        # worker a partir del evento, fuera de esta transacción
+        NotificationOutbox.enqueue(history_entry.id)
+        DataVersion.bump()
 
         db.session.commit()
+        notification_dispatcher.notify()
+
+        Claim._sync_similarity_index(claim)
 
         return True, None
 
+    @staticmethod
+    def backfill_text_fields(batch_size: int = 1000) -> int:
+        """
+        Calcula detail_tokens de los reclamos que no los tienen
+        (creados antes de que existiera la columna). No modifica updated_at.
+
+        Args:
+            batch_size: Cantidad de reclamos por lote
+
+        Returns:
+            Cantidad de reclamos actualizados
+        """
+        table = Claim.__table__
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam("claim_id"))
+            .values(
+                detail_tokens=bindparam("tokens"),
+                # Evita el onupdate: el texto derivado no es un cambio del reclamo
+                updated_at=table.c.updated_at,
+            )
+        )
+
+        updated = 0
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(table.c.id, table.c.detail)
+                .where(table.c.id > last_id, table.c.detail_tokens.is_(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            normalized = normalize_texts([detail for _, detail in rows])
+            db.session.execute(
+                statement,
+                [
+                    {
+                        "claim_id": claim_id,
+                        "tokens": " ".join(tokenize(text)),
+                    }
+                    for (claim_id, _), text in zip(rows, normalized)
+                ],
+            )
+            db.session.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+
+        return updated
+
     # ── Queries estáticas ────────────────────────────────────────────
 
     @staticmethod
@@ -312,7 +433,7 @@ class Claim(db.Model):
         Returns:
             list[Claim]: Lista de reclamos
         """
-        query = db.session.query(Claim)
+        query = db.session.query(Claim).options(*Claim.listing_options())
 
         if department_filter is not None:
             query = query.filter_by(department_id=department_filter)
@@ -322,12 +443,44 @@ class Claim(db.Model):
 
         return query.order_by(Claim.created_at.desc()).all()
 
+    @staticmethod
+    def get_all_with_filters_page(
+        department_filter: int | None = None,
+        status_filter: ClaimStatus | None = None,
+        cursor: str | None = None,
+        page_size: int | None = None,
+    ) -> tuple[list["Claim"], str | None]:
+        """
+        Obtiene una página de reclamos con filtros opcionales.
+
+        Args:
+            department_filter: ID del departamento para filtrar (opcional)
+            status_filter: Estado para filtrar (opcional)
+            cursor: Cursor devuelto por la página anterior (None = primera página)
+            page_size: Cantidad de reclamos por página
+
+        Returns:
+            tuple[list[Claim], str | None]: (reclamos, cursor de la página siguiente)
+        """
+        query = db.session.query(Claim).options(*Claim.listing_options())
+
+        if department_filter is not None:
+            query = query.filter_by(department_id=department_filter)
+
+        if status_filter is not None:
+            query = query.filter_by(status=status_filter)
+
+        return keyset_page(query, Claim.created_at, Claim.id, cursor, page_size)
+
     @staticmethod
     def get_status_counts(
         department_ids: list[int] | None = None,
     ) -> dict[ClaimStatus, int]:
         """Obtiene conteos de reclamos por estado.
 
+        Lee los contadores materializados (department_status_counter) en lugar
+        de agregar la tabla de reclamos.
+
         Args:
             department_ids: lista de IDs de departamentos a considerar.
                 - None: sin filtro (todos los departamentos)
@@ -336,19 +489,9 @@ class Claim(db.Model):
         Returns:
             dict[ClaimStatus, int]: conteos por estado (incluye estados con 0)
         """
-        counts: dict[ClaimStatus, int] = {status: 0 for status in ClaimStatus}
-
-        if department_ids is not None and len(department_ids) == 0:
-            return counts
-
-        query = db.session.query(Claim.status, func.count(Claim.id))
-        if department_ids is not None:
-            query = query.filter(Claim.department_id.in_(department_ids))
-
-        for status, count in query.group_by(Claim.status).all():
-            counts[status] = int(count)
+        from modules.department_status_counter import DepartmentStatusCounter
 
-        return counts
+        return DepartmentStatusCounter.get_counts(department_ids)
 
     @staticmethod
     def get_dashboard_counts(
@@ -364,25 +507,10 @@ class Claim(db.Model):
         Returns:
             dict[str, int]: total_claims, pending_claims, in_progress_claims, resolved_claims
         """
-        if department_ids is not None and len(department_ids) == 0:
-            return {
-                "total_claims": 0,
-                "pending_claims": 0,
-                "in_progress_claims": 0,
-                "resolved_claims": 0,
-                "invalid_claims": 0,
-            }
-
         status_counts = Claim.get_status_counts(department_ids=department_ids)
 
-        total_query = db.session.query(Claim)
-        if department_ids is not None:
-            total_query = total_query.filter(Claim.department_id.in_(department_ids))
-
-        total_claims = int(total_query.count() or 0)
-
         return {
-            "total_claims": total_claims,
+            "total_claims": sum(status_counts.values()),
             "pending_claims": status_counts[ClaimStatus.PENDING],
             "in_progress_claims": status_counts[ClaimStatus.IN_PROGRESS],
             "resolved_claims": status_counts[ClaimStatus.RESOLVED],
@@ -401,43 +529,24 @@ class Claim(db.Model):
         Returns:
             dict[int, dict[str, int]]: por department_id -> total/pending/in_progress/resolved
         """
+        from modules.department_status_counter import DepartmentStatusCounter
+
         if len(department_ids) == 0:
             return {}
 
-        per_dept: dict[int, dict[str, int]] = {
+        counters = DepartmentStatusCounter.get_counts_by_department(department_ids)
+
+        return {
             dept_id: {
-                "total": 0,
-                "pending": 0,
-                "in_progress": 0,
-                "resolved": 0,
-                "invalid": 0,
+                "total": sum(counts.values()),
+                "pending": counts[ClaimStatus.PENDING],
+                "in_progress": counts[ClaimStatus.IN_PROGRESS],
+                "resolved": counts[ClaimStatus.RESOLVED],
+                "invalid": counts[ClaimStatus.INVALID],
             }
-            for dept_id in department_ids
+            for dept_id, counts in counters.items()
         }
 
-        rows = (
-            db.session.query(Claim.department_id, Claim.status, func.count(Claim.id))
-            .filter(Claim.department_id.in_(department_ids))
-            .group_by(Claim.department_id, Claim.status)
-            .all()
-        )
-
-        for dept_id, status, count in rows:
-            dept_id_int = int(dept_id)
-            count_int = int(count)
-            per_dept[dept_id_int]["total"] += count_int
-
-            if status == ClaimStatus.PENDING:
-                per_dept[dept_id_int]["pending"] = count_int
-            elif status == ClaimStatus.IN_PROGRESS:
-                per_dept[dept_id_int]["in_progress"] = count_int
-            elif status == ClaimStatus.RESOLVED:
-                per_dept[dept_id_int]["resolved"] = count_int
-            elif status == ClaimStatus.INVALID:
-                per_dept[dept_id_int]["invalid"] = count_int
-
-        return per_dept
-
     # ── Supporters ───────────────────────────────────────────────────
 
     @staticmethod
@@ -452,8 +561,6 @@ class Claim(db.Model):
         Returns:
             tuple[bool, str | None]: (True, None) si exitoso, (False, error_message) si falla
         """
-        from modules.claim_supporter import ClaimSupporter
-
         # Verificar que el reclamo existe
         claim = Claim.get_by_id(claim_id)
         if not claim:
@@ -472,6 +579,7 @@ class Claim(db.Model):
 
         try:
             db.session.add(supporter)
+            DataVersion.bump()
             db.session.commit()
             return True, None
         except IntegrityError:
@@ -490,8 +598,6 @@ class Claim(db.Model):
         Returns:
             tuple[bool, str | None]: (True, None) si exitoso, (False, error_message) si falla
         """
-        from modules.claim_supporter import ClaimSupporter
-
         # Buscar el adherente
         supporter = (
             db.session.query(ClaimSupporter)
@@ -503,6 +609,7 @@ class Claim(db.Model):
             return False, "No estás adherido a este reclamo"
 
         db.session.delete(supporter)
+        DataVersion.bump()
         db.session.commit()
         return True, None
 
@@ -518,8 +625,6 @@ class Claim(db.Model):
         Returns:
             bool: True si está adherido, False en caso contrario
         """
-        from modules.claim_supporter import ClaimSupporter
-
         supporter = (
             db.session.query(ClaimSupporter)
             .filter_by(claim_id=claim_id, user_id=user_id)
@@ -540,12 +645,35 @@ class Claim(db.Model):
         """
         claims = (
             db.session.query(Claim)
+            .options(*Claim.listing_options())
             .filter_by(creator_id=user_id)
             .order_by(Claim.created_at.desc())
             .all()
         )
         return claims
 
+    @staticmethod
+    def get_by_user_page(
+        user_id: int, cursor: str | None = None, page_size: int | None = None
+    ) -> tuple[list["Claim"], str | None]:
+        """
+        Obtiene una página de los reclamos creados por un usuario.
+
+        Args:
+            user_id: ID del usuario
+            cursor: Cursor devuelto por la página anterior (None = primera página)
+            page_size: Cantidad de reclamos por página
+
+        Returns:
+            tuple[list[Claim], str | None]: (reclamos, cursor de la página siguiente)
+        """
+        query = (
+            db.session.query(Claim)
+            .options(*Claim.listing_options())
+            .filter_by(creator_id=user_id)
+        )
+        return keyset_page(query, Claim.created_at, Claim.id, cursor, page_size)
+
     @staticmethod
     def get_supported_by_user(user_id: int) -> list["Claim"]:
         """
@@ -557,10 +685,9 @@ class Claim(db.Model):
         Returns:
             Lista de reclamos ordenados por fecha de adhesión (más recientes primero)
         """
-        from modules.claim_supporter import ClaimSupporter
-
         claims = (
             db.session.query(Claim)
+            .options(*Claim.listing_options())
             .join(ClaimSupporter, Claim.id == ClaimSupporter.claim_id)
             .filter(ClaimSupporter.user_id == user_id)
             .order_by(ClaimSupporter.created_at.desc())
@@ -583,11 +710,127 @@ class Claim(db.Model):
             return []
         return (
             db.session.query(Claim)
+            .options(*Claim.listing_options())
             .filter(Claim.department_id.in_(department_ids))
             .order_by(Claim.created_at.desc())
             .all()
         )
 
+    @staticmethod
+    def iter_report_rows(department_ids: list[int], batch_size: int = 1000):
+        """
+        Recorre los reclamos de los departamentos para un reporte sin cargarlos
+        todos en memoria: filas livianas (sin objetos ORM) leídas del cursor de
+        a batch_size con yield_per.
+
+        Args:
+            department_ids: Lista de IDs de departamentos
+            batch_size: Filas que se traen por vez del cursor
+
+        Returns:
+            Iterador de filas con id, status, detail (primeros 101 caracteres,
+            alcanza para saber si hay que truncar a 100), department_id,
+            supporters_count y created_at, ordenadas por fecha descendente
+        """
+        if not department_ids:
+            return iter(())
+        return db.session.execute(
+            select(
+                Claim.id,
+                Claim.status,
+                func.substr(Claim.detail, 1, 101).label("detail"),
+                Claim.department_id,
+                Claim.supporters_count,
+                Claim.created_at,
+            )
+            .where(Claim.department_id.in_(department_ids))
+            .order_by(Claim.created_at.desc(), Claim.id.desc())
+            .execution_options(yield_per=batch_size)
+        )
+
+    @staticmethod
+    def export_query(
+        department_ids: list[int] | None = None, since: Datetime | None = None
+    ) -> Select:
+        """
+        Consulta de la exportación de reclamos (CSV/Parquet): columnas de la
+        tabla, sin objetos ORM, ordenadas por updated_at para poder exportar
+        solo lo modificado desde la última vez.
+
+        Args:
+            department_ids: Departamentos a incluir (None = todos)
+            since: Marca de agua; solo reclamos modificados después de esta fecha
+
+        Returns:
+            Select ordenado por (updated_at, id)
+        """
+        table = Claim.__table__
+        query = select(
+            table.c.id,
+            table.c.status,
+            table.c.detail,
+            table.c.department_id,
+            table.c.creator_id,
+            table.c.created_at,
+            table.c.updated_at,
+        )
+        if department_ids is not None:
+            query = query.where(table.c.department_id.in_(department_ids))
+        if since is not None:
+            query = query.where(table.c.updated_at > since)
+        return query.order_by(table.c.updated_at, table.c.id)
+
+    @staticmethod
+    def get_by_departments_page(
+        department_ids: list[int],
+        cursor: str | None = None,
+        page_size: int | None = None,
+    ) -> tuple[list["Claim"], str | None]:
+        """
+        Obtiene una página de reclamos de una lista de departamentos.
+
+        Args:
+            department_ids: Lista de IDs de departamentos
+            cursor: Cursor devuelto por la página anterior (None = primera página)
+            page_size: Cantidad de reclamos por página
+
+        Returns:
+            tuple[list[Claim], str | None]: (reclamos, cursor de la página siguiente)
+        """
+        if not department_ids:
+            return [], None
+        query = (
+            db.session.query(Claim)
+            .options(*Claim.listing_options())
+            .filter(Claim.department_id.in_(department_ids))
+        )
+        return keyset_page(query, Claim.created_at, Claim.id, cursor, page_size)
+
+    @staticmethod
+    def get_supporter_ids_by_claim(claim_ids: list[int]) -> dict[int, list[int]]:
+        """
+        Obtiene en una sola consulta los IDs de adherentes de varios reclamos.
+
+        Args:
+            claim_ids: IDs de los reclamos
+
+        Returns:
+            dict {claim_id: [user_id, ...]} en orden de adhesión
+        """
+        result: dict[int, list[int]] = {claim_id: [] for claim_id in claim_ids}
+        if not claim_ids:
+            return result
+
+        rows = (
+            db.session.query(ClaimSupporter.claim_id, ClaimSupporter.user_id)
+            .filter(ClaimSupporter.claim_id.in_(claim_ids))
+            .order_by(ClaimSupporter.created_at.asc(), ClaimSupporter.id.asc())
+            .all()
+        )
+        for claim_id, user_id in rows:
+            result[int(claim_id)].append(int(user_id))
+        return result
+
     @staticmethod
     def get_supporter_ids(claim_id: int) -> list[int]:
         """
@@ -599,8 +842,6 @@ class Claim(db.Model):
         Returns:
             Lista de IDs de usuarios adherentes
         """
-        from modules.claim_supporter import ClaimSupporter
-
         rows = (
             db.session.query(ClaimSupporter.user_id)
             .filter_by(claim_id=claim_id)
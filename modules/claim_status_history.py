@@ -1,7 +1,7 @@
 from datetime import datetime as Datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, Select, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from modules.config import db
@@ -17,6 +17,11 @@ class ClaimStatusHistory(db.Model):
     """Historial de cambios de estado de un reclamo"""
 
     __tablename__ = "claim_status_history"
+    __table_args__ = (
+        Index("ix_claim_status_history_claim_changed_at", "claim_id", "changed_at"),
+        # Exportación incremental (cambios desde una fecha)
+        Index("ix_claim_status_history_changed_at", "changed_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     old_status: Mapped[ClaimStatus] = mapped_column(nullable=False)
@@ -52,3 +57,37 @@ class ClaimStatusHistory(db.Model):
         return (
             f"<ClaimStatusHistory {self.old_status.value} -> {self.new_status.value}>"
         )
+
+    @staticmethod
+    def export_query(
+        department_ids: list[int] | None = None, since: Datetime | None = None
+    ) -> Select:
+        """
+        Consulta de la exportación del historial de estados (CSV/Parquet).
+
+        Args:
+            department_ids: Departamentos actuales de los reclamos (None = todos)
+            since: Marca de agua; solo cambios posteriores a esta fecha
+
+        Returns:
+            Select ordenado por (changed_at, id)
+        """
+        from modules.claim import Claim
+
+        table = ClaimStatusHistory.__table__
+        query = select(
+            table.c.id,
+            table.c.claim_id,
+            table.c.old_status,
+            table.c.new_status,
+            table.c.changed_by_id,
+            table.c.changed_at,
+        )
+        if department_ids is not None:
+            claims = Claim.__table__
+            query = query.join(claims, claims.c.id == table.c.claim_id).where(
+                claims.c.department_id.in_(department_ids)
+            )
+        if since is not None:
+            query = query.where(table.c.changed_at > since)
+        return query.order_by(table.c.changed_at, table.c.id)
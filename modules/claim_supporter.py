@@ -1,7 +1,7 @@
 from datetime import datetime as Datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Select, UniqueConstraint, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from modules.config import db
@@ -17,6 +17,10 @@ class ClaimSupporter(db.Model):
     __tablename__ = "claim_supporter"
     __table_args__ = (
         UniqueConstraint("claim_id", "user_id", name="uq_claim_supporter"),
+        # Reclamos apoyados por un usuario; (claim_id, ...) lo cubre la restricción única
+        Index("ix_claim_supporter_user_created_at", "user_id", "created_at"),
+        # Exportación incremental (adhesiones desde una fecha)
+        Index("ix_claim_supporter_created_at", "created_at"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -40,3 +44,36 @@ class ClaimSupporter(db.Model):
 
     def __repr__(self):
         return f"<ClaimSupporter claim={self.claim_id} user={self.user_id}>"
+
+    @staticmethod
+    def export_query(
+        department_ids: list[int] | None = None, since: Datetime | None = None
+    ) -> Select:
+        """
+        Consulta de la exportación de adhesiones (CSV/Parquet). Las adhesiones
+        retiradas se borran: una exportación incremental solo trae las nuevas.
+
+        Args:
+            department_ids: Departamentos actuales de los reclamos (None = todos)
+            since: Marca de agua; solo adhesiones posteriores a esta fecha
+
+        Returns:
+            Select ordenado por (created_at, id)
+        """
+        from modules.claim import Claim
+
+        table = ClaimSupporter.__table__
+        query = select(
+            table.c.id,
+            table.c.claim_id,
+            table.c.user_id,
+            table.c.created_at,
+        )
+        if department_ids is not None:
+            claims = Claim.__table__
+            query = query.join(claims, claims.c.id == table.c.claim_id).where(
+                claims.c.department_id.in_(department_ids)
+            )
+        if since is not None:
+            query = query.where(table.c.created_at > since)
+        return query.order_by(table.c.created_at, table.c.id)
@@ -3,10 +3,11 @@ from __future__ import annotations
 from datetime import datetime as Datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, Select, or_, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from modules.config import db
+from modules.data_version import DataVersion
 
 if TYPE_CHECKING:
     from modules.claim import Claim
@@ -18,6 +19,11 @@ class ClaimTransfer(db.Model):
     """Derivación de un reclamo entre departamentos"""
 
     __tablename__ = "claim_transfer"
+    __table_args__ = (
+        Index("ix_claim_transfer_claim_transferred_at", "claim_id", "transferred_at"),
+        # Exportación incremental (derivaciones desde una fecha)
+        Index("ix_claim_transfer_transferred_at", "transferred_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     reason: Mapped[str | None] = mapped_column(nullable=True)
@@ -86,6 +92,7 @@ class ClaimTransfer(db.Model):
         """
         from modules.claim import Claim
         from modules.department import Department
+        from modules.similarity import similarity_finder
 
         # Obtener el reclamo
         claim = db.session.get(Claim, claim_id)
@@ -117,10 +124,48 @@ class ClaimTransfer(db.Model):
         claim.department_id = to_department_id
 
         db.session.add(transfer)
+        DataVersion.bump()
         db.session.commit()
 
+        similarity_finder.sync_claim(claim)
+
         return transfer, None
 
+    @staticmethod
+    def export_query(
+        department_ids: list[int] | None = None, since: Datetime | None = None
+    ) -> Select:
+        """
+        Consulta de la exportación de derivaciones (CSV/Parquet).
+
+        Args:
+            department_ids: Departamentos de origen o destino (None = todos)
+            since: Marca de agua; solo derivaciones posteriores a esta fecha
+
+        Returns:
+            Select ordenado por (transferred_at, id)
+        """
+        table = ClaimTransfer.__table__
+        query = select(
+            table.c.id,
+            table.c.claim_id,
+            table.c.from_department_id,
+            table.c.to_department_id,
+            table.c.transferred_by_id,
+            table.c.reason,
+            table.c.transferred_at,
+        )
+        if department_ids is not None:
+            query = query.where(
+                or_(
+                    table.c.from_department_id.in_(department_ids),
+                    table.c.to_department_id.in_(department_ids),
+                )
+            )
+        if since is not None:
+            query = query.where(table.c.transferred_at > since)
+        return query.order_by(table.c.transferred_at, table.c.id)
+
     @staticmethod
     def get_history_for_claim(claim_id: int) -> list["ClaimTransfer"]:
         """
@@ -4,8 +4,16 @@ Clasificador automático de reclamos usando TF-IDF + Naive Bayes.
 
 from __future__ import annotations
 from typing import Optional
+from datetime import datetime
+import copy
+import hashlib
+import json
 import os
+import threading
+import time
+import uuid
 import joblib
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 
@@ -13,16 +21,50 @@ from sklearn.naive_bayes import MultinomialNB
 class Classifier:
     """Clasificador automático de reclamos a departamentos"""
 
+    # Por debajo de esta confianza el reclamo se deriva a Secretaría Técnica
+    MIN_CONFIDENCE = 0.4
+    FALLBACK_DEPARTMENT = "secretaria_tecnica"
+
+    # Versión del formato de artefactos (manifiesto + arreglos compartibles con mmap)
+    ARTIFACT_VERSION = 1
+
     def __init__(self):
-        self.vectorizer: TfidfVectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),  # Unigramas y bigramas
-            min_df=1,  # Mínima frecuencia de documento
-        )
+        self.vectorizer: TfidfVectorizer = Classifier._new_vectorizer()
         self.classifier: MultinomialNB = MultinomialNB()
         self.is_trained: bool = False
         self.model_path: str = "data/classifier.joblib"
         self.vectorizer_path: str = "data/vectorizer.joblib"
+        self.manifest: dict | None = None
+        # Segundos entre chequeos de los archivos del modelo en disco
+        self.reload_interval: float = 2.0
+        # _load_lock serializa las cargas; _swap_lock protege el par
+        # (vectorizer, classifier) para que nunca se lea a medio reemplazar
+        self._load_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._loaded_stamp: tuple | None = None
+        self._disk_stamp: tuple | None = None
+        self._checked_paths: tuple[str, str] | None = None
+        self._checked_at: float = float("-inf")
+
+    @staticmethod
+    def _new_vectorizer() -> TfidfVectorizer:
+        return TfidfVectorizer(
+            max_features=1000,
+            ngram_range=(1, 2),  # Unigramas y bigramas
+            min_df=1,  # Mínima frecuencia de documento
+        )
+
+    @property
+    def manifest_path(self) -> str:
+        """Manifiesto del entrenamiento, junto al archivo del clasificador"""
+        return os.path.splitext(self.model_path)[0] + ".manifest.json"
+
+    def init_app(self, app) -> None:
+        """Carga el modelo al iniciar la aplicación (antes del primer reclamo)"""
+        self.reload_interval = app.config.get(
+            "CLASSIFIER_RELOAD_INTERVAL", self.reload_interval
+        )
+        self.refresh(force=True)
 
     def train(self, texts: list[str], labels: list[str]) -> None:
         """
@@ -39,14 +81,18 @@ class Classifier:
             raise ValueError("La cantidad de textos debe coincidir con las etiquetas")
 
         # Vectorizar textos
-        X = self.vectorizer.fit_transform(texts)
+        vectorizer = Classifier._new_vectorizer()
+        X = vectorizer.fit_transform(texts)
 
         # Entrenar clasificador
-        self.classifier.fit(X, labels)
-        self.is_trained = True
+        model = MultinomialNB()
+        model.fit(X, labels)
+        with self._swap_lock:
+            self.vectorizer, self.classifier = vectorizer, model
+            self.is_trained = True
 
         # Guardar modelo
-        self._save_model()
+        self._save_model(Classifier._training_set_hash(texts, labels))
 
     def classify(self, text: str) -> str:
         """
@@ -64,22 +110,8 @@ class Classifier:
         if not text or not text.strip():
             raise ValueError("El texto no puede estar vacío")
 
-        # Cargar modelo si no está entrenado
-        if not self.is_trained:
-            self._load_model()
-
-        # Verificar que el modelo esté disponible
-        if not self.is_trained:
-            raise ValueError("El modelo no está entrenado. Ejecute train_classifier.py")
-
-        # Vectorizar y predecir
-        X = self.vectorizer.transform([text])
-        confidence = self.get_confidence(text)
-        if confidence < 0.4:
-            return "secretaria_tecnica"
-        prediction = self.classifier.predict(X)[0]
-
-        return prediction
+        labels, _ = self.classify_batch([text])
+        return str(labels[0])
 
     def get_confidence(self, text: str) -> float:
         """
@@ -94,41 +126,273 @@ class Classifier:
         if not text or not text.strip():
             return 0.0
 
-        if not self.is_trained:
-            self._load_model()
-
-        if not self.is_trained:
+        try:
+            _, confidences = self.classify_batch([text])
+        except ValueError:
             return 0.0
 
-        X = self.vectorizer.transform([text])
-        probabilities = self.classifier.predict_proba(X)[0]
+        return float(confidences[0])
+
+    def classify_batch(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Clasifica varios textos con una sola vectorización y un solo predict_proba.
+
+        Los textos con confianza menor a MIN_CONFIDENCE (incluidos los vacíos)
+        se asignan a FALLBACK_DEPARTMENT.
+
+        Args:
+            texts: Lista de textos de reclamos
+
+        Returns:
+            Tupla (departamentos, confianzas) alineada con `texts`
+
+        Raises:
+            ValueError: Si el modelo no está entrenado
+        """
+        vectorizer, model = self._snapshot()
+
+        if not texts:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float64)
+
+        # Vectorizar y predecir
+        X = vectorizer.transform(texts)
+        probabilities = model.predict_proba(X)
+        best = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(len(texts)), best]
+
+        # Textos vacíos: sin predicción posible
+        empty = np.array([not text or not text.strip() for text in texts])
+        confidences[empty] = 0.0
+
+        labels = model.classes_.astype(object)[best]
+        labels[confidences < self.MIN_CONFIDENCE] = self.FALLBACK_DEPARTMENT
+
+        return labels, confidences
+
+    def _snapshot(self) -> tuple[TfidfVectorizer, MultinomialNB]:
+        """
+        Retorna el par (vectorizer, classifier) vigente, recargándolo si cambió en disco.
+
+        Raises:
+            ValueError: Si el modelo no está entrenado
+        """
+        if self.is_trained:
+            self.refresh()
+        else:
+            # Sin modelo cargado se reintenta siempre; un par inconsistente falla acá
+            with self._load_lock:
+                self._load_model()
+
+        with self._swap_lock:
+            if not self.is_trained:
+                raise ValueError(
+                    "El modelo no está entrenado. Ejecute train_classifier.py"
+                )
+            return self.vectorizer, self.classifier
+
+    def _stamp(self) -> tuple | None:
+        """Huella (mtime, tamaño) de los archivos del modelo, o None si falta alguno"""
+        try:
+            model_stat = os.stat(self.model_path)
+            vectorizer_stat = os.stat(self.vectorizer_path)
+        except OSError:
+            return None
+        try:
+            manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            manifest_mtime = None  # Formato anterior, sin manifiesto
+        return (
+            self.model_path,
+            model_stat.st_mtime_ns,
+            model_stat.st_size,
+            self.vectorizer_path,
+            vectorizer_stat.st_mtime_ns,
+            vectorizer_stat.st_size,
+            manifest_mtime,
+        )
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Revisa los archivos del modelo (como mucho cada reload_interval segundos)
+        y carga la nueva versión si cambiaron desde la última carga.
+
+        Args:
+            force: Revisar aunque no haya pasado el intervalo
 
-        return float(max(probabilities))
+        Returns:
+            True si hay un modelo disponible
+        """
+        paths = (self.model_path, self.vectorizer_path)
+        if (
+            not force
+            and paths == self._checked_paths
+            and time.monotonic() - self._checked_at < self.reload_interval
+        ):
+            return self.is_trained or self._disk_stamp is not None
+
+        with self._load_lock:
+            stamp = self._stamp()
+            if stamp is not None and stamp != self._loaded_stamp:
+                try:
+                    self._load_model()
+                except ValueError:
+                    # Artefactos inconsistentes: se sigue usando el modelo cargado
+                    pass
+            self._disk_stamp = stamp
+            self._checked_paths = paths
+            self._checked_at = time.monotonic()
+
+        return self.is_trained or self._disk_stamp is not None
+
+    @staticmethod
+    def _training_set_hash(texts: list[str], labels: list[str]) -> str:
+        """Hash SHA-256 de los pares (etiqueta, texto) usados para entrenar"""
+        digest = hashlib.sha256()
+        for text, label in zip(texts, labels):
+            digest.update(f"{label}\t{text}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _dump_atomic(value, path: str) -> None:
+        """Escribe un archivo joblib sin comprimir (requisito de mmap_mode)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _save_model(self, training_set_hash: str | None = None) -> None:
+        """
+        Guarda el clasificador, el vectorizador y el manifiesto del entrenamiento.
 
-    def _save_model(self) -> None:
-        """Guarda el modelo y el vectorizador en disco"""
-        # Crear directorio si no existe
-        os.makedirs("models", exist_ok=True)
+        Los arreglos (feature_log_prob_, idf_, vocabulario) quedan en formato
+        joblib sin comprimir para que los workers los compartan con mmap. El
+        manifiesto se escribe al final: mientras no coincide el run_id, los
+        archivos nuevos no se cargan.
+        """
+        run_id = uuid.uuid4().hex
+        vocabulary = self.vectorizer.vocabulary_
+
+        # El vocabulario se guarda como arreglo de términos ordenado por índice
+        vectorizer = copy.copy(self.vectorizer)
+        del vectorizer.vocabulary_
+        terms = np.array(sorted(vocabulary, key=vocabulary.get))
+
+        Classifier._dump_atomic(
+            {
+                "format_version": self.ARTIFACT_VERSION,
+                "run_id": run_id,
+                "estimator": self.classifier,
+            },
+            self.model_path,
+        )
+        Classifier._dump_atomic(
+            {
+                "format_version": self.ARTIFACT_VERSION,
+                "run_id": run_id,
+                "estimator": vectorizer,
+                "vocabulary": terms,
+            },
+            self.vectorizer_path,
+        )
 
-        # Guardar ambos componentes
-        joblib.dump(self.classifier, self.model_path)
-        joblib.dump(self.vectorizer, self.vectorizer_path)
+        manifest = {
+            "format_version": self.ARTIFACT_VERSION,
+            "run_id": run_id,
+            "trained_at": datetime.now().isoformat(),
+            "training_set_hash": training_set_hash,
+            "labels": [str(label) for label in self.classifier.classes_],
+            "files": {
+                "classifier": os.path.basename(self.model_path),
+                "vectorizer": os.path.basename(self.vectorizer_path),
+            },
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        self.manifest = manifest
+
+        # Lo guardado es lo que ya está en memoria: no hace falta recargarlo
+        self._loaded_stamp = self._disk_stamp = self._stamp()
+        self._checked_paths = (self.model_path, self.vectorizer_path)
+        self._checked_at = time.monotonic()
+
+    def _load_artifacts(self) -> tuple[TfidfVectorizer, MultinomialNB, dict]:
+        """
+        Carga los artefactos versionados compartiendo los arreglos con mmap.
+
+        Raises:
+            ValueError: Si el formato no es soportado o los archivos provienen
+                de entrenamientos distintos
+        """
+        with open(self.manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != self.ARTIFACT_VERSION:
+            raise ValueError(
+                f"Formato de modelo no soportado: {manifest.get('format_version')}"
+            )
+
+        model_artifact = joblib.load(self.model_path, mmap_mode="r")
+        vectorizer_artifact = joblib.load(self.vectorizer_path, mmap_mode="r")
+        for artifact in (model_artifact, vectorizer_artifact):
+            if (
+                not isinstance(artifact, dict)
+                or artifact.get("run_id") != manifest["run_id"]
+            ):
+                raise ValueError(
+                    "El clasificador y el vectorizador provienen de entrenamientos "
+                    "distintos. Ejecute train_classifier.py"
+                )
+
+        vectorizer = vectorizer_artifact["estimator"]
+        vectorizer.vocabulary_ = {
+            str(term): i for i, term in enumerate(vectorizer_artifact["vocabulary"])
+        }
+        return vectorizer, model_artifact["estimator"], manifest
 
     def _load_model(self) -> None:
-        """Carga el modelo desde disco"""
-        if os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path):
-            self.classifier = joblib.load(self.model_path)
-            self.vectorizer = joblib.load(self.vectorizer_path)
+        """
+        Carga el modelo desde disco y lo reemplaza de forma atómica.
+
+        Raises:
+            ValueError: Si el clasificador y el vectorizador no son del mismo entrenamiento
+        """
+        stamp = self._stamp()
+        if stamp is None:
+            return
+
+        try:
+            if os.path.exists(self.manifest_path):
+                vectorizer, model, manifest = self._load_artifacts()
+            else:
+                # Formato anterior: pickles sueltos sin manifiesto
+                model = joblib.load(self.model_path)
+                vectorizer = joblib.load(self.vectorizer_path)
+                manifest = None
+                if model.n_features_in_ != len(vectorizer.vocabulary_):
+                    raise ValueError(
+                        "El clasificador y el vectorizador provienen de "
+                        "entrenamientos distintos. Ejecute train_classifier.py"
+                    )
+        except (OSError, EOFError, KeyError, json.JSONDecodeError):
+            # Archivos a medio escribir: se reintenta en el próximo chequeo
+            return
+
+        with self._swap_lock:
+            self.classifier, self.vectorizer = model, vectorizer
+            self.manifest = manifest
             self.is_trained = True
+        self._loaded_stamp = stamp
 
     def is_model_available(self) -> bool:
         """
-        Verifica si existe un modelo entrenado en disco.
+        Verifica si hay un modelo entrenado (cargado o en disco).
+        El chequeo de archivos se cachea durante reload_interval segundos.
 
         Returns:
             True si el modelo está disponible, False en caso contrario
         """
-        return os.path.exists(self.model_path) and os.path.exists(self.vectorizer_path)
+        return self.refresh()
 
 
 # Instancia global del clasificador
@@ -32,6 +32,42 @@ def create_app(config_overrides: dict | None = None):
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = "another-super-secret-key"
     app.config["MAX_CONTENT_LENGTH"] = 5 * 1024 * 1024  # 5MB max file size
+    app.config["SIMILARITY_INDEX_PATH"] = os.path.join(
+        basedir, "instance", "similarity_index.joblib"
+    )
+    app.config["SIMILARITY_SYNC_INTERVAL"] = 2.0  # segundos entre chequeos de huella
+    app.config["SIMILARITY_BACKEND"] = "exact"  # "exact" o "lsh" (aproximado)
+    app.config["SIMILARITY_LSH_BANDS"] = 32
+    app.config["SIMILARITY_LSH_BITS"] = 8
+    app.config["CLASSIFIER_RELOAD_INTERVAL"] = 2.0  # segundos entre chequeos del modelo
+    # Segundos de caché de gráficos en el navegador
+    app.config["ANALYTICS_CHART_MAX_AGE"] = 300
+    # Procesos de dibujo (0 = en la petición)
+    app.config["ANALYTICS_RENDER_WORKERS"] = 2
+    app.config["CLAIMS_PAGE_SIZE"] = 20  # reclamos por página en los listados
+    app.config["NOTIFICATIONS_PAGE_SIZE"] = 20  # notificaciones por página
+    app.config["REPORT_JOBS_DIR"] = os.path.join(basedir, "instance", "reports")
+    # Hilos de generación de reportes (0 = en la petición)
+    app.config["REPORT_WORKERS"] = 2
+    # Segundos tras los que un reporte en curso se reintenta
+    app.config["REPORT_JOB_TIMEOUT"] = 600
+    # Segundos que se guardan los pedidos terminados y sus archivos
+    app.config["REPORT_JOB_RETENTION"] = 24 * 3600
+    # Procesos para las partes del PDF (1 = sin pool)
+    app.config["PDF_RENDER_WORKERS"] = min(4, os.cpu_count() or 1)
+    app.config["PDF_CHUNK_SIZE"] = 200  # reclamos por parte del PDF
+    app.config["REPORT_CACHE_DIR"] = os.path.join(basedir, "instance", "report_cache")
+    # Tamaño máximo de la caché de reportes (0 = sin caché)
+    app.config["REPORT_CACHE_MAX_BYTES"] = 256 * 1024 * 1024
+    # True = notificar dentro de la petición
+    app.config["NOTIFICATION_DISPATCH_INLINE"] = False
+    # False si corre dispatch_notifications.py aparte
+    app.config["NOTIFICATION_DISPATCH_WORKER"] = True
+    # Segundos entre chequeos de la cola
+    app.config["NOTIFICATION_DISPATCH_INTERVAL"] = 5.0
+    app.config["NOTIFICATION_DISPATCH_BATCH_SIZE"] = 100  # eventos por lote
+    # Intentos antes de dar un evento por fallido
+    app.config["NOTIFICATION_DISPATCH_MAX_ATTEMPTS"] = 5
 
     if config_overrides:
         app.config.update(config_overrides)
@@ -43,6 +79,11 @@ def create_app(config_overrides: dict | None = None):
     login_manager.login_message = "Por favor inicie sesión para acceder a esta página."
     login_manager.login_message_category = "error"
 
+    # Cargar el modelo de clasificación antes del primer request
+    from modules.classifier import classifier
+
+    classifier.init_app(app)
+
     return app
 
 
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+
+# Versión de los datos que muestran los reportes (reclamos, adherentes,
+# estados y derivaciones)
+CLAIMS_DATA = "claims"
+
+
+class DataVersion(db.Model):
+    """
+    Contador que crece con cada escritura de un conjunto de datos.
+    Los reportes generados se guardan en caché con la versión de los datos
+    que leyeron: si la versión no cambió, el reporte sigue vigente.
+    """
+
+    __tablename__ = "data_version"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataVersion {self.name}={self.version}>"
+
+    @staticmethod
+    def bump(name: str = CLAIMS_DATA) -> None:
+        """
+        Incrementa la versión dentro de la transacción actual; queda confirmada
+        con el commit de la escritura que la provocó.
+        """
+        db.session.execute(
+            update(DataVersion)
+            .where(DataVersion.name == name)
+            .values(version=DataVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def get(name: str = CLAIMS_DATA) -> int:
+        """Versión actual (0 si todavía no hubo escrituras)"""
+        version = db.session.scalar(
+            select(DataVersion.version).where(DataVersion.name == name)
+        )
+        return version or 0
+
+
+@event.listens_for(DataVersion.__table__, "after_create")
+def _insert_initial_versions(target, connection, **kwargs) -> None:
+    """Crea la fila de cada contador junto con la tabla"""
+    connection.execute(insert(target).values(name=CLAIMS_DATA, version=0))
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, bindparam, case, event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from modules.config import db
+from modules.utils.text import detail_tokens
+
+if TYPE_CHECKING:
+    from modules.claim import Claim
+
+
+class DepartmentKeyword(db.Model):
+    """
+    Frecuencia de cada palabra clave en los reclamos de un departamento.
+    Se mantiene en la misma transacción que crea o deriva el reclamo.
+    """
+
+    __tablename__ = "department_keyword"
+    __table_args__ = (
+        # Top-N por departamento: ORDER BY count DESC LIMIT n sobre el índice
+        Index("ix_department_keyword_department_count", "department_id", "count"),
+    )
+
+    department_id: Mapped[int] = mapped_column(
+        ForeignKey("department.id"), primary_key=True
+    )
+    term: Mapped[str] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __init__(self, department_id: int, term: str, count: int = 0):
+        self.department_id = department_id
+        self.term = term
+        self.count = count
+
+    def __repr__(self):
+        return f"<DepartmentKeyword {self.department_id} - {self.term}: {self.count}>"
+
+    # ── Conteo ───────────────────────────────────────────────────────
+
+    @staticmethod
+    def count_terms(tokens: list[str]) -> Counter[str]:
+        """
+        Cuenta las palabras clave de un reclamo.
+
+        Args:
+            tokens: Tokens normalizados y sin stopwords (Claim.tokens)
+
+        Returns:
+            Counter con las palabras de más de 2 caracteres que no son números
+        """
+        return Counter(t for t in tokens if len(t) > 2 and not t.isdigit())
+
+    @staticmethod
+    def compute_from_claims() -> Counter[tuple[int, str]]:
+        """
+        Recalcula las frecuencias recorriendo todos los reclamos.
+
+        Returns:
+            Counter {(department_id, term): count}
+        """
+        from modules.claim import Claim
+
+        counts: Counter[tuple[int, str]] = Counter()
+        rows = db.session.execute(
+            select(
+                Claim.department_id,
+                Claim.detail_tokens,
+                # El detalle completo solo para filas sin tokens (antes del backfill)
+                case((Claim.detail_tokens.is_(None), Claim.detail), else_=None),
+            )
+        )
+        for department_id, tokens, detail in rows:
+            if tokens is None:
+                tokens = detail_tokens(detail)
+            for term, count in DepartmentKeyword.count_terms(tokens.split()).items():
+                counts[(department_id, term)] += count
+        return counts
+
+    @staticmethod
+    def apply_deltas(connection, deltas: Counter[tuple[int, str]]) -> None:
+        """
+        Suma (o resta) conteos a la tabla y elimina las filas que llegan a cero.
+
+        Args:
+            connection: Conexión de la transacción en curso
+            deltas: Counter {(department_id, term): diferencia}
+        """
+        table = DepartmentKeyword.__table__
+        increments = [
+            {"department_id": dept_id, "term": term, "count": delta}
+            for (dept_id, term), delta in deltas.items()
+            if delta > 0
+        ]
+        decrements = [
+            {"department_id": dept_id, "term": term, "count": delta}
+            for (dept_id, term), delta in deltas.items()
+            if delta < 0
+        ]
+
+        if increments:
+            statement = insert(table)
+            connection.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[table.c.department_id, table.c.term],
+                    set_={"count": table.c.count + statement.excluded.count},
+                ),
+                increments,
+            )
+        if decrements:
+            key = (table.c.department_id == bindparam("b_department_id")) & (
+                table.c.term == bindparam("b_term")
+            )
+            params = [
+                {
+                    "b_department_id": row["department_id"],
+                    "b_term": row["term"],
+                    "delta": row["count"],
+                }
+                for row in decrements
+            ]
+            connection.execute(
+                table.update()
+                .where(key)
+                .values(count=table.c.count + bindparam("delta")),
+                params,
+            )
+            connection.execute(table.delete().where(key & (table.c.count <= 0)), params)
+
+    # ── Consultas ────────────────────────────────────────────────────
+
+    @staticmethod
+    def get_top(department_ids: list[int] | None, top_n: int) -> dict[str, int]:
+        """
+        Retorna las palabras clave más frecuentes.
+
+        Args:
+            department_ids: Departamentos a considerar (None = todos)
+            top_n: Cantidad máxima de palabras
+
+        Returns:
+            dict {palabra: frecuencia} ordenado por frecuencia descendente
+        """
+        if department_ids is not None and len(department_ids) == 0:
+            return {}
+
+        if department_ids is not None and len(department_ids) == 1:
+            query = (
+                select(DepartmentKeyword.term, DepartmentKeyword.count)
+                .where(DepartmentKeyword.department_id == department_ids[0])
+                .order_by(DepartmentKeyword.count.desc(), DepartmentKeyword.term)
+            )
+        else:
+            total = func.sum(DepartmentKeyword.count)
+            query = (
+                select(DepartmentKeyword.term, total)
+                .group_by(DepartmentKeyword.term)
+                .order_by(total.desc(), DepartmentKeyword.term)
+            )
+            if department_ids is not None:
+                query = query.where(DepartmentKeyword.department_id.in_(department_ids))
+
+        rows = db.session.execute(query.limit(top_n)).all()
+        return {term: int(count) for term, count in rows}
+
+    # ── Reconciliación ───────────────────────────────────────────────
+
+    @staticmethod
+    def find_differences() -> dict[tuple[int, str], tuple[int, int]]:
+        """
+        Compara la tabla con el cálculo completo desde los reclamos.
+
+        Returns:
+            dict {(department_id, term): (conteo en tabla, conteo real)} de las diferencias
+        """
+        live = DepartmentKeyword.compute_from_claims()
+        stored = Counter(
+            {
+                (dept_id, term): count
+                for dept_id, term, count in db.session.execute(
+                    select(
+                        DepartmentKeyword.department_id,
+                        DepartmentKeyword.term,
+                        DepartmentKeyword.count,
+                    )
+                )
+            }
+        )
+        return {
+            key: (stored[key], live[key])
+            for key in stored.keys() | live.keys()
+            if stored[key] != live[key]
+        }
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Reconstruye la tabla desde cero a partir de los reclamos.
+
+        Returns:
+            Cantidad de filas (departamento, palabra) generadas
+        """
+        counts = DepartmentKeyword.compute_from_claims()
+        db.session.execute(DepartmentKeyword.__table__.delete())
+        if counts:
+            db.session.execute(
+                DepartmentKeyword.__table__.insert(),
+                [
+                    {"department_id": dept_id, "term": term, "count": count}
+                    for (dept_id, term), count in counts.items()
+                ],
+            )
+        db.session.commit()
+        return len(counts)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_keyword_changes(session: Session, flush_context) -> None:
+    """
+    Actualiza department_keyword con los reclamos creados, derivados o
+    eliminados en el flush, dentro de la misma transacción.
+    """
+    from modules.claim import Claim
+
+    deltas: Counter[tuple[int, str]] = Counter()
+
+    def add(claim: "Claim", department_id: int, sign: int) -> None:
+        for term, count in DepartmentKeyword.count_terms(claim.tokens).items():
+            deltas[(department_id, term)] += sign * count
+
+    for obj in session.new:
+        if isinstance(obj, Claim):
+            add(obj, obj.department_id, 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Claim):
+            history = inspect(obj).attrs.department_id.history
+            if history.deleted and history.added:
+                add(obj, history.deleted[0], -1)
+                add(obj, history.added[0], 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Claim):
+            history = inspect(obj).attrs.department_id.history
+            add(obj, (history.deleted or history.unchanged)[0], -1)
+
+    deltas = Counter({key: delta for key, delta in deltas.items() if delta})
+    if deltas:
+        DepartmentKeyword.apply_deltas(session.connection(), deltas)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from modules.config import db
+from modules.claim import ClaimStatus
+
+if TYPE_CHECKING:
+    from modules.claim import Claim
+
+
+class DepartmentStatusCounter(db.Model):
+    """
+    Cantidad de reclamos de un departamento en cada estado.
+    Se mantiene en la misma transacción que crea, cambia de estado o deriva el reclamo.
+    """
+
+    __tablename__ = "department_status_counter"
+
+    department_id: Mapped[int] = mapped_column(
+        ForeignKey("department.id"), primary_key=True
+    )
+    status: Mapped[ClaimStatus] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __init__(self, department_id: int, status: ClaimStatus, count: int = 0):
+        self.department_id = department_id
+        self.status = status
+        self.count = count
+
+    def __repr__(self):
+        return f"<DepartmentStatusCounter {self.department_id} - {self.status.value}: {self.count}>"
+
+    # ── Actualización ────────────────────────────────────────────────
+
+    @staticmethod
+    def apply_deltas(connection, deltas: Counter[tuple[int, ClaimStatus]]) -> None:
+        """
+        Suma (o resta) cantidades a los contadores, creando las filas que falten.
+
+        Args:
+            connection: Conexión de la transacción en curso
+            deltas: Counter {(department_id, status): diferencia}
+        """
+        table = DepartmentStatusCounter.__table__
+        statement = insert(table)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.department_id, table.c.status],
+                set_={"count": table.c.count + statement.excluded.count},
+            ),
+            [
+                {"department_id": dept_id, "status": status, "count": delta}
+                for (dept_id, status), delta in deltas.items()
+            ],
+        )
+
+    # ── Consultas ────────────────────────────────────────────────────
+
+    @staticmethod
+    def get_counts(department_ids: list[int] | None = None) -> dict[ClaimStatus, int]:
+        """
+        Suma los contadores por estado.
+
+        Args:
+            department_ids: Departamentos a considerar (None = todos)
+
+        Returns:
+            dict[ClaimStatus, int] con todos los estados (incluye los que están en 0)
+        """
+        counts: dict[ClaimStatus, int] = {status: 0 for status in ClaimStatus}
+        if department_ids is not None and len(department_ids) == 0:
+            return counts
+
+        query = select(
+            DepartmentStatusCounter.status, func.sum(DepartmentStatusCounter.count)
+        ).group_by(DepartmentStatusCounter.status)
+        if department_ids is not None:
+            query = query.where(
+                DepartmentStatusCounter.department_id.in_(department_ids)
+            )
+
+        for status, count in db.session.execute(query):
+            counts[status] = int(count or 0)
+        return counts
+
+    @staticmethod
+    def get_counts_by_department(
+        department_ids: list[int],
+    ) -> dict[int, dict[ClaimStatus, int]]:
+        """
+        Contadores por departamento y estado.
+
+        Args:
+            department_ids: Departamentos a incluir
+
+        Returns:
+            dict {department_id: {ClaimStatus: cantidad}} con todos los estados
+        """
+        result = {
+            dept_id: {status: 0 for status in ClaimStatus} for dept_id in department_ids
+        }
+        if not department_ids:
+            return result
+
+        rows = db.session.execute(
+            select(
+                DepartmentStatusCounter.department_id,
+                DepartmentStatusCounter.status,
+                DepartmentStatusCounter.count,
+            ).where(DepartmentStatusCounter.department_id.in_(department_ids))
+        )
+        for dept_id, status, count in rows:
+            result[int(dept_id)][status] = int(count)
+        return result
+
+    # ── Reconciliación ───────────────────────────────────────────────
+
+    @staticmethod
+    def compute_from_claims() -> Counter[tuple[int, ClaimStatus]]:
+        """
+        Recalcula los contadores agregando la tabla de reclamos.
+
+        Returns:
+            Counter {(department_id, status): cantidad}
+        """
+        from modules.claim import Claim
+
+        rows = db.session.execute(
+            select(Claim.department_id, Claim.status, func.count(Claim.id)).group_by(
+                Claim.department_id, Claim.status
+            )
+        )
+        return Counter(
+            {(int(dept_id), status): int(count) for dept_id, status, count in rows}
+        )
+
+    @staticmethod
+    def find_differences() -> dict[tuple[int, ClaimStatus], tuple[int, int]]:
+        """
+        Compara los contadores con el agregado en vivo de los reclamos.
+
+        Returns:
+            dict {(department_id, status): (contador, conteo real)} de las diferencias
+        """
+        live = DepartmentStatusCounter.compute_from_claims()
+        stored = Counter(
+            {
+                (int(dept_id), status): int(count)
+                for dept_id, status, count in db.session.execute(
+                    select(
+                        DepartmentStatusCounter.department_id,
+                        DepartmentStatusCounter.status,
+                        DepartmentStatusCounter.count,
+                    )
+                )
+            }
+        )
+        return {
+            key: (stored[key], live[key])
+            for key in stored.keys() | live.keys()
+            if stored[key] != live[key]
+        }
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Reconstruye los contadores desde cero a partir de los reclamos.
+
+        Returns:
+            Cantidad de filas (departamento, estado) generadas
+        """
+        counts = DepartmentStatusCounter.compute_from_claims()
+        db.session.execute(DepartmentStatusCounter.__table__.delete())
+        if counts:
+            db.session.execute(
+                DepartmentStatusCounter.__table__.insert(),
+                [
+                    {"department_id": dept_id, "status": status, "count": count}
+                    for (dept_id, status), count in counts.items()
+                ],
+            )
+        db.session.commit()
+        return len(counts)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_status_changes(session: Session, flush_context) -> None:
+    """
+    Actualiza department_status_counter con los reclamos creados, eliminados,
+    derivados o con cambio de estado en el flush, dentro de la misma transacción.
+    """
+    from modules.claim import Claim
+
+    deltas: Counter[tuple[int, ClaimStatus]] = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Claim):
+            deltas[(obj.department_id, obj.status)] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Claim):
+            continue
+        state = inspect(obj)
+        department = state.attrs.department_id.history
+        status = state.attrs.status.history
+        if not (department.deleted or status.deleted):
+            continue
+        old_department = (department.deleted or department.unchanged)[0]
+        old_status = (status.deleted or status.unchanged)[0]
+        deltas[(old_department, old_status)] -= 1
+        deltas[(obj.department_id, obj.status)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Claim):
+            department = inspect(obj).attrs.department_id.history
+            status = inspect(obj).attrs.status.history
+            deltas[
+                (
+                    (department.deleted or department.unchanged)[0],
+                    (status.deleted or status.unchanged)[0],
+                )
+            ] -= 1
+
+    deltas = Counter({key: delta for key, delta in deltas.items() if delta})
+    if deltas:
+        DepartmentStatusCounter.apply_deltas(session.connection(), deltas)
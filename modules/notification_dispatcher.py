@@ -0,0 +1,123 @@
+"""
+Envío de notificaciones de cambios de estado en segundo plano.
+
+El cambio de estado solo guarda el historial y un evento en notification_outbox;
+un hilo del proceso (o dispatch_notifications.py en un proceso aparte) expande
+los eventos en notificaciones por lotes, fuera de la petición del administrador.
+El hilo arranca con el servidor (init_app en run.py y server.py).
+"""
+
+from __future__ import annotations
+
+import threading
+
+from flask import Flask, current_app
+
+from modules.config import db
+from modules.notification_outbox import DEFAULT_MAX_ATTEMPTS, NotificationOutbox
+
+
+class NotificationDispatcher:
+    """Hilo que procesa notification_outbox, despertado en cada cambio de estado"""
+
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Arranca el hilo al iniciar el servidor si NOTIFICATION_DISPATCH_WORKER
+        está activo. Su primer ciclo procesa los eventos pendientes o por
+        reintentar que dejó la ejecución anterior, sin esperar a un cambio de estado.
+        """
+        config = app.config
+        if config.get("NOTIFICATION_DISPATCH_INLINE", False):
+            return
+        if not config.get("NOTIFICATION_DISPATCH_WORKER", True):
+            return
+        self._start(app)
+
+    def notify(self) -> None:
+        """
+        Avisa que hay eventos nuevos (llamar luego del commit).
+
+        Con NOTIFICATION_DISPATCH_INLINE se procesan en el hilo actual; si no,
+        se despierta al hilo (creándolo la primera vez) salvo que
+        NOTIFICATION_DISPATCH_WORKER esté desactivado porque los procesa otro
+        proceso.
+        """
+        config = current_app.config
+        if config.get("NOTIFICATION_DISPATCH_INLINE", False):
+            self.drain(
+                config.get("NOTIFICATION_DISPATCH_BATCH_SIZE", 100),
+                config.get("NOTIFICATION_DISPATCH_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS),
+            )
+            return
+        if not config.get("NOTIFICATION_DISPATCH_WORKER", True):
+            return
+
+        self._start(current_app._get_current_object())
+        self._wake.set()
+
+    def _start(self, app: Flask) -> None:
+        """Crea el hilo si no está corriendo"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(app,),
+                    name="notification-dispatcher",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    @staticmethod
+    def drain(batch_size: int, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """
+        Procesa lotes hasta que no queden eventos listos.
+
+        Returns:
+            Cantidad de eventos procesados
+        """
+        total = 0
+        while True:
+            processed = NotificationOutbox.dispatch_pending(batch_size, max_attempts)
+            total += processed
+            if processed < batch_size:
+                return total
+
+    def _run(self, app: Flask) -> None:
+        interval = app.config.get("NOTIFICATION_DISPATCH_INTERVAL", 5.0)
+        batch_size = app.config.get("NOTIFICATION_DISPATCH_BATCH_SIZE", 100)
+        max_attempts = app.config.get(
+            "NOTIFICATION_DISPATCH_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS
+        )
+        while not self._stop.is_set():
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    self.drain(batch_size, max_attempts)
+                except Exception as e:
+                    # Base no disponible o bloqueada: se reintenta en el próximo ciclo
+                    db.session.rollback()
+                    print(f"⚠️  Error procesando notificaciones: {e}")
+                finally:
+                    db.session.remove()
+            # El intervalo también cubre los reintentos postergados
+            self._wake.wait(interval)
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        """Detiene el hilo (termina el lote en curso)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+
+
+# Instancia global del worker de notificaciones
+notification_dispatcher = NotificationDispatcher()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from datetime import datetime as Datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, func, select, update
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from modules.config import db
+
+if TYPE_CHECKING:
+    from modules.claim_status_history import ClaimStatusHistory
+
+# Intentos antes de dejar un evento como fallido
+DEFAULT_MAX_ATTEMPTS = 5
+# Espera máxima entre reintentos (segundos)
+MAX_RETRY_DELAY = 300
+
+
+class NotificationOutbox(db.Model):
+    """
+    Evento pendiente de notificar un cambio de estado.
+    Se guarda en la misma transacción que el historial; un worker lo expande
+    luego en una notificación por destinatario.
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Eventos pendientes listos para procesar, en orden
+        Index("ix_notification_outbox_pending", "processed_at", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Un evento por cambio de estado: encolar dos veces no duplica notificaciones
+    claim_status_history_id: Mapped[int] = mapped_column(
+        ForeignKey("claim_status_history.id"), unique=True, nullable=False
+    )
+    created_at: Mapped[Datetime] = mapped_column(default=Datetime.now)
+    available_at: Mapped[Datetime] = mapped_column(default=Datetime.now)
+    processed_at: Mapped[Datetime | None] = mapped_column(nullable=True, default=None)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(nullable=True, default=None)
+
+    claim_status_history: Mapped["ClaimStatusHistory"] = relationship(
+        "ClaimStatusHistory"
+    )
+
+    def __init__(self, claim_status_history_id: int):
+        self.claim_status_history_id = claim_status_history_id
+
+    def __repr__(self):
+        status = "procesado" if self.processed_at else f"intentos={self.attempts}"
+        return (
+            f"<NotificationOutbox history_id={self.claim_status_history_id} {status}>"
+        )
+
+    @staticmethod
+    def enqueue(claim_status_history_id: int) -> None:
+        """
+        Agrega el evento de un cambio de estado a la transacción en curso.
+
+        Args:
+            claim_status_history_id: ID de la entrada de historial
+        """
+        db.session.add(NotificationOutbox(claim_status_history_id))
+
+    # ── Procesamiento ────────────────────────────────────────────────
+
+    @staticmethod
+    def dispatch_pending(
+        batch_size: int = 100, max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> int:
+        """
+        Expande en notificaciones un lote de eventos pendientes.
+
+        Cada evento se procesa en su propio savepoint: si falla se registra el
+        error y se reintenta más tarde (espera exponencial) sin frenar al resto.
+        El evento se toma con un UPDATE condicionado a que siga pendiente, así
+        dos workers nunca notifican dos veces el mismo cambio de estado.
+
+        Args:
+            batch_size: Cantidad máxima de eventos a procesar
+            max_attempts: Intentos antes de dejar un evento como fallido
+
+        Returns:
+            Cantidad de eventos procesados con éxito
+        """
+        from modules.claim_status_history import ClaimStatusHistory
+        from modules.user_notification import UserNotification
+
+        now = Datetime.now()
+        events = db.session.execute(
+            select(
+                NotificationOutbox.id,
+                NotificationOutbox.claim_status_history_id,
+                ClaimStatusHistory.claim_id,
+            )
+            .join(ClaimStatusHistory)
+            .where(
+                NotificationOutbox.processed_at.is_(None),
+                NotificationOutbox.available_at <= now,
+                NotificationOutbox.attempts < max_attempts,
+            )
+            .order_by(NotificationOutbox.available_at, NotificationOutbox.id)
+            .limit(batch_size)
+        ).all()
+
+        processed = 0
+        for event_id, history_id, claim_id in events:
+            savepoint = db.session.begin_nested()
+            try:
+                claimed = db.session.execute(
+                    update(NotificationOutbox)
+                    .where(
+                        NotificationOutbox.id == event_id,
+                        NotificationOutbox.processed_at.is_(None),
+                    )
+                    .values(
+                        processed_at=Datetime.now(),
+                        attempts=NotificationOutbox.attempts + 1,
+                    )
+                )
+                if claimed.rowcount == 1:
+                    UserNotification.create_for_status_change(claim_id, history_id)
+                    processed += 1
+                savepoint.commit()
+            except Exception as e:
+                savepoint.rollback()
+                NotificationOutbox._record_failure(event_id, e)
+        db.session.commit()
+        return processed
+
+    @staticmethod
+    def _record_failure(event_id: int, error: Exception) -> None:
+        """Suma un intento fallido y posterga el evento"""
+        event = db.session.get(NotificationOutbox, event_id)
+        if event is None:
+            return
+        event.attempts += 1
+        event.last_error = f"{type(error).__name__}: {error}"[:500]
+        delay = min(2**event.attempts, MAX_RETRY_DELAY)
+        event.available_at = Datetime.now() + timedelta(seconds=delay)
+
+    # ── Métricas ─────────────────────────────────────────────────────
+
+    @staticmethod
+    def get_lag(max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> dict[str, float | int]:
+        """
+        Retraso de la cola de notificaciones.
+
+        Returns:
+            dict con:
+                - pending: eventos sin procesar que se seguirán reintentando
+                - failed: eventos que agotaron los intentos
+                - lag_seconds: antigüedad del evento pendiente más viejo (0 si no hay)
+        """
+        pending = NotificationOutbox.processed_at.is_(None)
+        retrying = NotificationOutbox.attempts < max_attempts
+        pending_count, failed_count, oldest = db.session.execute(
+            select(
+                func.count(NotificationOutbox.id).filter(retrying),
+                func.count(NotificationOutbox.id).filter(~retrying),
+                func.min(NotificationOutbox.created_at).filter(retrying),
+            ).where(pending)
+        ).one()
+
+        lag = (Datetime.now() - oldest).total_seconds() if oldest else 0.0
+        return {
+            "pending": int(pending_count),
+            "failed": int(failed_count),
+            "lag_seconds": max(lag, 0.0),
+        }
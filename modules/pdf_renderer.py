@@ -0,0 +1,68 @@
+"""
+Conversión de las partes de un reporte PDF en un pool de procesos.
+
+xhtml2pdf consume CPU y retiene el GIL: las partes se convierten en paralelo
+en procesos "spawn" (los reportes se generan en hilos del servidor, donde un
+fork podría heredar locks tomados por otros hilos). El pool se crea una sola
+vez y lo comparten todos los reportes: arrancar los procesos cuesta más que
+convertir una parte.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from rendering.pdf import html_to_pdf
+
+
+class PDFRenderer:
+    """Pool de procesos compartido para convertir HTML a PDF"""
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def convert(self, parts_html: list[str], max_workers: int) -> list[bytes | None]:
+        """
+        Convierte las partes en el pool, en orden.
+
+        Args:
+            parts_html: HTML de cada parte
+            max_workers: Procesos del pool si todavía no existe
+
+        Returns:
+            PDF de cada parte (None si xhtml2pdf reportó errores)
+        """
+        with self._lock:
+            try:
+                futures = self._submit_all(parts_html, max_workers)
+            except BrokenProcessPool:
+                # Un worker murió: se descarta el pool y se crea otro
+                self._executor = None
+                futures = self._submit_all(parts_html, max_workers)
+        return [future.result() for future in futures]
+
+    def _submit_all(self, parts_html: list[str], max_workers: int) -> list[Future]:
+        executor = self._get_executor(max_workers)
+        return [executor.submit(html_to_pdf, html) for html in parts_html]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Instancia global del pool de PDFs
+pdf_renderer = PDFRenderer()
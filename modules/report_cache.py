@@ -0,0 +1,187 @@
+"""
+Caché en disco de reportes generados, indexada por formato, alcance y versión
+de los datos (DataVersion). Mientras ningún reclamo cambie, volver a descargar
+el mismo reporte sirve el archivo guardado en REPORT_CACHE_DIR.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+from flask import current_app
+
+# Extensión de los archivos que se están escribiendo (no cuentan como entradas)
+TEMP_SUFFIX = ".tmp"
+
+
+class ReportCache:
+    """Directorio de reportes acotado en bytes: se descartan los menos usados"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        report_format: str,
+        department_ids: list[int],
+        is_technical_secretary: bool,
+        data_version: int,
+    ) -> str:
+        """
+        Nombre del archivo en caché de un reporte.
+
+        Args:
+            report_format: Formato del reporte ('html' o 'pdf')
+            department_ids: Departamentos incluidos (el orden no importa)
+            is_technical_secretary: Si el reporte es de la Secretaría Técnica
+            data_version: Versión de los datos con la que se genera
+
+        Returns:
+            Hash SHA-256 en hexadecimal con la extensión del formato
+        """
+        from modules.report_job import ReportJob
+
+        scope = ReportJob.make_dedup_key(
+            report_format, department_ids, is_technical_secretary
+        )
+        digest = hashlib.sha256(f"{scope}:v{data_version}".encode("utf-8"))
+        return f"{digest.hexdigest()}.{report_format}"
+
+    @staticmethod
+    def _directory() -> str:
+        return current_app.config["REPORT_CACHE_DIR"]
+
+    @staticmethod
+    def _max_bytes() -> int:
+        return current_app.config.get("REPORT_CACHE_MAX_BYTES", 0)
+
+    def open(self, key: str) -> BinaryIO | None:
+        """
+        Abre el reporte guardado (y lo marca como usado) o retorna None.
+        Abrirlo de inmediato evita que una limpieza lo borre antes de enviarlo.
+        """
+        if self._max_bytes() <= 0:
+            return None
+        path = os.path.join(self._directory(), key)
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return file
+
+    def put(self, key: str, content: str | bytes) -> None:
+        """Guarda el contenido de un reporte"""
+        self._store(key, lambda file: file.write(_to_bytes(content)))
+
+    def put_file(self, key: str, source_path: str) -> None:
+        """Guarda una copia de un reporte ya escrito en disco"""
+
+        def copy(file: BinaryIO) -> None:
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, file)
+
+        self._store(key, copy)
+
+    def store_stream(self, key: str, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Reenvía los bloques de un reporte transmitido y a la vez los escribe en
+        la caché. Si la transmisión se corta no queda nada guardado.
+        """
+        if self._max_bytes() <= 0:
+            yield from chunks
+            return
+
+        directory = self._directory()
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=TEMP_SUFFIX)
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk.encode("utf-8"))
+                    yield chunk
+            os.replace(temp_path, os.path.join(directory, key))
+            completed = True
+            self._evict(directory)
+        finally:
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _store(self, key: str, write) -> None:
+        """Escribe a un temporal y lo renombra: nunca se lee una entrada a medias"""
+        if self._max_bytes() <= 0:
+            return
+        directory = self._directory()
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                write(file)
+            os.replace(temp_path, os.path.join(directory, key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._evict(directory)
+
+    def _evict(self, directory: str) -> None:
+        """Borra los reportes usados hace más tiempo hasta respetar el límite"""
+        max_bytes = self._max_bytes()
+        with self._lock:
+            entries = []
+            for entry in os.scandir(directory):
+                if not entry.is_file() or entry.name.endswith(TEMP_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear(self) -> None:
+        """Borra todos los reportes guardados"""
+        directory = self._directory()
+        with self._lock:
+            if not os.path.isdir(directory):
+                return
+            for entry in os.scandir(directory):
+                if entry.is_file() and not entry.name.endswith(TEMP_SUFFIX):
+                    os.remove(entry.path)
+
+    def size(self) -> int:
+        """Bytes ocupados por los reportes guardados"""
+        directory = self._directory()
+        if not os.path.isdir(directory):
+            return 0
+        return sum(
+            entry.stat().st_size
+            for entry in os.scandir(directory)
+            if entry.is_file() and not entry.name.endswith(TEMP_SUFFIX)
+        )
+
+
+def _to_bytes(content: str | bytes) -> bytes:
+    return content.encode("utf-8") if isinstance(content, str) else content
+
+
+# Instancia global de la caché de reportes
+report_cache = ReportCache()
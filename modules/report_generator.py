@@ -2,13 +2,24 @@
 
 from __future__ import annotations
 
+import csv
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import TYPE_CHECKING
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from enum import Enum
+from io import BytesIO, StringIO
+from itertools import islice
+from typing import IO, TYPE_CHECKING
 
-from flask import render_template
+from flask import current_app, render_template
+from sqlalchemy import Boolean, DateTime, Integer, Select
+from sqlalchemy import Enum as SAEnum
 
+from modules.config import db
 from modules.claim import Claim
+from modules.claim_status_history import ClaimStatusHistory
+from modules.claim_supporter import ClaimSupporter
+from modules.claim_transfer import ClaimTransfer
 from modules.department import Department
 from modules.analytics_generator import AnalyticsGenerator
 from modules.utils.constants import PDF_CSS
@@ -16,6 +27,33 @@ from modules.utils.constants import PDF_CSS
 if TYPE_CHECKING:
     pass
 
+REPORT_TEMPLATE = "reports/department_report.html"
+
+# Tamaño de los bloques que se envían al transmitir un reporte; el primero
+# (encabezado y resumen) sale antes para que el navegador empiece a mostrarlo
+STREAM_FIRST_CHUNK_SIZE = 4 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Reclamos por parte del PDF: xhtml2pdf tarda más que linealmente con el largo
+# de la tabla, así que conviene convertir tablas cortas y unir los PDFs
+PDF_CHUNK_SIZE = 200
+
+# Filas que se leen por vez del cursor al exportar datos (yield_per)
+EXPORT_BATCH_SIZE = 5000
+
+# Margen hacia atrás desde la marca de agua en las exportaciones incrementales:
+# un registro con fecha anterior a la exportación pero confirmado después no se
+# pierde (puede salir en dos exportaciones; se deduplica por id)
+EXPORT_WATERMARK_OVERLAP = timedelta(seconds=60)
+
+# Conjuntos de datos exportables: consulta y columna de la marca de agua
+EXPORT_DATASETS = {
+    "claims": (Claim.export_query, "updated_at"),
+    "status_history": (ClaimStatusHistory.export_query, "changed_at"),
+    "transfers": (ClaimTransfer.export_query, "transferred_at"),
+    "supporters": (ClaimSupporter.export_query, "created_at"),
+}
+
 
 class Report(ABC):
     """Clase base abstracta para generación de reportes."""
@@ -40,6 +78,23 @@ class Report(ABC):
         """Obtiene las estadísticas para el reporte."""
         return AnalyticsGenerator.get_claim_stats(self.department_ids)
 
+    def _get_context(self, claims: Iterable, claims_count: int, stats: dict) -> dict:
+        """Variables de la plantilla del reporte."""
+        departments = self._get_departments()
+        return {
+            "departments": departments,
+            "department_names": {d.id: d.display_name for d in departments},
+            "claims": claims,
+            "claims_count": claims_count,
+            "stats": stats,
+            "is_technical_secretary": self.is_technical_secretary,
+            "generated_at": datetime.now(),
+            "pdf_css": PDF_CSS,
+            # Las partes de un PDF (salvo la primera) tienen solo la tabla
+            "show_summary": True,
+            "show_footer": True,
+        }
+
     @abstractmethod
     def generate(self) -> str | bytes | None:
         """Genera el reporte en el formato específico."""
@@ -56,15 +111,47 @@ class HTMLReport(Report):
         Returns:
             String con el contenido HTML del reporte
         """
+        claims = self._get_claims()
         return render_template(
-            "reports/department_report.html",
-            departments=self._get_departments(),
-            claims=self._get_claims(),
-            stats=self._get_stats(),
-            is_technical_secretary=self.is_technical_secretary,
-            generated_at=datetime.now(),
-            pdf_css=PDF_CSS,
+            REPORT_TEMPLATE, **self._get_context(claims, len(claims), self._get_stats())
+        )
+
+    def stream(self) -> Iterator[str]:
+        """
+        Genera el reporte HTML de a bloques, sin armar el documento completo.
+
+        Los reclamos se leen del cursor de a lotes (Claim.iter_report_rows) y
+        se escriben fila por fila con Template.generate(): la memoria no crece
+        con la cantidad de reclamos. Para una respuesta, envolver con
+        stream_with_context.
+
+        Returns:
+            Iterador de fragmentos de HTML
+        """
+        stats = self._get_stats()
+        context = self._get_context(
+            Claim.iter_report_rows(self.department_ids),
+            stats["total_claims"],
+            stats,
         )
+        current_app.update_template_context(context)
+        template = current_app.jinja_env.get_template(REPORT_TEMPLATE)
+        return _buffer_chunks(template.generate(context))
+
+
+def _buffer_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Agrupa los fragmentos chicos de Jinja en bloques para enviar."""
+    buffer: list[str] = []
+    size = 0
+    limit = STREAM_FIRST_CHUNK_SIZE
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            yield "".join(buffer)
+            buffer, size, limit = [], 0, STREAM_CHUNK_SIZE
+    if buffer:
+        yield "".join(buffer)
 
 
 class PDFReport(Report):
@@ -74,49 +161,274 @@ class PDFReport(Report):
         """
         Genera un reporte PDF a partir del HTML usando xhtml2pdf.
 
+        La tabla de reclamos se divide en partes de PDF_CHUNK_SIZE filas que se
+        convierten en paralelo (PDF_RENDER_WORKERS procesos) y se unen en un
+        solo documento con encabezado y número de página en cada hoja.
+
         Returns:
             Bytes del PDF o None si xhtml2pdf no está disponible o hay error
         """
         try:
-            from io import BytesIO
-            from xhtml2pdf import pisa
+            import pypdf  # noqa: F401
+            import xhtml2pdf  # noqa: F401
         except ImportError:
             return None
 
-        try:
-            # Usar HTMLReport para generar el contenido base
-            html_report = HTMLReport(self.department_ids, self.is_technical_secretary)
-            html_content = html_report.generate()
+        from modules.pdf_renderer import pdf_renderer
+        from rendering.pdf import html_to_pdf, merge_pdfs
 
-            pdf_buffer = BytesIO()
-            pisa_status = pisa.CreatePDF(src=html_content, dest=pdf_buffer)
+        config = current_app.config
+        chunk_size = config.get("PDF_CHUNK_SIZE", PDF_CHUNK_SIZE)
+        workers = config.get("PDF_RENDER_WORKERS", 1)
+
+        try:
+            context = self._get_part_context()
+            parts_html = list(self._render_parts(context, chunk_size))
 
-            if pisa_status.err:  # type: ignore
+            if workers > 1 and len(parts_html) > 1:
+                parts = pdf_renderer.convert(parts_html, workers)
+            else:
+                parts = [html_to_pdf(html) for html in parts_html]
+            if any(part is None for part in parts):
                 return None
 
-            pdf_bytes = pdf_buffer.getvalue()
-            pdf_buffer.close()
-            return pdf_bytes
+            generated_at = context["generated_at"].strftime("%d/%m/%Y %H:%M")
+            return merge_pdfs(
+                parts,
+                header=f"Reporte de Reclamos - {self._get_subtitle(context)}",
+                footer=f"Sistema de Gestión de Reclamos - Generado el {generated_at}",
+            )
         except Exception:
             return None
 
+    def _get_part_context(self) -> dict:
+        """Contexto común a todas las partes (mismas estadísticas y fecha)."""
+        stats = self._get_stats()
+        return self._get_context(
+            Claim.iter_report_rows(self.department_ids), stats["total_claims"], stats
+        )
+
+    def _render_parts(self, context: dict, chunk_size: int) -> Iterator[str]:
+        """
+        Renderiza el HTML de cada parte: la primera con el encabezado y el
+        resumen, la última con el pie de página.
+        """
+        rows = iter(context["claims"])
+        chunk = list(islice(rows, chunk_size))
+        first = True
+        while True:
+            next_chunk = list(islice(rows, chunk_size))
+            yield render_template(
+                REPORT_TEMPLATE,
+                **{
+                    **context,
+                    "claims": chunk,
+                    "show_summary": first,
+                    "show_footer": not next_chunk,
+                },
+            )
+            if not next_chunk:
+                return
+            chunk, first = next_chunk, False
+
+    def _get_subtitle(self, context: dict) -> str:
+        """Alcance del reporte, como en el subtítulo de la plantilla."""
+        departments = context["departments"]
+        if self.is_technical_secretary:
+            return "Vista Global - Todos los Departamentos"
+        if len(departments) == 1:
+            return departments[0].display_name
+        return f"{len(departments)} Departamentos"
+
+
+class DataExport(Report):
+    """
+    Base de las exportaciones para procesar datos (no para leer): filas planas
+    de un conjunto de datos, leídas del cursor de a lotes sin objetos ORM.
+
+    Con since se exporta lo creado o modificado desde esa fecha menos overlap.
+    La entrega es "al menos una vez": un registro del margen puede repetirse en
+    la exportación siguiente y el consumidor se queda con la última fila de
+    cada id.
+    """
+
+    def __init__(
+        self,
+        department_ids: list[int] | None,
+        is_technical_secretary: bool = False,
+        dataset: str = "claims",
+        since: datetime | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+        overlap: timedelta = EXPORT_WATERMARK_OVERLAP,
+    ):
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Conjunto de datos no válido: {dataset}")
+        super().__init__(department_ids, is_technical_secretary)  # type: ignore
+        self.dataset = dataset
+        self.since = since
+        self.batch_size = batch_size
+        self.overlap = overlap
+        # Marca de agua para la próxima exportación incremental: fecha del
+        # último registro exportado (se actualiza a medida que se escribe)
+        self.watermark = since
+        self.exported_rows = 0
+
+    def _query(self) -> Select:
+        build_query, _ = EXPORT_DATASETS[self.dataset]
+        since = self.since - self.overlap if self.since is not None else None
+        return build_query(self.department_ids, since)
+
+    @property
+    def columns(self) -> list[str]:
+        """Nombres de las columnas exportadas"""
+        return [column.name for column in self._query().selected_columns]
+
+    def _iter_batches(self) -> Iterator[list]:
+        """Lotes de filas en el orden de la marca de agua"""
+        _, watermark_column = EXPORT_DATASETS[self.dataset]
+        result = db.session.execute(
+            self._query().execution_options(yield_per=self.batch_size)
+        )
+        for rows in result.partitions():
+            # Las filas del margen son anteriores: la marca nunca retrocede
+            last = getattr(rows[-1], watermark_column)
+            if self.watermark is None or last > self.watermark:
+                self.watermark = last
+            self.exported_rows += len(rows)
+            yield rows
+
+
+class CSVReport(DataExport):
+    """Exportación de un conjunto de datos en CSV."""
+
+    def generate(self) -> str:
+        """
+        Genera el CSV completo.
+
+        Returns:
+            String con el encabezado y una línea por registro
+        """
+        return "".join(self.stream())
+
+    def stream(self) -> Iterator[str]:
+        """
+        Genera el CSV de a un lote por vez (primero el encabezado).
+
+        Returns:
+            Iterador de fragmentos del CSV
+        """
+        buffer = StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(self.columns)
+        yield buffer.getvalue()
+        for rows in self._iter_batches():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
+
+
+class ParquetReport(DataExport):
+    """
+    Exportación de un conjunto de datos en Parquet (columnar).
+    Requiere pyarrow, que es opcional.
+    """
+
+    def generate(self) -> bytes | None:
+        """
+        Genera el archivo Parquet en memoria.
+
+        Returns:
+            Bytes del archivo o None si pyarrow no está instalado
+        """
+        buffer = BytesIO()
+        if not self.write(buffer):
+            return None
+        return buffer.getvalue()
+
+    def write(self, destination: str | IO[bytes]) -> bool:
+        """
+        Escribe el archivo de a un grupo de filas por lote, sin tener todos los
+        registros en memoria.
+
+        Args:
+            destination: Ruta o archivo binario abierto
+
+        Returns:
+            True si se escribió, False si pyarrow no está instalado
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return False
+
+        schema = pa.schema(
+            [
+                (column.name, _arrow_type(pa, column.type))
+                for column in self._query().selected_columns
+            ]
+        )
+        with pq.ParquetWriter(destination, schema) as writer:
+            for rows in self._iter_batches():
+                arrays = [
+                    pa.array(
+                        [_export_value(value) for value in values], type=field.type
+                    )
+                    for values, field in zip(zip(*rows), schema)
+                ]
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+        return True
+
+
+def _export_value(value):
+    """Los estados se exportan por nombre (PENDING, RESOLVED, ...)"""
+    return value.name if isinstance(value, Enum) else value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return _export_value(value)
+
+
+def _arrow_type(pa, column_type):
+    """Tipo de pyarrow para el tipo de una columna"""
+    if isinstance(column_type, SAEnum):
+        return pa.string()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
 
 def create_report(
     report_format: str,
-    department_ids: list[int],
+    department_ids: list[int] | None,
     is_technical_secretary: bool = False,
+    dataset: str = "claims",
+    since: datetime | None = None,
 ) -> Report:
     """
     Factory function para crear el tipo de reporte apropiado.
 
     Args:
-        report_format: Formato del reporte ('html' o 'pdf')
-        department_ids: Lista de IDs de departamentos a incluir
+        report_format: Formato del reporte ('html', 'pdf', 'csv' o 'parquet')
+        department_ids: Lista de IDs de departamentos a incluir (None: todos, solo en CSV/Parquet)
         is_technical_secretary: Si el usuario es secretario técnico
+        dataset: Conjunto de datos de las exportaciones CSV/Parquet
+        since: Marca de agua de una exportación incremental
 
     Returns:
-        Instancia de HTMLReport o PDFReport
+        Instancia de HTMLReport, PDFReport, CSVReport o ParquetReport
     """
+    if report_format == "csv":
+        return CSVReport(department_ids, is_technical_secretary, dataset, since)
+    if report_format == "parquet":
+        return ParquetReport(department_ids, is_technical_secretary, dataset, since)
     if report_format == "pdf":
         return PDFReport(department_ids, is_technical_secretary)
     return HTMLReport(department_ids, is_technical_secretary)
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from datetime import datetime as Datetime, timedelta
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column
+
+from modules.config import db
+
+if TYPE_CHECKING:
+    from modules.admin_user import AdminUser
+
+# Formatos de reporte que se pueden encolar y su tipo MIME
+REPORT_MIMETYPES = {"html": "text/html", "pdf": "application/pdf"}
+
+
+class ReportJobStatus(Enum):
+    """Estado de un pedido de reporte"""
+
+    PENDING = "Pendiente"
+    RUNNING = "Generando"
+    DONE = "Listo"
+    FAILED = "Error"
+
+
+class ReportJob(db.Model):
+    """
+    Pedido de generación de un reporte en segundo plano.
+    El archivo generado queda en REPORT_JOBS_DIR (y se puede descargar varias
+    veces) hasta que el pedido vence: ver purge_expired y REPORT_JOB_RETENTION.
+    """
+
+    __tablename__ = "report_job"
+    __table_args__ = (
+        # Un solo pedido activo por formato y alcance: los pedidos idénticos
+        # se unen al que ya está en curso
+        Index(
+            "ux_report_job_active_dedup_key",
+            "dedup_key",
+            unique=True,
+            sqlite_where=text("status IN ('PENDING', 'RUNNING')"),
+        ),
+        # Pedidos recientes de un alcance
+        Index("ix_report_job_dedup_key_created_at", "dedup_key", "created_at"),
+        # Pedidos pendientes al iniciar y pedidos terminados vencidos
+        Index("ix_report_job_status_finished_at", "status", "finished_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    report_format: Mapped[str] = mapped_column(nullable=False)
+    # IDs de departamentos ordenados y separados por coma
+    department_ids: Mapped[str] = mapped_column(nullable=False)
+    is_technical_secretary: Mapped[bool] = mapped_column(nullable=False)
+    dedup_key: Mapped[str] = mapped_column(nullable=False)
+    status: Mapped[ReportJobStatus] = mapped_column(
+        nullable=False, default=ReportJobStatus.PENDING
+    )
+    file_path: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    error: Mapped[str | None] = mapped_column(nullable=True, default=None)
+    created_at: Mapped[Datetime] = mapped_column(default=Datetime.now)
+    started_at: Mapped[Datetime | None] = mapped_column(nullable=True, default=None)
+    finished_at: Mapped[Datetime | None] = mapped_column(nullable=True, default=None)
+
+    requested_by_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+
+    def __init__(
+        self,
+        report_format: str,
+        department_ids: list[int],
+        is_technical_secretary: bool,
+        requested_by_id: int,
+    ):
+        self.report_format = report_format
+        self.department_ids = ",".join(str(i) for i in sorted(set(department_ids)))
+        self.is_technical_secretary = is_technical_secretary
+        self.dedup_key = ReportJob.make_dedup_key(
+            report_format, department_ids, is_technical_secretary
+        )
+        self.requested_by_id = requested_by_id
+        self.status = ReportJobStatus.PENDING
+
+    def __repr__(self):
+        return f"<ReportJob {self.id} {self.report_format} {self.status.value}>"
+
+    @property
+    def department_id_list(self) -> list[int]:
+        return [int(i) for i in self.department_ids.split(",") if i]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (ReportJobStatus.DONE, ReportJobStatus.FAILED)
+
+    @property
+    def mimetype(self) -> str:
+        return REPORT_MIMETYPES[self.report_format]
+
+    @staticmethod
+    def make_dedup_key(
+        report_format: str, department_ids: list[int], is_technical_secretary: bool
+    ) -> str:
+        """Clave que identifica pedidos idénticos (formato, rol y departamentos)"""
+        ids = ",".join(str(i) for i in sorted(set(department_ids)))
+        role = "st" if is_technical_secretary else "dept"
+        return f"{report_format}:{role}:{ids}"
+
+    # ── Pedidos ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def enqueue(
+        report_format: str,
+        department_ids: list[int],
+        is_technical_secretary: bool,
+        requested_by_id: int,
+    ) -> tuple[ReportJob | None, str | None]:
+        """
+        Crea un pedido de reporte o retorna el pedido idéntico que ya está en curso.
+
+        Args:
+            report_format: Formato del reporte ('html' o 'pdf')
+            department_ids: Departamentos a incluir
+            is_technical_secretary: Si el reporte es de la Secretaría Técnica
+            requested_by_id: ID del administrador que lo pide
+
+        Returns:
+            tuple[ReportJob | None, str | None]: (pedido, mensaje de error)
+        """
+        if report_format not in REPORT_MIMETYPES:
+            return None, "Formato de reporte no válido"
+
+        key = ReportJob.make_dedup_key(
+            report_format, department_ids, is_technical_secretary
+        )
+        existing = ReportJob.get_active_by_key(key)
+        if existing is not None:
+            return existing, None
+
+        job = ReportJob(
+            report_format, department_ids, is_technical_secretary, requested_by_id
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otro pedido idéntico se creó al mismo tiempo
+            db.session.rollback()
+            return ReportJob.get_active_by_key(key), None
+        return job, None
+
+    @staticmethod
+    def get_active_by_key(dedup_key: str) -> ReportJob | None:
+        """Pedido pendiente o en curso con esa clave"""
+        return (
+            db.session.query(ReportJob)
+            .filter(
+                ReportJob.dedup_key == dedup_key,
+                ReportJob.status.in_(
+                    [ReportJobStatus.PENDING, ReportJobStatus.RUNNING]
+                ),
+            )
+            .first()
+        )
+
+    @staticmethod
+    def get_for_admin(job_id: int, admin_user: "AdminUser") -> ReportJob | None:
+        """
+        Obtiene un pedido si cubre el mismo alcance que el administrador
+        (los pedidos idénticos se comparten entre administradores).
+        """
+        from modules.department import Department
+
+        job = db.session.get(ReportJob, job_id)
+        if job is None:
+            return None
+        department_ids = [d.id for d in Department.get_for_admin(admin_user)]
+        expected = ReportJob.make_dedup_key(
+            job.report_format, department_ids, admin_user.is_technical_secretary
+        )
+        return job if job.dedup_key == expected else None
+
+    @staticmethod
+    def get_recent_for_admin(
+        admin_user: "AdminUser", limit: int = 10
+    ) -> list[ReportJob]:
+        """Últimos pedidos (de cualquier formato) con el alcance del administrador"""
+        from modules.department import Department
+
+        department_ids = [d.id for d in Department.get_for_admin(admin_user)]
+        keys = [
+            ReportJob.make_dedup_key(
+                report_format, department_ids, admin_user.is_technical_secretary
+            )
+            for report_format in REPORT_MIMETYPES
+        ]
+        return (
+            db.session.query(ReportJob)
+            .filter(ReportJob.dedup_key.in_(keys))
+            .order_by(ReportJob.created_at.desc(), ReportJob.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def get_resumable_ids(stale_after: float) -> list[int]:
+        """
+        IDs de los pedidos a retomar, del más antiguo al más nuevo: los
+        pendientes y los que quedaron "en curso" más de stale_after segundos
+        (el worker se cayó o el servidor se reinició).
+        """
+        stale_before = Datetime.now() - timedelta(seconds=stale_after)
+        return list(
+            db.session.scalars(
+                select(ReportJob.id)
+                .where(
+                    or_(
+                        ReportJob.status == ReportJobStatus.PENDING,
+                        (ReportJob.status == ReportJobStatus.RUNNING)
+                        & (ReportJob.started_at < stale_before),
+                    )
+                )
+                .order_by(ReportJob.id)
+            )
+        )
+
+    @staticmethod
+    def purge_expired(max_age: float) -> int:
+        """
+        Borra los pedidos terminados hace más de max_age segundos y sus archivos.
+
+        Args:
+            max_age: Segundos que se conserva un pedido terminado
+
+        Returns:
+            Cantidad de pedidos borrados
+        """
+        expired_before = Datetime.now() - timedelta(seconds=max_age)
+        jobs = (
+            db.session.query(ReportJob)
+            .filter(
+                ReportJob.status.in_([ReportJobStatus.DONE, ReportJobStatus.FAILED]),
+                ReportJob.finished_at < expired_before,
+            )
+            .all()
+        )
+        for job in jobs:
+            if job.file_path is not None:
+                try:
+                    os.remove(job.file_path)
+                except FileNotFoundError:
+                    pass
+            db.session.delete(job)
+        db.session.commit()
+        return len(jobs)
+
+    # ── Generación ───────────────────────────────────────────────────
+
+    @staticmethod
+    def claim(job_id: int, stale_after: float) -> bool:
+        """
+        Toma un pedido para generarlo. Solo uno de los workers lo consigue;
+        un pedido que quedó "en curso" más de stale_after segundos (worker
+        caído) se puede volver a tomar.
+
+        Returns:
+            True si este worker debe generarlo
+        """
+        stale_before = Datetime.now() - timedelta(seconds=stale_after)
+        result = db.session.execute(
+            update(ReportJob)
+            .where(
+                ReportJob.id == job_id,
+                or_(
+                    ReportJob.status == ReportJobStatus.PENDING,
+                    (ReportJob.status == ReportJobStatus.RUNNING)
+                    & (ReportJob.started_at < stale_before),
+                ),
+            )
+            .values(status=ReportJobStatus.RUNNING, started_at=Datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def run(job_id: int, output_dir: str, stale_after: float = 600) -> bool:
+        """
+        Genera el reporte de un pedido y lo guarda en output_dir.
+
+        Cada intento escribe en su propio temporal. Si mientras tanto otro
+        worker retomó el pedido (este se consideró abandonado), el resultado
+        de este intento se descarta.
+
+        Args:
+            job_id: ID del pedido
+            output_dir: Directorio donde se guardan los reportes
+            stale_after: Segundos tras los que un pedido en curso se considera abandonado
+
+        Returns:
+            True si este worker generó el reporte (con éxito o error)
+        """
+        from modules.data_version import DataVersion
+        from modules.report_cache import ReportCache, report_cache
+        from modules.report_generator import HTMLReport, create_report
+
+        if not ReportJob.claim(job_id, stale_after):
+            return False
+
+        job = db.session.get(ReportJob, job_id)
+        # El pedido sigue siendo de este worker mientras started_at no cambie
+        owned = (
+            (ReportJob.id == job_id)
+            & (ReportJob.status == ReportJobStatus.RUNNING)
+            & (ReportJob.started_at == job.started_at)
+        )
+        temp_path = None
+        try:
+            report = create_report(
+                job.report_format,
+                job.department_id_list,
+                job.is_technical_secretary,
+            )
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, f"reporte_{job.id}.{job.report_format}")
+            # Escribir a un temporal y renombrar: nunca se sirve un archivo a medias
+            fd, temp_path = tempfile.mkstemp(
+                dir=output_dir, prefix=f"reporte_{job.id}.", suffix=".tmp"
+            )
+            os.close(fd)
+            cache_key = ReportCache.make_key(
+                job.report_format,
+                job.department_id_list,
+                job.is_technical_secretary,
+                DataVersion.get(),
+            )
+            cached = report_cache.open(cache_key)
+            if cached is not None:
+                # Los datos no cambiaron desde la última vez: copiar el reporte
+                with cached, open(temp_path, "wb") as file:
+                    shutil.copyfileobj(cached, file)
+            else:
+                if isinstance(report, HTMLReport):
+                    # El HTML se escribe de a bloques, sin tenerlo entero en memoria
+                    with open(temp_path, "w", encoding="utf-8") as file:
+                        file.writelines(report.stream())
+                else:
+                    content = report.generate()
+                    if content is None:
+                        raise RuntimeError("No se pudo generar el reporte")
+                    with open(temp_path, "wb") as file:
+                        file.write(content)
+                report_cache.put_file(cache_key, temp_path)
+
+            result = db.session.execute(
+                update(ReportJob)
+                .where(owned)
+                .values(
+                    status=ReportJobStatus.DONE,
+                    file_path=path,
+                    finished_at=Datetime.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                # Otro worker retomó el pedido: no se pisa su archivo
+                db.session.rollback()
+                return False
+            os.replace(temp_path, path)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            result = db.session.execute(
+                update(ReportJob)
+                .where(owned)
+                .values(
+                    status=ReportJobStatus.FAILED,
+                    error=str(e)[:500],
+                    finished_at=Datetime.now(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if result.rowcount != 1:
+                return False
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+        return True
@@ -0,0 +1,111 @@
+"""
+Generación de reportes en un pool de hilos.
+
+Renderizar y convertir a PDF un reporte con todos los departamentos puede tardar
+decenas de segundos: la petición solo encola el pedido y un hilo del pool lo
+genera a un archivo en REPORT_JOBS_DIR. Luego de cada pedido se borran los
+pedidos vencidos (REPORT_JOB_RETENTION).
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from modules.config import db
+from modules.report_job import ReportJob
+
+
+class ReportJobRunner:
+    """Ejecuta pedidos de reportes sin repetir los que ya están en curso"""
+
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight: set[int] = set()
+        self._lock = threading.Lock()
+
+    def _get_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="report-worker"
+            )
+        return self._executor
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Al iniciar el servidor borra los pedidos vencidos y vuelve a encolar
+        los pendientes o abandonados en curso que quedaron sin generar antes
+        del reinicio.
+        """
+        with app.app_context():
+            try:
+                ReportJob.purge_expired(app.config.get("REPORT_JOB_RETENTION", 86400))
+                stale_after = app.config.get("REPORT_JOB_TIMEOUT", 600)
+                for job_id in ReportJob.get_resumable_ids(stale_after):
+                    self.submit(job_id)
+            except SQLAlchemyError as e:
+                # Base sin migrar o bloqueada: los pedidos esperan al próximo inicio
+                db.session.rollback()
+                print(f"⚠️  Error retomando pedidos de reportes: {e}")
+            finally:
+                db.session.remove()
+
+    def submit(self, job_id: int) -> None:
+        """
+        Encola la generación de un pedido si no está en curso en este proceso.
+
+        Con REPORT_WORKERS = 0 se genera en el hilo actual.
+        """
+        config = current_app.config
+        max_workers = config.get("REPORT_WORKERS", 2)
+        output_dir = config["REPORT_JOBS_DIR"]
+        stale_after = config.get("REPORT_JOB_TIMEOUT", 600)
+        retention = config.get("REPORT_JOB_RETENTION", 86400)
+
+        if max_workers <= 0:
+            ReportJob.run(job_id, output_dir, stale_after)
+            ReportJob.purge_expired(retention)
+            return
+
+        app = current_app._get_current_object()
+        with self._lock:
+            if job_id in self._in_flight:
+                return
+            self._in_flight.add(job_id)
+            future = self._get_executor(max_workers).submit(
+                self._run, app, job_id, output_dir, stale_after, retention
+            )
+        future.add_done_callback(lambda _: self._finish(job_id))
+
+    @staticmethod
+    def _run(
+        app: Flask, job_id: int, output_dir: str, stale_after: float, retention: float
+    ) -> None:
+        with app.app_context():
+            try:
+                ReportJob.run(job_id, output_dir, stale_after)
+                ReportJob.purge_expired(retention)
+            finally:
+                db.session.remove()
+
+    def _finish(self, job_id: int) -> None:
+        with self._lock:
+            self._in_flight.discard(job_id)
+
+    def is_running(self, job_id: int) -> bool:
+        with self._lock:
+            return job_id in self._in_flight
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._in_flight.clear()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Instancia global del pool de reportes
+report_runner = ReportJobRunner()
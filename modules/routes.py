@@ -6,13 +6,17 @@ from typing import cast
 
 from flask import (
     Response,
+    current_app,
     flash,
+    has_request_context,
     jsonify,
     redirect,
     render_template,
     request,
+    send_file,
     send_from_directory,
     session,
+    stream_with_context,
     url_for,
 )
 from flask_login import current_user, login_required, login_user, logout_user
@@ -27,7 +31,13 @@ from modules.user import User
 from modules.user_notification import UserNotification
 from modules.admin_helper import AdminHelper
 from modules.analytics_generator import AnalyticsGenerator
+from modules.chart_cache import NO_IMAGE, chart_cache
+from modules.chart_renderer import chart_renderer
+from modules.data_version import DataVersion
 from modules.image_handler import ImageHandler
+from modules.report_cache import ReportCache, report_cache
+from modules.report_job import REPORT_MIMETYPES, ReportJob, ReportJobStatus
+from modules.report_runner import report_runner
 from modules.similarity import similarity_finder
 from modules.utils.decorators import (
     admin_required,
@@ -44,9 +54,15 @@ def load_user(user_id):
 
 @app.context_processor
 def inject_notifications():
-    if current_user.is_authenticated:
-        unread_count = UserNotification.get_unread_count(current_user.id)
-        return {"unread_notifications_count": unread_count}
+    # Contador ya cargado con el usuario: no agrega consultas. Los
+    # administradores no reciben notificaciones. Sin petición (reportes
+    # generados en segundo plano) no hay usuario.
+    if (
+        has_request_context()
+        and current_user.is_authenticated
+        and not isinstance(current_user, AdminUser)
+    ):
+        return {"unread_notifications_count": current_user.unread_notifications_count}
     return {"unread_notifications_count": 0}
 
 
@@ -186,15 +202,23 @@ def admin_help():
 @admin_required
 def admin_claims_list():
     admin_user = cast(AdminUser, current_user)
-    claims = AdminHelper.get_claims_for_admin(admin_user)
-    supporters_ids_by_claim = {
-        claim.id: [supporter.user_id for supporter in claim.supporters]
-        for claim in claims
-    }
+    cursor = request.args.get("cursor")
+    claims, next_cursor = AdminHelper.get_claims_for_admin_page(
+        admin_user,
+        cursor=cursor,
+        page_size=current_app.config["CLAIMS_PAGE_SIZE"],
+    )
+    supporters_ids_by_claim = Claim.get_supporter_ids_by_claim(
+        [claim.id for claim in claims]
+    )
     return render_template(
         "admin/claims_list.html",
         claims=claims,
         supporters_ids_by_claim=supporters_ids_by_claim,
+        next_url=(
+            url_for("admin.claims_list", cursor=next_cursor) if next_cursor else None
+        ),
+        first_page_url=url_for("admin.claims_list") if cursor else None,
     )
 
 
@@ -231,19 +255,64 @@ def admin_analytics():
     departments = Department.get_for_admin(admin_user)
     department_ids = [d.id for d in departments]
 
-    analytics_data = AnalyticsGenerator.get_full_analytics(department_ids)
+    # Los gráficos se sirven aparte (cacheables), la página solo lleva sus URLs
+    analytics_data = AnalyticsGenerator.get_full_analytics(
+        department_ids, inline_charts=False
+    )
+
+    def chart_url(kind: str, key: str | None) -> str | None:
+        if key is None:
+            return None
+        return url_for("admin.analytics_chart", kind=kind, key=key)
 
     return render_template(
         "admin/analytics.html",
         stats=analytics_data["stats"],
-        pie_chart=analytics_data["pie_chart"],
-        wordcloud=analytics_data["wordcloud"],
+        pie_chart_url=chart_url("pie", analytics_data["pie_chart_key"]),
+        wordcloud_url=chart_url("wordcloud", analytics_data["wordcloud_key"]),
         keywords=analytics_data["keywords"],
         departments=departments,
         is_technical_secretary=admin_user.is_technical_secretary,
     )
 
 
+@app.route("/admin/analytics/charts/<kind>/<key>.png", endpoint="admin.analytics_chart")
+@admin_role_required(AdminRole.DEPARTMENT_HEAD, AdminRole.TECHNICAL_SECRETARY)
+def admin_analytics_chart(kind: str, key: str):
+    if kind not in ("pie", "wordcloud"):
+        return Response(status=404)
+
+    # Solo se sirven gráficos de los departamentos del administrador
+    admin_user = cast(AdminUser, current_user)
+    department_ids = [d.id for d in Department.get_for_admin(admin_user)]
+    if not key.startswith(f"{chart_cache.make_scope(department_ids)}-"):
+        return Response(status=404)
+
+    # La clave es la huella de los datos: si cambió, la imagen ya no vale
+    if request.if_none_match.contains(key):
+        return Response(status=304, headers={"ETag": f'"{key}"'})
+
+    png = chart_cache.get(key)
+    if png is None and chart_renderer.status(key) == chart_renderer.MISSING:
+        # Fuera de caché (reinicio o desalojo): se redibuja si los datos coinciden
+        data = AnalyticsGenerator.get_chart_data(kind, department_ids)
+        if chart_renderer.submit(kind, data, department_ids) != key:
+            return Response(status=404)
+        png = chart_cache.get(key)
+
+    if png is None:
+        # Todavía se está dibujando: la página vuelve a consultar
+        return Response(status=202, headers={"Retry-After": "1"})
+    if png == NO_IMAGE:
+        return Response(status=204)
+
+    response = Response(png, mimetype="image/png")
+    response.set_etag(key)
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config["ANALYTICS_CHART_MAX_AGE"]
+    return response
+
+
 @app.route("/admin/reports", endpoint="admin.reports")
 @admin_role_required(AdminRole.DEPARTMENT_HEAD, AdminRole.TECHNICAL_SECRETARY)
 def admin_reports():
@@ -254,6 +323,80 @@ def admin_reports():
         "admin/reports.html",
         departments=departments,
         is_technical_secretary=admin_user.is_technical_secretary,
+        jobs=ReportJob.get_recent_for_admin(admin_user),
+    )
+
+
+def _report_job_json(job: ReportJob) -> dict:
+    return {
+        "id": job.id,
+        "format": job.report_format,
+        "status": job.status.name.lower(),
+        "status_label": job.status.value,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+        "download_url": (
+            url_for("admin.download_report_job", job_id=job.id)
+            if job.status == ReportJobStatus.DONE
+            else None
+        ),
+    }
+
+
+@app.route("/admin/reports/jobs", methods=["POST"], endpoint="admin.create_report_job")
+@admin_role_required(AdminRole.DEPARTMENT_HEAD, AdminRole.TECHNICAL_SECRETARY)
+def admin_create_report_job():
+    admin_user = cast(AdminUser, current_user)
+    department_ids = [d.id for d in Department.get_for_admin(admin_user)]
+
+    job, error = ReportJob.enqueue(
+        request.form.get("format", "html"),
+        department_ids,
+        admin_user.is_technical_secretary,
+        admin_user.id,
+    )
+    if error:
+        flash(error, "error")
+        return redirect(url_for("admin.reports"))
+
+    # Los pedidos idénticos comparten el mismo trabajo
+    report_runner.submit(job.id)
+    flash("El reporte se está generando. Aparecerá en la lista al terminar.", "info")
+    return redirect(url_for("admin.reports"))
+
+
+@app.route("/admin/reports/jobs/<int:job_id>", endpoint="admin.report_job_status")
+@admin_role_required(AdminRole.DEPARTMENT_HEAD, AdminRole.TECHNICAL_SECRETARY)
+def admin_report_job_status(job_id: int):
+    job = ReportJob.get_for_admin(job_id, cast(AdminUser, current_user))
+    if job is None:
+        return jsonify({"error": "Reporte no encontrado"}), 404
+    return jsonify(_report_job_json(job))
+
+
+@app.route(
+    "/admin/reports/jobs/<int:job_id>/download",
+    endpoint="admin.download_report_job",
+)
+@admin_role_required(AdminRole.DEPARTMENT_HEAD, AdminRole.TECHNICAL_SECRETARY)
+def admin_download_report_job(job_id: int):
+    job = ReportJob.get_for_admin(job_id, cast(AdminUser, current_user))
+    if job is None:
+        flash("Reporte no encontrado", "error")
+        return redirect(url_for("admin.reports"))
+    if job.status != ReportJobStatus.DONE or not os.path.exists(job.file_path):
+        flash("El reporte todavía no está disponible", "error")
+        return redirect(url_for("admin.reports"))
+
+    return send_file(
+        job.file_path,
+        mimetype=job.mimetype,
+        as_attachment=True,
+        download_name=(
+            f"reporte_reclamos_{job.created_at.strftime('%Y%m%d_%H%M%S')}"
+            f".{job.report_format}"
+        ),
     )
 
 
@@ -266,24 +409,51 @@ def admin_download_report():
     departments = Department.get_for_admin(admin_user)
     department_ids = [d.id for d in departments]
 
-    report_format = request.args.get("format", "html")
+    report_format = "pdf" if request.args.get("format") == "pdf" else "html"
     report = create_report(
         report_format, department_ids, admin_user.is_technical_secretary
     )
+    filename = f"reporte_reclamos_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    # La versión se lee antes de generar: si un reclamo cambia mientras tanto,
+    # el próximo pedido ya no encuentra este reporte
+    cache_key = ReportCache.make_key(
+        report_format,
+        department_ids,
+        admin_user.is_technical_secretary,
+        DataVersion.get(),
+    )
+    cached = report_cache.open(cache_key)
+    if cached is not None:
+        return send_file(
+            cached,
+            mimetype=REPORT_MIMETYPES[report_format],
+            as_attachment=True,
+            download_name=f"{filename}.{report_format}",
+        )
+
+    if report_format != "pdf":
+        # El HTML se envía a medida que se genera: el primer byte sale de
+        # inmediato y la memoria no depende de la cantidad de reclamos
+        chunks = report_cache.store_stream(cache_key, report.stream())
+        return Response(
+            stream_with_context(chunks),
+            mimetype="text/html",
+            headers={"Content-Disposition": f"attachment; filename={filename}.html"},
+        )
+
     content = report.generate()
-    content_type = "application/pdf" if report_format == "pdf" else "text/html"
     if content is None:
         flash(
             "No se pudo generar el reporte.",
             "error",
         )
         return redirect(url_for("admin.reports"))
+    report_cache.put(cache_key, content)
     return Response(
         content,
-        mimetype=content_type,
-        headers={
-            f"Content-Disposition": f"attachment; filename=reporte_reclamos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        },
+        mimetype="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}.pdf"},
     )
 
 
@@ -358,18 +528,31 @@ def claims_list():
         except KeyError:
             flash("Estado de reclamo no válido", "error")
 
-    claims = Claim.get_all_with_filters(
-        department_filter=department_filter, status_filter=status_enum
+    cursor = request.args.get("cursor")
+    claims, next_cursor = Claim.get_all_with_filters_page(
+        department_filter=department_filter,
+        status_filter=status_enum,
+        cursor=cursor,
+        page_size=current_app.config["CLAIMS_PAGE_SIZE"],
     )
 
     departments = Department.get_all()
 
+    # Los filtros se mantienen al pasar de página
+    filters = {"department": department_filter, "status": status_filter}
+
     return render_template(
         "claims/list.html",
         claims=claims,
         departments=departments,
         selected_department=department_filter,
         selected_status=status_filter,
+        next_url=(
+            url_for("claims.list", cursor=next_cursor, **filters)
+            if next_cursor
+            else None
+        ),
+        first_page_url=url_for("claims.list", **filters) if cursor else None,
     )
 
 
@@ -558,8 +741,20 @@ def claims_update_status(id: int):
 @app.route("/users/me/claims", methods=["GET"], endpoint="users.my_claims")
 @end_user_required
 def users_my_claims():
-    claims = Claim.get_by_user(current_user.id)
-    return render_template("users/my_claims.html", claims=claims)
+    cursor = request.args.get("cursor")
+    claims, next_cursor = Claim.get_by_user_page(
+        current_user.id,
+        cursor=cursor,
+        page_size=current_app.config["CLAIMS_PAGE_SIZE"],
+    )
+    return render_template(
+        "users/my_claims.html",
+        claims=claims,
+        next_url=(
+            url_for("users.my_claims", cursor=next_cursor) if next_cursor else None
+        ),
+        first_page_url=url_for("users.my_claims") if cursor else None,
+    )
 
 
 @app.route(
@@ -574,9 +769,53 @@ def users_my_supported_claims():
 @app.route("/users/me/notifications", methods=["GET"], endpoint="users.notifications")
 @end_user_required
 def users_notifications():
-    pending_notifications = UserNotification.get_pending_for_user(current_user.id)
+    cursor = request.args.get("cursor")
+    notifications, next_cursor = UserNotification.get_feed_for_user(
+        current_user.id,
+        cursor=cursor,
+        page_size=current_app.config["NOTIFICATIONS_PAGE_SIZE"],
+    )
     return render_template(
-        "users/notifications.html", notifications=pending_notifications
+        "users/notifications.html",
+        notifications=notifications,
+        next_url=(
+            url_for("users.notifications", cursor=next_cursor) if next_cursor else None
+        ),
+        first_page_url=url_for("users.notifications") if cursor else None,
+    )
+
+
+@app.route(
+    "/users/me/notifications/feed",
+    methods=["GET"],
+    endpoint="users.notifications_feed",
+)
+@end_user_required
+def users_notifications_feed():
+    notifications, next_cursor = UserNotification.get_feed_for_user(
+        current_user.id,
+        cursor=request.args.get("cursor"),
+        page_size=request.args.get(
+            "page_size", current_app.config["NOTIFICATIONS_PAGE_SIZE"], type=int
+        ),
+    )
+    return jsonify(
+        {
+            "notifications": [
+                {
+                    "id": row.id,
+                    "claim_id": row.claim_id,
+                    "detail": row.detail_preview,
+                    "detail_truncated": bool(row.detail_truncated),
+                    "old_status": row.old_status.value,
+                    "new_status": row.new_status.value,
+                    "changed_by": row.changed_by_email,
+                    "changed_at": row.changed_at.isoformat(),
+                }
+                for row in notifications
+            ],
+            "next_cursor": next_cursor,
+        }
     )
 
 
@@ -609,3 +848,20 @@ def users_mark_all_notifications_read():
     count = UserNotification.mark_all_as_read_for_user(current_user.id)
     flash(f"Se marcaron {count} notificaciones como leídas", "success")
     return redirect(request.referrer or url_for("users.notifications"))
+
+
+@app.route(
+    "/users/me/notifications/mark-read",
+    methods=["POST"],
+    endpoint="users.mark_notifications_read",
+)
+@end_user_required
+def users_mark_notifications_read():
+    notification_ids = request.form.getlist("notification_ids", type=int)
+    if not notification_ids:
+        flash("No se seleccionaron notificaciones", "error")
+        return redirect(url_for("users.notifications"))
+
+    count = UserNotification.mark_as_read_by_ids(current_user.id, notification_ids)
+    flash(f"Se marcaron {count} notificaciones como leídas", "success")
+    return redirect(url_for("users.notifications"))
@@ -1,31 +1,733 @@
 """
 Detector de reclamos similares usando TF-IDF y similitud coseno.
+
+Los vectores de los reclamos pendientes se guardan en un índice persistente
+(vocabulario ajustado + matriz dispersa) que se actualiza incrementalmente
+cuando cambia el conjunto de pendientes. Cada consulta solo vectoriza el texto
+nuevo y calcula un producto disperso contra la matriz.
+
+La búsqueda de vecinos es intercambiable (NeighborBackend): la exacta puntúa
+todas las filas; la aproximada (RandomProjectionBackend) usa firmas de
+proyecciones aleatorias por bandas para elegir candidatos, que luego se
+puntúan con el coseno exacto (mismo umbral y límite).
 """
 
 from __future__ import annotations
+import heapq
+import itertools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
+
+import joblib
+import numpy as np
+from flask import current_app
+from scipy.sparse import csr_matrix, vstack
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from modules.utils.constants import SPANISH_STOPWORDS
-from modules.utils.text import normalize_text
+from sqlalchemy import case
+from modules.utils.text import detail_tokens
 
 if TYPE_CHECKING:
     from modules.claim import Claim
 
 
-class SimilarityFinder:
-    """Buscador de reclamos similares"""
+class NeighborBackend(ABC):
+    """Estrategia de selección de candidatos sobre las filas del índice"""
 
-    def __init__(self):
-        """Inicializa el buscador con vectorizador TF-IDF"""
-        self.vectorizer = TfidfVectorizer(
-            stop_words=SPANISH_STOPWORDS,
+    name: str = ""
+
+    def config(self) -> tuple:
+        """Parámetros que identifican la configuración del backend"""
+        return (self.name,)
+
+    def clone(self) -> "NeighborBackend":
+        """Crea un backend vacío con la misma configuración (uno por shard)"""
+        return type(self)()
+
+    @abstractmethod
+    def rebuild(self, matrix: csr_matrix) -> None:
+        """Reconstruye las estructuras auxiliares para todas las filas"""
+        pass
+
+    @abstractmethod
+    def add(self, vectors: csr_matrix) -> None:
+        """Registra filas agregadas al final de la matriz"""
+        pass
+
+    @abstractmethod
+    def candidates(self, query_vector: csr_matrix) -> np.ndarray | None:
+        """
+        Retorna las filas candidatas para la consulta.
+
+        Returns:
+            Índices de filas, o None para evaluar todas las filas
+        """
+        pass
+
+
+class ExactBackend(NeighborBackend):
+    """Búsqueda exacta: todas las filas son candidatas"""
+
+    name = "exact"
+
+    def rebuild(self, matrix: csr_matrix) -> None:
+        pass
+
+    def add(self, vectors: csr_matrix) -> None:
+        pass
+
+    def candidates(self, query_vector: csr_matrix) -> np.ndarray | None:
+        return None
+
+
+class RandomProjectionBackend(NeighborBackend):
+    """
+    LSH por proyecciones aleatorias (SimHash) con bandas.
+
+    Cada vector se proyecta sobre bands * bits hiperplanos aleatorios; el signo
+    de cada proyección es un bit de la firma. Dos vectores con ángulo θ
+    coinciden en un bit con probabilidad 1 - θ/π, y son candidatos si coinciden
+    en todos los bits de al menos una banda.
+    """
+
+    name = "lsh"
+    # Filas agregadas sin ordenar antes de reordenar las bandas
+    MAX_UNSORTED = 1024
+
+    def __init__(self, bands: int = 32, bits: int = 8, seed: int = 0):
+        self.bands = bands
+        self.bits = bits
+        self.seed = seed
+        self._planes: np.ndarray | None = None
+        self._weights = 1 << np.arange(bits, dtype=np.int64)
+        self._keys = np.empty((0, bands), dtype=np.int64)
+        self._sorted_keys = np.empty((bands, 0), dtype=np.int64)
+        self._sorted_rows = np.empty((bands, 0), dtype=np.int64)
+
+    def config(self) -> tuple:
+        return (self.name, self.bands, self.bits, self.seed)
+
+    def clone(self) -> "RandomProjectionBackend":
+        return RandomProjectionBackend(self.bands, self.bits, self.seed)
+
+    def _ensure_planes(self, n_features: int) -> None:
+        """
+        Genera los hiperplanos para n_features. Con la misma semilla un shard
+        creado después del build obtiene los mismos planos que los demás.
+        """
+        if self._planes is None or self._planes.shape[0] != n_features:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((n_features, self.bands * self.bits))
+
+    def _signatures(self, vectors: csr_matrix) -> np.ndarray:
+        """Calcula la clave de cada banda: matriz (n_filas, bands)"""
+        self._ensure_planes(vectors.shape[1])
+        projected = np.asarray(vectors @ self._planes) > 0
+        bits = projected.reshape(vectors.shape[0], self.bands, self.bits)
+        return bits.astype(np.int64) @ self._weights
+
+    def _sort(self) -> None:
+        """Ordena las claves de cada banda para buscarlas con searchsorted"""
+        by_band = self._keys.T
+        self._sorted_rows = np.argsort(by_band, axis=1, kind="stable")
+        self._sorted_keys = np.take_along_axis(by_band, self._sorted_rows, axis=1)
+
+    def rebuild(self, matrix: csr_matrix) -> None:
+        self._ensure_planes(matrix.shape[1])
+        self._keys = self._signatures(matrix)
+        self._sort()
+
+    def add(self, vectors: csr_matrix) -> None:
+        self._keys = np.vstack([self._keys, self._signatures(vectors)])
+        if len(self._keys) - self._sorted_keys.shape[1] > self.MAX_UNSORTED:
+            self._sort()
+
+    def candidates(self, query_vector: csr_matrix) -> np.ndarray | None:
+        query_keys = self._signatures(query_vector)[0]
+        found = []
+        for band, key in enumerate(query_keys):
+            keys = self._sorted_keys[band]
+            start = np.searchsorted(keys, key, side="left")
+            end = np.searchsorted(keys, key, side="right")
+            found.append(self._sorted_rows[band, start:end])
+
+        # Filas agregadas desde el último ordenamiento
+        sorted_count = self._sorted_keys.shape[1]
+        unsorted = self._keys[sorted_count:]
+        if len(unsorted):
+            matches = (unsorted == query_keys).any(axis=1)
+            found.append(sorted_count + np.flatnonzero(matches))
+
+        return np.unique(np.concatenate(found))
+
+
+class SimilarityShard:
+    """Vectores de los reclamos pendientes de un departamento"""
+
+    # Compactar la matriz cuando más de la mitad de las filas están dadas de baja
+    MAX_DEAD_RATIO = 0.5
+
+    def __init__(self, backend: NeighborBackend):
+        self.backend = backend
+        self.matrix: csr_matrix | None = None
+        self.claim_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self.updated_at: np.ndarray = np.empty(0, dtype=np.float64)
+        self.active: np.ndarray = np.empty(0, dtype=bool)
+        self._row_by_claim: dict[int, int] = {}
+        self._buffer: list[csr_matrix] = []
+
+    def __len__(self) -> int:
+        return len(self._row_by_claim)
+
+    def __contains__(self, claim_id: int) -> bool:
+        return claim_id in self._row_by_claim
+
+    def build(
+        self, matrix: csr_matrix, claim_ids: np.ndarray, updated_at: np.ndarray
+    ) -> None:
+        """Carga todas las filas del departamento de una vez"""
+        self.matrix = matrix
+        self.claim_ids = claim_ids
+        self.updated_at = updated_at
+        self.active = np.ones(len(claim_ids), dtype=bool)
+        self._row_by_claim = {int(cid): i for i, cid in enumerate(claim_ids)}
+        self._buffer = []
+        self.backend.rebuild(matrix)
+
+    def add(self, claim_id: int, vector: csr_matrix, updated_at: float) -> None:
+        """Agrega una fila al final (se incorpora a la matriz en la próxima consulta)"""
+        self._row_by_claim[claim_id] = len(self.claim_ids)
+        self._buffer.append(vector)
+        self.claim_ids = np.append(self.claim_ids, claim_id)
+        self.updated_at = np.append(self.updated_at, updated_at)
+        self.active = np.append(self.active, True)
+        self.backend.add(vector)
+
+    def remove(self, claim_id: int) -> csr_matrix | None:
+        """
+        Da de baja un reclamo.
+
+        Returns:
+            El vector del reclamo (para moverlo a otro shard) o None si no estaba
+        """
+        row = self._row_by_claim.pop(claim_id, None)
+        if row is None:
+            return None
+        self.active[row] = False
+        return self._vector(row)
+
+    def touch(self, claim_id: int, updated_at: float) -> None:
+        """Actualiza la marca updated_at de un reclamo"""
+        self.updated_at[self._row_by_claim[claim_id]] = updated_at
+
+    def state(self) -> dict[int, float]:
+        """Retorna {claim_id: updated_at} de las filas activas"""
+        return {
+            cid: float(self.updated_at[row]) for cid, row in self._row_by_claim.items()
+        }
+
+    def last_update(self) -> float:
+        return float(self.updated_at[self.active].max())
+
+    def _vector(self, row: int) -> csr_matrix:
+        stored = 0 if self.matrix is None else self.matrix.shape[0]
+        if row < stored:
+            return self.matrix[row]
+        return self._buffer[row - stored]
+
+    def _flush_buffer(self) -> None:
+        """Incorpora a la matriz las filas agregadas incrementalmente"""
+        if self._buffer:
+            blocks = [self.matrix] if self.matrix is not None else []
+            self.matrix = csr_matrix(vstack(blocks + self._buffer))
+            self._buffer = []
+
+        dead = len(self.active) - len(self._row_by_claim)
+        if dead and dead > len(self.active) * self.MAX_DEAD_RATIO:
+            keep = np.flatnonzero(self.active)
+            self.build(self.matrix[keep], self.claim_ids[keep], self.updated_at[keep])
+
+    def query(
+        self,
+        query_vector: csr_matrix,
+        threshold: float,
+        limit: int,
+        exclude_claim_id: int | None,
+    ) -> list[tuple[float, int]]:
+        """
+        Busca los reclamos del shard más similares al vector de consulta.
+
+        Returns:
+            Lista de tuplas (similarity_score, claim_id) de hasta `limit` elementos
+        """
+        if not self._row_by_claim:
+            return []
+
+        self._flush_buffer()
+        rows = self.backend.candidates(query_vector)
+        if rows is None:
+            rows = np.arange(self.matrix.shape[0])
+            vectors = self.matrix
+        else:
+            rows = rows[self.active[rows]]
+            vectors = self.matrix[rows]
+
+        # Los vectores TF-IDF están normalizados (L2): el producto es el coseno
+        scores = (vectors @ query_vector.T).toarray().ravel()
+
+        mask = self.active[rows] & (scores > threshold)
+        if exclude_claim_id is not None:
+            mask &= self.claim_ids[rows] != exclude_claim_id
+
+        selected = np.flatnonzero(mask)
+        if len(selected) > limit:
+            selected = selected[np.argpartition(-scores[selected], limit - 1)[:limit]]
+
+        claim_ids = self.claim_ids[rows[selected]]
+        return [(float(scores[i]), int(cid)) for i, cid in zip(selected, claim_ids)]
+
+
+class SimilarityIndex:
+    """
+    Índice TF-IDF de los reclamos pendientes, particionado por departamento.
+
+    Todos los shards comparten el vocabulario; una consulta filtrada toca un
+    solo shard y una sin filtro se reparte entre todos en un pool de hilos.
+    """
+
+    # Reajustar el vocabulario cuando las altas incrementales superan a los
+    # documentos usados en el último ajuste (el IDF queda desactualizado)
+    REFIT_GROWTH = 1.0
+
+    def __init__(self, backend: NeighborBackend | None = None):
+        self.backend: NeighborBackend = backend or ExactBackend()
+        self.vectorizer: TfidfVectorizer = SimilarityIndex._new_vectorizer()
+        self.is_fitted: bool = False
+        self.fitted_size: int = 0
+        self.added_since_fit: int = 0
+        self.shards: dict[int, SimilarityShard] = {}
+        self._department_by_claim: dict[int, int] = {}
+        self.last_synced: float = time.monotonic()
+
+    @staticmethod
+    def _new_vectorizer() -> TfidfVectorizer:
+        return TfidfVectorizer(
+            # Claim.detail_tokens ya viene normalizado y sin stopwords
+            tokenizer=str.split,
+            token_pattern=None,
+            lowercase=False,
             min_df=1,
             ngram_range=(1, 2),  # Unigramas y bigramas
             max_features=1000,
-            preprocessor=normalize_text,  # Normalizar texto antes de vectorizar
         )
 
+    def __len__(self) -> int:
+        return len(self._department_by_claim)
+
+    def __contains__(self, claim_id: int) -> bool:
+        return claim_id in self._department_by_claim
+
+    @property
+    def needs_refit(self) -> bool:
+        """Indica si el vocabulario debe volver a ajustarse"""
+        if not self.is_fitted:
+            return self.added_since_fit > 0
+        return self.added_since_fit > self.fitted_size * self.REFIT_GROWTH
+
+    def fingerprint(self) -> tuple[int, float | None]:
+        """
+        Huella del contenido indexado: (cantidad, último updated_at).
+
+        Returns:
+            Tupla comparable con SimilarityFinder._db_fingerprint
+        """
+        if not self._department_by_claim:
+            return 0, None
+        return len(self), max(
+            shard.last_update() for shard in self.shards.values() if len(shard)
+        )
+
+    def _shard(self, department_id: int) -> SimilarityShard:
+        shard = self.shards.get(department_id)
+        if shard is None:
+            shard = SimilarityShard(self.backend.clone())
+            self.shards[department_id] = shard
+        return shard
+
+    # ── Construcción ─────────────────────────────────────────────────
+
+    def build(self, rows: list[tuple[int, int, str, float]]) -> None:
+        """
+        Ajusta el vocabulario y vectoriza todos los reclamos.
+
+        Args:
+            rows: Tuplas (claim_id, department_id, detail_tokens, updated_at)
+        """
+        self.__init__(self.backend)
+        if not rows:
+            return
+
+        try:
+            matrix = csr_matrix(self.vectorizer.fit_transform([row[2] for row in rows]))
+        except ValueError:
+            # Vocabulario vacío: el índice queda sin ajustar
+            self.vectorizer = SimilarityIndex._new_vectorizer()
+            return
+
+        self.is_fitted = True
+        self.fitted_size = len(rows)
+        claim_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        department_ids = np.array([row[1] for row in rows], dtype=np.int64)
+        updated_at = np.array([row[3] for row in rows], dtype=np.float64)
+
+        for department_id in np.unique(department_ids):
+            selected = np.flatnonzero(department_ids == department_id)
+            self._shard(int(department_id)).build(
+                matrix[selected], claim_ids[selected], updated_at[selected]
+            )
+        self._department_by_claim = {
+            int(cid): int(dept_id) for cid, dept_id in zip(claim_ids, department_ids)
+        }
+
+    def set_backend(self, backend: NeighborBackend) -> None:
+        """Reemplaza el backend de búsqueda y lo construye sobre cada shard"""
+        self.backend = backend
+        for shard in self.shards.values():
+            shard._flush_buffer()
+            shard.backend = backend.clone()
+            if shard.matrix is not None:
+                shard.backend.rebuild(shard.matrix)
+
+    # ── Actualización incremental ────────────────────────────────────
+
+    def add(
+        self, claim_id: int, department_id: int, tokens: str, updated_at: float
+    ) -> None:
+        """Agrega (o reemplaza) un reclamo usando el vocabulario actual"""
+        self.remove(claim_id)
+        self.added_since_fit += 1
+        if not self.is_fitted:
+            # Sin vocabulario no se puede vectorizar: queda pendiente de reajuste
+            return
+
+        vector = csr_matrix(self.vectorizer.transform([tokens]))
+        self._shard(department_id).add(claim_id, vector, updated_at)
+        self._department_by_claim[claim_id] = department_id
+
+    def remove(self, claim_id: int) -> None:
+        """Da de baja un reclamo del índice (si estaba indexado)"""
+        department_id = self._department_by_claim.pop(claim_id, None)
+        if department_id is not None:
+            self.shards[department_id].remove(claim_id)
+
+    def move(self, claim_id: int, department_id: int, updated_at: float) -> None:
+        """
+        Actualiza el departamento de un reclamo indexado, trasladando su
+        vector al shard destino sin volver a vectorizarlo.
+        """
+        current = self._department_by_claim.get(claim_id)
+        if current is None:
+            return
+        if current == department_id:
+            self.shards[current].touch(claim_id, updated_at)
+            return
+
+        vector = self.shards[current].remove(claim_id)
+        self._shard(department_id).add(claim_id, vector, updated_at)
+        self._department_by_claim[claim_id] = department_id
+
+    def state(self) -> dict[int, tuple[int, float]]:
+        """Retorna {claim_id: (department_id, updated_at)} de los reclamos indexados"""
+        return {
+            claim_id: (department_id, updated_at)
+            for department_id, shard in self.shards.items()
+            for claim_id, updated_at in shard.state().items()
+        }
+
+    # ── Consulta ─────────────────────────────────────────────────────
+
+    def query(
+        self,
+        text: str,
+        department_id: int | None = None,
+        threshold: float = 0.25,
+        limit: int = 5,
+        exclude_claim_id: int | None = None,
+    ) -> list[tuple[int, float]]:
+        """
+        Busca los reclamos indexados más similares al texto.
+
+        Returns:
+            Lista de tuplas (claim_id, similarity_score) ordenadas por similitud descendente
+        """
+        if not self.is_fitted or not self._department_by_claim:
+            return []
+
+        query_vector = self.vectorizer.transform([detail_tokens(text)])
+        if query_vector.nnz == 0:
+            return []
+
+        if department_id is not None:
+            shards = (
+                [self.shards[department_id]] if department_id in self.shards else []
+            )
+        else:
+            shards = [shard for shard in self.shards.values() if len(shard)]
+
+        def search(shard: SimilarityShard) -> list[tuple[float, int]]:
+            return shard.query(query_vector, threshold, limit, exclude_claim_id)
+
+        if len(shards) > 1:
+            partial_results = list(_get_executor().map(search, shards))
+        else:
+            partial_results = [search(shard) for shard in shards]
+
+        # Top-k global: mayor similitud primero (y más recientes ante empates)
+        best = heapq.nlargest(limit, itertools.chain.from_iterable(partial_results))
+        return [(claim_id, score) for score, claim_id in best]
+
+    # ── Persistencia ─────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        """Guarda el índice en disco"""
+        for shard in self.shards.values():
+            shard._flush_buffer()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str | None) -> "SimilarityIndex | None":
+        """Carga un índice desde disco (None si no existe o no es válido)"""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            index = joblib.load(path)
+        except Exception:
+            return None
+        if not isinstance(index, SimilarityIndex):
+            return None
+        # Forzar la comparación de huellas en la primera consulta
+        index.last_synced = float("-inf")
+        return index
+
+
+# Pool compartido para repartir las consultas entre shards
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=min(8, os.cpu_count() or 1),
+                thread_name_prefix="similarity",
+            )
+        return _executor
+
+
+class SimilarityFinder:
+    """Buscador de reclamos similares"""
+
+    EXTENSION_KEY = "similarity_index"
+
+    def __init__(self):
+        """Inicializa el buscador (el índice se crea por aplicación)"""
+        self._lock = threading.RLock()
+
+    # ── Gestión del índice ───────────────────────────────────────────
+
+    @staticmethod
+    def _new_backend() -> NeighborBackend:
+        """Crea el backend de búsqueda según SIMILARITY_BACKEND"""
+        config = current_app.config
+        if config.get("SIMILARITY_BACKEND", "exact") == RandomProjectionBackend.name:
+            return RandomProjectionBackend(
+                bands=config.get("SIMILARITY_LSH_BANDS", 32),
+                bits=config.get("SIMILARITY_LSH_BITS", 8),
+            )
+        return ExactBackend()
+
+    @staticmethod
+    def _pending_query():
+        from modules.claim import Claim, ClaimStatus
+        from modules.config import db
+
+        return db.session.query(Claim).filter(Claim.status == ClaimStatus.PENDING)
+
+    @staticmethod
+    def _db_fingerprint() -> tuple[int, float | None]:
+        """Huella del conjunto de pendientes en la base: (cantidad, último updated_at)"""
+        from modules.claim import Claim
+        from sqlalchemy import func
+
+        count, last_update = (
+            SimilarityFinder._pending_query()
+            .with_entities(func.count(Claim.id), func.max(Claim.updated_at))
+            .one()
+        )
+        return int(count), last_update.timestamp() if last_update else None
+
+    @staticmethod
+    def _token_columns() -> tuple:
+        """
+        Columnas (detail_tokens, detail). El detalle completo solo se trae
+        para filas sin tokens precalculados (anteriores al backfill).
+        """
+        from modules.claim import Claim
+
+        return Claim.detail_tokens, case(
+            (Claim.detail_tokens.is_(None), Claim.detail), else_=None
+        )
+
+    @staticmethod
+    def _row_tokens(tokens: str | None, detail: str | None) -> str:
+        return tokens if tokens is not None else detail_tokens(detail)
+
+    def rebuild(self, save: bool = False) -> SimilarityIndex:
+        """
+        Reconstruye el índice desde cero con todos los reclamos pendientes.
+
+        Args:
+            save: Si es True, guarda el índice en SIMILARITY_INDEX_PATH
+
+        Returns:
+            El índice reconstruido
+        """
+        from modules.claim import Claim
+
+        rows = (
+            SimilarityFinder._pending_query()
+            .with_entities(
+                Claim.id,
+                Claim.department_id,
+                *SimilarityFinder._token_columns(),
+                Claim.updated_at,
+            )
+            .order_by(Claim.id)
+            .all()
+        )
+        index = SimilarityIndex(SimilarityFinder._new_backend())
+        index.build(
+            [
+                (
+                    int(claim_id),
+                    int(dept_id),
+                    SimilarityFinder._row_tokens(tokens, detail),
+                    updated_at.timestamp(),
+                )
+                for claim_id, dept_id, tokens, detail, updated_at in rows
+            ]
+        )
+        with self._lock:
+            current_app.extensions[self.EXTENSION_KEY] = index
+            if save:
+                index.save(current_app.config["SIMILARITY_INDEX_PATH"])
+        return index
+
+    def _synchronize(self, index: SimilarityIndex) -> None:
+        """
+        Aplica al índice los cambios hechos por fuera de este proceso
+        (otros workers, scripts) comparando IDs, departamentos y updated_at.
+        """
+        from modules.claim import Claim
+
+        live = {
+            int(claim_id): (int(dept_id), updated_at.timestamp())
+            for claim_id, dept_id, updated_at in SimilarityFinder._pending_query()
+            .with_entities(Claim.id, Claim.department_id, Claim.updated_at)
+            .all()
+        }
+        indexed = index.state()
+
+        for claim_id in indexed.keys() - live.keys():
+            index.remove(claim_id)
+
+        to_vectorize = []
+        for claim_id, (dept_id, updated_at) in live.items():
+            current = indexed.get(claim_id)
+            if current is None:
+                to_vectorize.append(claim_id)
+            elif current != (dept_id, updated_at):
+                index.move(claim_id, dept_id, updated_at)
+
+        for start in range(0, len(to_vectorize), 500):
+            chunk = to_vectorize[start : start + 500]
+            details = (
+                SimilarityFinder._pending_query()
+                .with_entities(Claim.id, *SimilarityFinder._token_columns())
+                .filter(Claim.id.in_(chunk))
+            )
+            for claim_id, tokens, detail in details:
+                index.add(
+                    int(claim_id),
+                    live[claim_id][0],
+                    SimilarityFinder._row_tokens(tokens, detail),
+                    live[claim_id][1],
+                )
+
+    def _get_index(self) -> SimilarityIndex:
+        """Retorna el índice de la aplicación actual, sincronizado con la base"""
+        with self._lock:
+            index = current_app.extensions.get(self.EXTENSION_KEY)
+            if index is None:
+                index = SimilarityIndex.load(
+                    current_app.config.get("SIMILARITY_INDEX_PATH")
+                )
+                if index is None:
+                    return self.rebuild()
+                backend = SimilarityFinder._new_backend()
+                if index.backend.config() != backend.config():
+                    index.set_backend(backend)
+                current_app.extensions[self.EXTENSION_KEY] = index
+
+            # Los cambios de este proceso llegan por sync_claim; los externos se
+            # detectan comparando huellas, como máximo una vez por intervalo
+            interval = current_app.config.get("SIMILARITY_SYNC_INTERVAL", 0)
+            if time.monotonic() - index.last_synced >= interval:
+                if index.fingerprint() != SimilarityFinder._db_fingerprint():
+                    self._synchronize(index)
+                index.last_synced = time.monotonic()
+            if index.needs_refit:
+                return self.rebuild()
+            return index
+
+    def sync_claim(self, claim: "Claim") -> None:
+        """
+        Refleja en el índice el estado actual de un reclamo.
+        Se llama después de crear, cambiar de estado o derivar un reclamo.
+
+        Args:
+            claim: Reclamo ya confirmado en la base de datos
+        """
+        from modules.claim import ClaimStatus
+
+        with self._lock:
+            index = current_app.extensions.get(self.EXTENSION_KEY)
+            if index is None:
+                # Todavía no se construyó: se construirá en la primera consulta
+                return
+
+            if claim.status != ClaimStatus.PENDING:
+                index.remove(claim.id)
+            elif claim.id in index:
+                index.move(claim.id, claim.department_id, claim.updated_at.timestamp())
+            else:
+                index.add(
+                    claim.id,
+                    claim.department_id,
+                    " ".join(claim.tokens),
+                    claim.updated_at.timestamp(),
+                )
+
+    # ── Búsqueda ─────────────────────────────────────────────────────
+
     def find_similar_claims(
         self,
         text: str,
@@ -52,39 +754,31 @@ class SimilarityFinder:
 
         from modules.claim import Claim
 
-        claims = Claim.get_pending(department_id_filter=department_id)
-
-        # Excluir reclamo específico si se proporciona
-        if exclude_claim_id is not None:
-            claims = [c for c in claims if c.id != exclude_claim_id]
-
-        if not claims:
-            return []
-
-        # Crear matriz TF-IDF con el texto nuevo + reclamos existentes
-        texts = [text] + [c.detail for c in claims]
+        index = self._get_index()
+        with self._lock:
+            hits = index.query(
+                text,
+                department_id=department_id,
+                threshold=threshold,
+                limit=limit,
+                exclude_claim_id=exclude_claim_id,
+            )
 
-        try:
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-        except ValueError:
-            # Si hay error en la vectorización (ej: vocabulario vacío)
+        if not hits:
             return []
 
-        # Calcular similitud coseno entre el texto nuevo y todos los existentes
-        similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()  # type: ignore
-
-        # Filtrar por umbral y crear lista de tuplas
-        similar = [
-            (claims[i], float(sim))
-            for i, sim in enumerate(similarities)
-            if sim > threshold
+        claims_by_id = {
+            claim.id: claim
+            for claim in SimilarityFinder._pending_query().filter(
+                Claim.id.in_([claim_id for claim_id, _ in hits])
+            )
+        }
+        return [
+            (claims_by_id[claim_id], score)
+            for claim_id, score in hits
+            if claim_id in claims_by_id
         ]
 
-        # Ordenar por similitud descendente
-        similar.sort(key=lambda x: x[1], reverse=True)
-
-        return similar[:limit]
-
 
 # Instancia global del buscador de similitud
 similarity_finder = SimilarityFinder()
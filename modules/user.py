@@ -29,6 +29,11 @@ class User(UserMixin, db.Model, ABC, metaclass=ABCModelMeta):
     # Columna discriminadora para herencia
     user_type: Mapped[str] = mapped_column(nullable=False)
 
+    # Notificaciones pendientes (contador mantenido por UserNotification)
+    unread_notifications_count: Mapped[int] = mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
+
     __mapper_args__ = {"polymorphic_on": user_type, "polymorphic_identity": "user"}
 
     def set_password(self, password: str):
@@ -1,15 +1,30 @@
+from collections import Counter
 from datetime import datetime as Datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import (
+    ForeignKey,
+    Index,
+    bindparam,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship, joinedload
 
 from modules.config import db
+from modules.utils.pagination import keyset_page
 
 if TYPE_CHECKING:
     from modules.claim_status_history import ClaimStatusHistory
     from modules.user import User
 
+# Caracteres del detalle del reclamo que muestra el listado de notificaciones
+DETAIL_PREVIEW_LENGTH = 100
+
 
 class UserNotification(db.Model):
     """
@@ -18,6 +33,15 @@ class UserNotification(db.Model):
     """
 
     __tablename__ = "user_notification"
+    __table_args__ = (
+        # Pendientes de un usuario (read_at IS NULL) ordenadas por fecha
+        Index(
+            "ix_user_notification_user_read_created",
+            "user_id",
+            "read_at",
+            "created_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     read_at: Mapped[Datetime | None] = mapped_column(nullable=True, default=None)
@@ -53,6 +77,56 @@ class UserNotification(db.Model):
         status = "leída" if self.is_read else "Pendiente"
         return f"<UserNotification user_id={self.user_id} {status}>"
 
+    @staticmethod
+    def create_for_status_change(claim_id: int, claim_status_history_id: int) -> int:
+        """
+        Crea las notificaciones de un cambio de estado para el creador y cada
+        adherente del reclamo con un único INSERT ... SELECT, sin cargar los
+        adherentes, y suma una pendiente al contador de cada destinatario.
+        Se ejecuta dentro de la transacción en curso.
+
+        Args:
+            claim_id: ID del reclamo
+            claim_status_history_id: ID de la entrada de historial
+
+        Returns:
+            Cantidad de notificaciones creadas
+        """
+        from modules.claim import Claim
+        from modules.claim_supporter import ClaimSupporter
+        from modules.user import User
+
+        history_id = literal(claim_status_history_id)
+        created_at = literal(Datetime.now(), UserNotification.created_at.type)
+        # El creador no puede adherirse a su reclamo: no hay destinatarios repetidos
+        recipients = union_all(
+            select(Claim.creator_id.label("user_id"), history_id, created_at).where(
+                Claim.id == claim_id
+            ),
+            select(ClaimSupporter.user_id, history_id, created_at).where(
+                ClaimSupporter.claim_id == claim_id
+            ),
+        )
+        result = db.session.execute(
+            insert(UserNotification).from_select(
+                ["user_id", "claim_status_history_id", "created_at"], recipients
+            )
+        )
+
+        table = User.__table__
+        column = table.c.unread_notifications_count
+        recipient_ids = union_all(
+            select(Claim.creator_id).where(Claim.id == claim_id),
+            select(ClaimSupporter.user_id).where(ClaimSupporter.claim_id == claim_id),
+        )
+        db.session.execute(
+            update(table)
+            .where(table.c.id.in_(recipient_ids))
+            .values(unread_notifications_count=column + 1)
+        )
+
+        return result.rowcount
+
     @staticmethod
     def get_pending_for_user(user_id: int) -> list["UserNotification"]:
         """
@@ -83,6 +157,66 @@ class UserNotification(db.Model):
 
         return notifications
 
+    @staticmethod
+    def get_feed_for_user(
+        user_id: int, cursor: str | None = None, page_size: int | None = None
+    ) -> tuple[list, str | None]:
+        """
+        Página de notificaciones pendientes con solo las columnas que muestra
+        el listado (sin cargar objetos ni relaciones), paginada por
+        (created_at, id) con el índice de pendientes del usuario.
+
+        Args:
+            user_id: ID del usuario
+            cursor: Cursor de la página anterior (None = primera página)
+            page_size: Cantidad de notificaciones por página
+
+        Returns:
+            tuple[list[Row], str | None]: (filas, cursor de la página siguiente o None).
+            Cada fila tiene id, created_at, claim_id, detail_preview (primeros
+            DETAIL_PREVIEW_LENGTH caracteres), detail_truncated, old_status,
+            new_status, changed_by_email y changed_at.
+        """
+        from modules.claim import Claim
+        from modules.claim_status_history import ClaimStatusHistory
+        from modules.user import User
+
+        query = (
+            db.session.query(
+                UserNotification.id,
+                UserNotification.created_at,
+                ClaimStatusHistory.claim_id,
+                func.substr(Claim.detail, 1, DETAIL_PREVIEW_LENGTH).label(
+                    "detail_preview"
+                ),
+                (func.length(Claim.detail) > DETAIL_PREVIEW_LENGTH).label(
+                    "detail_truncated"
+                ),
+                ClaimStatusHistory.old_status,
+                ClaimStatusHistory.new_status,
+                User.email.label("changed_by_email"),
+                ClaimStatusHistory.changed_at,
+            )
+            .join(
+                ClaimStatusHistory,
+                UserNotification.claim_status_history_id == ClaimStatusHistory.id,
+            )
+            .join(Claim, ClaimStatusHistory.claim_id == Claim.id)
+            .join(User, ClaimStatusHistory.changed_by_id == User.id)
+            .filter(
+                UserNotification.user_id == user_id,
+                UserNotification.read_at.is_(None),
+            )
+        )
+
+        return keyset_page(
+            query,
+            UserNotification.created_at,
+            UserNotification.id,
+            cursor,
+            page_size,
+        )
+
     @staticmethod
     def get_unread_count(user_id: int) -> int:
         """
@@ -127,7 +261,9 @@ class UserNotification(db.Model):
             return False, "No tienes permiso para marcar esta notificación"
 
         # Marcar como leída
-        notification.mark_as_read()
+        if not notification.is_read:
+            notification.mark_as_read()
+            UserNotification.adjust_unread_counts(Counter({user_id: -1}))
         db.session.commit()
 
         return True, None
@@ -135,7 +271,8 @@ class UserNotification(db.Model):
     @staticmethod
     def mark_all_as_read_for_user(user_id: int) -> int:
         """
-        Marca todas las notificaciones de un usuario como leídas.
+        Marca todas las notificaciones de un usuario como leídas con un solo
+        UPDATE, sin cargarlas.
 
         Args:
             user_id: ID del usuario
@@ -143,14 +280,117 @@ class UserNotification(db.Model):
         Returns:
             Cantidad de notificaciones marcadas
         """
-        # Obtener las notificaciones pendientes
-        notifications = UserNotification.get_pending_for_user(user_id)
+        result = db.session.execute(
+            update(UserNotification)
+            .where(
+                UserNotification.user_id == user_id,
+                UserNotification.read_at.is_(None),
+            )
+            .values(read_at=Datetime.now())
+            .execution_options(synchronize_session=False)
+        )
 
-        # Marcar cada una como leída
-        count = 0
-        for notification in notifications:
-            notification.mark_as_read()
-            count += 1
+        UserNotification.reset_unread_count(user_id)
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def mark_as_read_by_ids(user_id: int, notification_ids: list[int]) -> int:
+        """
+        Marca como leídas varias notificaciones de un usuario con un solo UPDATE.
+        Se ignoran los IDs de otros usuarios y las notificaciones ya leídas.
+
+        Args:
+            user_id: ID del usuario que marca como leídas
+            notification_ids: IDs de UserNotification seleccionadas
+
+        Returns:
+            Cantidad de notificaciones marcadas
+        """
+        notification_ids = sorted(set(notification_ids))
+        if not notification_ids:
+            return 0
+
+        result = db.session.execute(
+            update(UserNotification)
+            .where(
+                UserNotification.user_id == user_id,
+                UserNotification.id.in_(notification_ids),
+                UserNotification.read_at.is_(None),
+            )
+            .values(read_at=Datetime.now())
+            .execution_options(synchronize_session=False)
+        )
 
+        UserNotification.adjust_unread_counts(Counter({user_id: -result.rowcount}))
         db.session.commit()
-        return count
+        return result.rowcount
+
+    # ── Contador de pendientes por usuario ───────────────────────────
+
+    @staticmethod
+    def adjust_unread_counts(deltas: Counter[int]) -> None:
+        """
+        Suma (o resta) notificaciones pendientes al contador de cada usuario,
+        dentro de la transacción en curso. El contador nunca queda negativo.
+
+        Args:
+            deltas: Counter {user_id: diferencia}
+        """
+        from modules.user import User
+
+        deltas = Counter({user_id: delta for user_id, delta in deltas.items() if delta})
+        if not deltas:
+            return
+
+        table = User.__table__
+        column = table.c.unread_notifications_count
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("target_id"))
+            .values(
+                unread_notifications_count=func.max(column + bindparam("delta"), 0)
+            ),
+            [
+                {"target_id": user_id, "delta": delta}
+                for user_id, delta in deltas.items()
+            ],
+        )
+
+    @staticmethod
+    def reset_unread_count(user_id: int) -> None:
+        """Deja en 0 el contador de pendientes de un usuario (transacción en curso)"""
+        from modules.user import User
+
+        table = User.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.id == user_id)
+            .values(unread_notifications_count=0)
+        )
+
+    @staticmethod
+    def rebuild_unread_counts() -> int:
+        """
+        Recalcula el contador de pendientes de todos los usuarios a partir de
+        las notificaciones (bases existentes o contadores desincronizados).
+
+        Returns:
+            Cantidad de usuarios actualizados
+        """
+        from modules.user import User
+
+        table = User.__table__
+        pending = (
+            select(func.count(UserNotification.id))
+            .where(
+                UserNotification.user_id == table.c.id,
+                UserNotification.read_at.is_(None),
+            )
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            update(table).values(unread_notifications_count=pending)
+        )
+        db.session.commit()
+        return result.rowcount
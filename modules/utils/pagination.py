@@ -0,0 +1,98 @@
+"""Paginación por keyset con cursores opacos."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+# Cantidad de elementos por página si la ruta no indica otra
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """
+    Codifica la posición (created_at, id) del último elemento de una página.
+
+    Args:
+        created_at: Fecha de creación del último elemento
+        item_id: ID del último elemento
+
+    Returns:
+        Token opaco apto para URLs
+    """
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None) -> tuple[datetime, int] | None:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        token: Cursor recibido en la URL
+
+    Returns:
+        tuple[datetime, int] | None: (created_at, id) o None si no hay cursor
+                                     o es inválido (se vuelve a la primera página)
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def clamp_page_size(page_size: int | None) -> int:
+    """Limita el tamaño de página a [1, MAX_PAGE_SIZE]"""
+    if page_size is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def keyset_page(
+    query: Query,
+    created_at_column,
+    id_column,
+    cursor: str | None,
+    page_size: int | None,
+) -> tuple[list, str | None]:
+    """
+    Aplica orden (created_at, id) descendente y corta una página después del cursor.
+
+    El costo no depende de la profundidad: se filtra por la posición del último
+    elemento visto en lugar de usar OFFSET.
+
+    Args:
+        query: Consulta ya filtrada
+        created_at_column: Columna de fecha de creación
+        id_column: Columna de ID (desempate)
+        cursor: Cursor de la página anterior (None = primera página)
+        page_size: Cantidad de elementos por página
+
+    Returns:
+        tuple[list, str | None]: (elementos, cursor de la página siguiente o None)
+    """
+    page_size = clamp_page_size(page_size)
+    position = decode_cursor(cursor)
+    if position is not None:
+        query = query.filter(tuple_(created_at_column, id_column) < position)
+
+    rows = (
+        query.order_by(created_at_column.desc(), id_column.desc())
+        .limit(page_size + 1)
+        .all()
+    )
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
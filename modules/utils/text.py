@@ -2,9 +2,84 @@
 
 from __future__ import annotations
 
+import re
 import unicodedata
+from collections.abc import Iterable
+from functools import lru_cache
 
+from modules.utils.constants import SPANISH_STOPWORDS_SET
 
+# Cantidad de textos normalizados que se mantienen en memoria
+NORMALIZE_CACHE_SIZE = 8192
+
+# Separador para normalizar lotes en una sola pasada (no lo alteran lower ni NFD)
+_BATCH_SEPARATOR = "\x00"
+
+# Rango cubierto por la tabla: Latin-1, Latin Extended-A/B y diacríticos combinables
+_TABLE_RANGES = ((0x0000, 0x0250), (0x0300, 0x0370))
+_OUTSIDE_TABLE = re.compile(r"[^\u0000-\u024f\u0300-\u036f]")
+
+# Mismo patrón que el token_pattern por defecto de scikit-learn
+_TOKEN_PATTERN = re.compile(r"\b\w\w+\b")
+
+
+def _normalize_exact(text: str) -> str:
+    """Normalización de referencia: NFD y descarte de marcas diacríticas (Mn)"""
+    text = text.lower()
+    return "".join(
+        c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn"
+    )
+
+
+def _build_translation_table() -> dict[int, str | None]:
+    """
+    Precalcula, carácter por carácter, el resultado de _normalize_exact sin el
+    lower() (la tabla se aplica sobre texto ya en minúsculas).
+    """
+    table: dict[int, str | None] = {}
+    for start, end in _TABLE_RANGES:
+        for codepoint in range(start, end):
+            char = chr(codepoint)
+            stripped = "".join(
+                c
+                for c in unicodedata.normalize("NFD", char)
+                if unicodedata.category(c) != "Mn"
+            )
+            if stripped != char:
+                table[codepoint] = stripped or None
+    return table
+
+
+_TRANSLATION_TABLE = _build_translation_table()
+
+# Letras acentuadas del español: se reemplazan con str.replace, que es mucho
+# más rápido que str.translate sobre texto no ASCII
+_SPANISH_REPLACEMENTS = tuple(
+    (char, _TRANSLATION_TABLE[ord(char)]) for char in "áéíóúüñàèìòù"
+)
+
+
+def _normalize(text: str) -> str:
+    """
+    Normaliza con reemplazos precalculados. Resultado idéntico a
+    _normalize_exact: los caracteres fuera de la tabla usan esa versión.
+    """
+    text = text.lower()
+    if text.isascii():
+        return text
+
+    for char, replacement in _SPANISH_REPLACEMENTS:
+        if char in text:
+            text = text.replace(char, replacement)
+    if text.isascii():
+        return text
+
+    if _OUTSIDE_TABLE.search(text):
+        return _normalize_exact(text)
+    return text.translate(_TRANSLATION_TABLE)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_text(text: str) -> str:
     """
     Normaliza el texto removiendo acentos y caracteres especiales.
@@ -15,8 +90,65 @@ def normalize_text(text: str) -> str:
     Returns:
         Texto normalizado sin acentos en minúsculas
     """
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn"
-    )
-    return text
+    return _normalize(text)
+
+
+def normalize_texts(texts: Iterable[str]) -> list[str]:
+    """
+    Normaliza una lista de textos en una sola pasada.
+
+    Args:
+        texts: Textos a normalizar
+
+    Returns:
+        Lista de textos normalizados, en el mismo orden
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    if any(_BATCH_SEPARATOR in text for text in texts):
+        return [normalize_text(text) for text in texts]
+
+    # Camino rápido: todo el lote queda ASCII tras los reemplazos del español
+    joined = _BATCH_SEPARATOR.join(texts).lower()
+    for char, replacement in _SPANISH_REPLACEMENTS:
+        if char in joined:
+            joined = joined.replace(char, replacement)
+    if joined.isascii():
+        return joined.split(_BATCH_SEPARATOR)
+
+    # Solo los textos que siguen teniendo caracteres no ASCII van uno por uno
+    return [
+        piece if piece.isascii() else normalize_text(text)
+        for piece, text in zip(joined.split(_BATCH_SEPARATOR), texts)
+    ]
+
+
+def tokenize(normalized: str) -> list[str]:
+    """
+    Separa un texto ya normalizado en palabras, descartando stopwords.
+
+    Args:
+        normalized: Texto devuelto por normalize_text
+
+    Returns:
+        Lista de palabras de 2 o más caracteres que no son stopwords
+    """
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(normalized)
+        if token not in SPANISH_STOPWORDS_SET
+    ]
+
+
+def detail_tokens(text: str) -> str:
+    """
+    Tokens filtrados de un texto separados por espacios (formato de Claim.detail_tokens).
+
+    Args:
+        text: Texto sin normalizar
+
+    Returns:
+        Tokens normalizados y sin stopwords unidos por espacios
+    """
+    return " ".join(tokenize(normalize_text(text)))
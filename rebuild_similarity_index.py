@@ -0,0 +1,27 @@
+"""
+Script para reconstruir el índice de similitud de reclamos pendientes.
+Ejecutar: python rebuild_similarity_index.py
+"""
+
+from modules.config import create_app
+from modules.similarity import similarity_finder
+
+
+def rebuild_index():
+    """Reconstruye el índice TF-IDF y lo guarda en disco"""
+    app = create_app()
+
+    with app.app_context():
+        print("\n=== Reconstruyendo índice de similitud ===\n")
+        index = similarity_finder.rebuild(save=True)
+
+        print(f"✅ Reclamos pendientes indexados: {len(index)}")
+        print(
+            f"   Términos en el vocabulario: {len(index.vectorizer.vocabulary_) if index.is_fitted else 0}"
+        )
+        print(f"   Shards por departamento: {len(index.shards)}")
+        print(f"   Archivo guardado en: {app.config['SIMILARITY_INDEX_PATH']}\n")
+
+
+if __name__ == "__main__":
+    rebuild_index()
@@ -0,0 +1,41 @@
+"""
+Script para verificar y reconstruir la tabla de palabras clave por departamento.
+Compara la tabla con el cálculo completo desde los reclamos y la reconstruye
+si hay diferencias (o siempre, con --rebuild).
+Ejecutar: python reconcile_keywords.py [--rebuild]
+"""
+
+import sys
+
+from modules.config import create_app
+from modules.department_keyword import DepartmentKeyword
+
+
+def reconcile(force_rebuild: bool = False):
+    """Verifica department_keyword contra los reclamos y la reconstruye si difiere"""
+    app = create_app()
+
+    with app.app_context():
+        print("\n=== Reconciliando palabras clave por departamento ===\n")
+        differences = DepartmentKeyword.find_differences()
+
+        if differences:
+            print(f"⚠️  Diferencias encontradas: {len(differences)}")
+            for (department_id, term), (stored, live) in sorted(differences.items())[
+                :20
+            ]:
+                print(
+                    f"   Departamento {department_id} - '{term}': "
+                    f"tabla={stored}, real={live}"
+                )
+        else:
+            print("✅ La tabla coincide con los reclamos")
+
+        if differences or force_rebuild:
+            rows = DepartmentKeyword.rebuild()
+            print(f"\n✅ Tabla reconstruida: {rows} palabras por departamento")
+        print()
+
+
+if __name__ == "__main__":
+    reconcile(force_rebuild="--rebuild" in sys.argv)
@@ -0,0 +1,41 @@
+"""
+Script para verificar y reconstruir los contadores de reclamos por departamento
+y estado. Compara department_status_counter con el agregado en vivo de los
+reclamos y los reconstruye si hay diferencias (o siempre, con --rebuild).
+Ejecutar: python reconcile_status_counters.py [--rebuild]
+"""
+
+import sys
+
+from modules.config import create_app
+from modules.department_status_counter import DepartmentStatusCounter
+
+
+def reconcile(force_rebuild: bool = False):
+    """Verifica department_status_counter contra los reclamos y lo reconstruye si difiere"""
+    app = create_app()
+
+    with app.app_context():
+        print("\n=== Reconciliando contadores por departamento y estado ===\n")
+        differences = DepartmentStatusCounter.find_differences()
+
+        if differences:
+            print(f"⚠️  Diferencias encontradas: {len(differences)}")
+            for (department_id, status), (stored, live) in sorted(
+                differences.items(), key=lambda item: (item[0][0], item[0][1].name)
+            ):
+                print(
+                    f"   Departamento {department_id} - {status.value}: "
+                    f"contador={stored}, real={live}"
+                )
+        else:
+            print("✅ Los contadores coinciden con los reclamos")
+
+        if differences or force_rebuild:
+            rows = DepartmentStatusCounter.rebuild()
+            print(f"\n✅ Contadores reconstruidos: {rows} filas")
+        print()
+
+
+if __name__ == "__main__":
+    reconcile(force_rebuild="--rebuild" in sys.argv)
@@ -0,0 +1,7 @@
+"""
+Dibujo de gráficos y PDFs para los pools de procesos.
+
+Fuera del paquete modules a propósito: importar modules.* ejecuta
+modules/__init__, que crea la app y carga el clasificador. Los procesos
+"spawn" importan estas funciones sin levantar la app ni la base de datos.
+"""
@@ -0,0 +1,107 @@
+"""
+Dibujo de los gráficos de analíticas (matplotlib y WordCloud).
+
+Las funciones reciben los datos ya calculados y devuelven la imagen PNG; se
+ejecutan en los procesos del pool de ChartRenderer.
+"""
+
+from __future__ import annotations
+
+import io
+
+import matplotlib
+
+matplotlib.use("Agg")  # Backend sin GUI - DEBE estar antes de importar pyplot
+import matplotlib.pyplot as plt
+
+# Colores por estado para el gráfico circular
+STATUS_COLORS = {
+    "Pendiente": "#ffc107",
+    "En proceso": "#17a2b8",
+    "Resuelto": "#28a745",
+    "Inválido": "#dc3545",
+}
+
+
+def render_pie_chart(status_counts: dict[str, int]) -> bytes | None:
+    """
+    Dibuja el gráfico circular de distribución de estados.
+
+    Returns:
+        Imagen PNG o None si no hay datos
+    """
+    if not status_counts:
+        return None
+
+    # Filtrar estados con valor > 0
+    filtered_stats = {k: v for k, v in status_counts.items() if v > 0}
+
+    if not filtered_stats:
+        return None
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    colors = [STATUS_COLORS.get(k, "#6c757d") for k in filtered_stats.keys()]
+
+    wedges, texts, autotexts = ax.pie(  # type: ignore
+        filtered_stats.values(),  # type: ignore
+        labels=filtered_stats.keys(),  # type: ignore
+        colors=colors,
+        autopct="%1.1f%%",
+        startangle=90,
+        textprops={"fontsize": 11},
+    )
+
+    # Estilizar los porcentajes
+    for autotext in autotexts:
+        autotext.set_color("white")
+        autotext.set_fontweight("bold")
+
+    ax.set_title("Distribución de Reclamos por Estado", fontsize=14, fontweight="bold")
+    plt.tight_layout()
+
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png", dpi=100, bbox_inches="tight", facecolor="white")
+    plt.close(fig)  # Liberar memoria
+
+    return buffer.getvalue()
+
+
+def render_wordcloud(word_frequencies: dict[str, int]) -> bytes | None:
+    """
+    Dibuja la nube de palabras a partir de frecuencias.
+
+    Returns:
+        Imagen PNG o None si no hay datos/wordcloud no disponible
+    """
+    if not word_frequencies:
+        return None
+
+    try:
+        from wordcloud import WordCloud
+    except ImportError:
+        # Si wordcloud no está instalado, retornar None
+        return None
+
+    wc = WordCloud(
+        width=800,
+        height=400,
+        background_color="white",
+        colormap="viridis",
+        max_words=50,
+        min_font_size=10,
+        prefer_horizontal=0.7,
+    ).generate_from_frequencies(word_frequencies)
+
+    buffer = io.BytesIO()
+    wc.to_image().save(buffer, format="PNG")
+
+    return buffer.getvalue()
+
+
+def render_chart(kind: str, data: dict) -> bytes | None:
+    """Dibuja un gráfico por tipo ('pie' o 'wordcloud')"""
+    if kind == "pie":
+        return render_pie_chart(data)
+    if kind == "wordcloud":
+        return render_wordcloud(data)
+    raise ValueError(f"Tipo de gráfico desconocido: {kind}")
@@ -0,0 +1,90 @@
+"""
+Conversión de HTML a PDF (xhtml2pdf) y unión de partes en un solo documento (pypdf).
+
+html_to_pdf se ejecuta en los procesos de pdf_renderer: no usa la app ni la
+base de datos, solo recibe el HTML ya renderizado.
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+# Posición del encabezado y el pie agregados a cada página (puntos)
+STAMP_MARGIN = 56.7  # 2 cm, igual que el margen de @page en PDF_CSS
+STAMP_OFFSET = 28.35  # 1 cm desde el borde de la hoja
+STAMP_FONT_SIZE = 8
+
+
+def html_to_pdf(html: str) -> bytes | None:
+    """
+    Convierte un documento HTML a PDF.
+
+    Returns:
+        Bytes del PDF o None si xhtml2pdf reporta errores
+    """
+    from xhtml2pdf import pisa
+
+    buffer = BytesIO()
+    status = pisa.CreatePDF(src=html, dest=buffer)
+    if status.err:  # type: ignore
+        return None
+    return buffer.getvalue()
+
+
+def merge_pdfs(parts: list[bytes], header: str = "", footer: str = "") -> bytes:
+    """
+    Une las partes en orden y agrega a cada página el pie con "Página X de N".
+    El encabezado se agrega desde la segunda página (la primera ya tiene el
+    título del reporte).
+
+    Args:
+        parts: PDFs a concatenar
+        header: Texto del encabezado de las páginas siguientes a la primera
+        footer: Texto del pie, a la izquierda del número de página
+
+    Returns:
+        Bytes del documento unido
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(BytesIO(part)))
+
+    box = writer.pages[0].mediabox
+    overlay = PdfReader(
+        BytesIO(
+            _render_stamps(
+                len(writer.pages), float(box.width), float(box.height), header, footer
+            )
+        )
+    )
+    for page, stamp in zip(writer.pages, overlay.pages):
+        page.merge_page(stamp)
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _render_stamps(
+    page_count: int, width: float, height: float, header: str, footer: str
+) -> bytes:
+    """PDF con una página transparente por página del documento, con sus textos"""
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(width, height))
+    for number in range(1, page_count + 1):
+        pdf.setFont("Helvetica", STAMP_FONT_SIZE)
+        pdf.setFillGray(0.45)
+        if header and number > 1:
+            pdf.drawString(STAMP_MARGIN, height - STAMP_OFFSET, header)
+        if footer:
+            pdf.drawString(STAMP_MARGIN, STAMP_OFFSET, footer)
+        pdf.drawRightString(
+            width - STAMP_MARGIN, STAMP_OFFSET, f"Página {number} de {page_count}"
+        )
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
@@ -16,16 +16,25 @@ def clear_database():
 
     # Eliminar en orden inverso de dependencias para evitar problemas de FK
     from modules.user_notification import UserNotification
+    from modules.notification_outbox import NotificationOutbox
+    from modules.report_job import ReportJob
     from modules.claim_status_history import ClaimStatusHistory
     from modules.claim_supporter import ClaimSupporter
     from modules.claim_transfer import ClaimTransfer
+    from modules.department_keyword import DepartmentKeyword
+    from modules.department_status_counter import DepartmentStatusCounter
+    from modules.data_version import DataVersion
 
     try:
         # Primero las tablas dependientes
         UserNotification.query.delete()
+        NotificationOutbox.query.delete()
+        ReportJob.query.delete()
         ClaimStatusHistory.query.delete()
         ClaimSupporter.query.delete()
         ClaimTransfer.query.delete()
+        DepartmentKeyword.query.delete()
+        DepartmentStatusCounter.query.delete()
 
         # Luego los reclamos
         Claim.query.delete()
@@ -37,6 +46,9 @@ def clear_database():
         # Finalmente departamentos
         Department.query.delete()
 
+        # Los reportes en caché dejan de valer
+        DataVersion.bump()
+
         db.session.commit()
         print("  ✓ Base de datos limpiada exitosamente")
     except Exception as e:
@@ -448,7 +460,8 @@ def create_sample_claims():
 
 
 def main():
-    app = create_app()
+    # Las notificaciones de los cambios de estado se crean antes de terminar
+    app = create_app({"NOTIFICATION_DISPATCH_INLINE": True})
 
     with app.app_context():
         print("\n=== Inicializando datos de prueba ===\n")
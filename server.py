@@ -3,12 +3,19 @@ Entry point for the Flask application.
 This module imports the app and routes, and runs the development server.
 """
 
-# Import app from config
-from modules.config import app
-
-# Import routes to register them with the app
-import modules.routes  # noqa: F401
+if __name__ == "__main__":
+    # Imports dentro del guard: los pools "spawn" reimportan este módulo como
+    # __mp_main__ en cada proceso hijo, que no necesita la app ni los workers.
+    # Import app from config
+    from modules.config import app
 
+    # Import routes to register them with the app
+    import modules.routes  # noqa: F401
+    from modules.notification_dispatcher import notification_dispatcher
+    from modules.report_runner import report_runner
 
-if __name__ == "__main__":
+    # El worker de notificaciones procesa también los eventos que quedaron pendientes
+    notification_dispatcher.init_app(app)
+    # Reportes pendientes de antes del reinicio y limpieza de los vencidos
+    report_runner.init_app(app)
     app.run(host="0.0.0.0", debug=True)
@@ -2,7 +2,9 @@
 Configuración para tests - Agrega el path del proyecto y define la clase base
 """
 
+import os
 import sys
+import tempfile
 from pathlib import Path
 import unittest
 
@@ -11,15 +13,29 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
-def create_test_app():
-    """Factory para crear una app de testing completamente aislada"""
+def create_test_app(instance_dir: str | None = None):
+    """
+    Factory para crear una app de testing completamente aislada.
+    Los archivos que genera la app (índice, reportes y su caché) van a instance_dir,
+    no al directorio instance/ del proyecto.
+    """
     from modules.config import create_app
 
+    if instance_dir is None:
+        instance_dir = tempfile.mkdtemp()
+
     test_app = create_app(
         {
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SIMILARITY_INDEX_PATH": os.path.join(
+                instance_dir, "similarity_index.joblib"
+            ),
+            "REPORT_JOBS_DIR": os.path.join(instance_dir, "reports"),
+            "REPORT_CACHE_DIR": os.path.join(instance_dir, "report_cache"),
             "WTF_CSRF_ENABLED": False,
+            "NOTIFICATION_DISPATCH_INLINE": True,
+            "REPORT_CACHE_MAX_BYTES": 0,
             "SECRET_KEY": "test-secret-key-" + str(id(object())),
         }
     )
@@ -50,6 +66,55 @@ def create_test_app():
     return test_app
 
 
+def create_sample_users(
+    department_id: int, admin_role=None, admin_username: str = "admin"
+) -> dict:
+    """
+    Crea un creador (user1), un adherente (user2) y un administrador del
+    departamento (contraseña "admin123", Secretaría Técnica por defecto).
+
+    Returns:
+        dict con creator_id, supporter_id y admin_id
+    """
+    from modules.config import db
+    from modules.admin_user import AdminRole, AdminUser
+    from modules.end_user import Cloister, EndUser
+
+    creator = EndUser(
+        first_name="Usuario",
+        last_name="Uno",
+        email="user1@test.com",
+        username="user1",
+        cloister=Cloister.STUDENT,
+    )
+    supporter = EndUser(
+        first_name="Usuario",
+        last_name="Dos",
+        email="user2@test.com",
+        username="user2",
+        cloister=Cloister.TEACHER,
+    )
+    creator.set_password("password123")
+    supporter.set_password("password123")
+    db.session.add_all([creator, supporter])
+    db.session.commit()
+
+    admin, _ = AdminUser.create(
+        first_name="Admin",
+        last_name="Test",
+        email=f"{admin_username}@test.com",
+        username=admin_username,
+        admin_role=admin_role or AdminRole.TECHNICAL_SECRETARY,
+        password="admin123",
+        department_id=department_id,
+    )
+    return {
+        "creator_id": creator.id,
+        "supporter_id": supporter.id,
+        "admin_id": admin.id,
+    }
+
+
 class BaseTestCase(unittest.TestCase):
     """Clase base para todos los tests con configuración común"""
 
@@ -57,7 +122,8 @@ class BaseTestCase(unittest.TestCase):
         """Crea una instancia de la aplicación para tests con base de datos limpia"""
         from modules.config import db
 
-        self.app = create_test_app()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app = create_test_app(self.temp_dir.name)
         self.app_context = self.app.app_context()
         self.app_context.push()
         self.client = self.app.test_client()
@@ -72,6 +138,23 @@ class BaseTestCase(unittest.TestCase):
         db.session.remove()
         db.drop_all()
         self.app_context.pop()
+        self.temp_dir.cleanup()
+
+    def _create_sample_users(
+        self,
+        department_id: int | None = None,
+        admin_role=None,
+        admin_username: str = "admin",
+    ):
+        """Crea creador, adherente y administrador y guarda sus IDs"""
+        users = create_sample_users(
+            department_id or self.sample_departments["st_id"],
+            admin_role,
+            admin_username,
+        )
+        self.creator_id = users["creator_id"]
+        self.supporter_id = users["supporter_id"]
+        self.admin_id = users["admin_id"]
 
     def _create_sample_departments(self):
         """Crea departamentos de prueba y guarda sus IDs"""
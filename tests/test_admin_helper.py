@@ -5,6 +5,7 @@ import unittest
 from modules.config import db
 from modules.claim import Claim, ClaimStatus
 from modules.admin_user import AdminRole, AdminUser
+from modules.admin_helper import AdminHelper
 from modules.end_user import Cloister, EndUser
 from tests.conftest import BaseTestCase
 
@@ -94,6 +95,28 @@ class TestAdminHelper(BaseTestCase):
         self.assertIsNotNone(claim)
         self.assertEqual(claim.status, ClaimStatus.PENDING)
 
+    def test_claims_list_is_paginated(self):
+        """Verifica que el listado admin se corta en páginas con enlace a la siguiente"""
+        self.app.config["CLAIMS_PAGE_SIZE"] = 1
+        extra, _ = Claim.create(
+            user_id=self.end_user_id,
+            detail="Otro reclamo dept1",
+            department_id=self.sample_departments["dept1_id"],
+        )
+        self.login_admin(self.dept_head_username)
+
+        response = self.client.get("/admin/claims")
+        self.assertIn(f"Reclamo #{extra.id}".encode(), response.data)
+        self.assertNotIn(f"Reclamo #{self.dept1_claim_id}".encode(), response.data)
+        self.assertIn(b"/admin/claims?cursor=", response.data)
+
+        claims, cursor = AdminHelper.get_claims_for_admin_page(
+            AdminUser.get_by_username(self.dept_head_username), page_size=1
+        )
+        response = self.client.get(f"/admin/claims?cursor={cursor}")
+        self.assertIn(f"Reclamo #{self.dept1_claim_id}".encode(), response.data)
+        self.assertNotIn(b"/admin/claims?cursor=", response.data)
+
 
 if __name__ == "__main__":
     unittest.main()
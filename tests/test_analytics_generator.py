@@ -2,9 +2,14 @@
 Tests para AnalyticsGenerator - Fase 11
 """
 
+import time
 import unittest
+from unittest.mock import Mock, patch
 
 from modules.config import db
+from modules.admin_user import AdminRole, AdminUser
+from modules.chart_cache import NO_IMAGE, ChartCache, chart_cache
+from modules.chart_renderer import ChartRenderer, chart_renderer
 from modules.claim import Claim, ClaimStatus
 from modules.end_user import Cloister, EndUser
 from modules.analytics_generator import AnalyticsGenerator
@@ -266,6 +271,50 @@ class TestAnalyticsGenerator(BaseTestCase):
         self.assertIsNone(analytics["wordcloud"])
         self.assertEqual(analytics["keywords"], {})
 
+    # ============================================================
+    # Tests de caché de gráficos
+    # ============================================================
+
+    def test_get_chart_cache_hit_does_not_render(self):
+        """Mismos datos: la segunda llamada no vuelve a dibujar"""
+        chart_cache.clear()
+        status_counts = {"Pendiente": 3, "Resuelto": 1}
+
+        with patch.object(
+            AnalyticsGenerator, "render_pie_chart", return_value=b"png"
+        ) as render:
+            first = AnalyticsGenerator.get_chart("pie", status_counts)
+            second = AnalyticsGenerator.get_chart("pie", dict(status_counts))
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_get_chart_new_data_changes_key(self):
+        """Datos distintos producen otra clave y se dibujan de nuevo"""
+        chart_cache.clear()
+        with patch.object(
+            AnalyticsGenerator, "render_pie_chart", return_value=b"png"
+        ) as render:
+            key1, _ = AnalyticsGenerator.get_chart("pie", {"Pendiente": 3})
+            key2, _ = AnalyticsGenerator.get_chart("pie", {"Pendiente": 4})
+
+        self.assertNotEqual(key1, key2)
+        self.assertEqual(render.call_count, 2)
+
+    def test_get_full_analytics_without_inline_charts(self):
+        """Sin imágenes en línea retorna solo las claves"""
+        analytics = AnalyticsGenerator.get_full_analytics(
+            department_ids=None, inline_charts=False
+        )
+
+        self.assertIsNone(analytics["pie_chart"])
+        self.assertIsNotNone(analytics["pie_chart_key"])
+
+        # Se dibuja en el pool de procesos
+        png = chart_renderer.wait(analytics["pie_chart_key"], timeout=60)
+        self.assertTrue(png.startswith(b"\x89PNG"))
+        self.assertIn(analytics["pie_chart_key"], chart_cache)
+
     # ============================================================
     # Tests de integración
     # ============================================================
@@ -289,5 +338,260 @@ class TestAnalyticsGenerator(BaseTestCase):
         self.assertEqual(status_sum, stats["total_claims"])
 
 
+class TestChartCache(unittest.TestCase):
+    """Tests para la caché LRU de gráficos"""
+
+    def test_make_key_ignores_dict_order(self):
+        """El orden de las claves del dict no cambia la huella"""
+        self.assertEqual(
+            ChartCache.make_key("pie", {"a": 1, "b": 2}),
+            ChartCache.make_key("pie", {"b": 2, "a": 1}),
+        )
+        self.assertNotEqual(
+            ChartCache.make_key("pie", {"a": 1}),
+            ChartCache.make_key("wordcloud", {"a": 1}),
+        )
+
+    def test_make_key_depends_on_departments(self):
+        """Los mismos datos de otros departamentos producen otra clave"""
+        key = ChartCache.make_key("pie", {"a": 1}, [2, 1])
+
+        self.assertEqual(key, ChartCache.make_key("pie", {"a": 1}, [1, 2]))
+        self.assertNotEqual(key, ChartCache.make_key("pie", {"a": 1}, [1]))
+        self.assertTrue(key.startswith(f"{ChartCache.make_scope([1, 2])}-"))
+
+    def test_evicts_least_recently_used(self):
+        """Al superar el máximo se descarta la imagen menos usada"""
+        cache = ChartCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_evicts_by_size(self):
+        """El límite de bytes también desaloja entradas"""
+        cache = ChartCache(max_entries=10, max_bytes=10)
+        cache.put("a", b"x" * 6)
+        cache.put("b", b"x" * 6)
+
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_entry_with_ttl_expires(self):
+        """Una entrada con vencimiento desaparece al vencer"""
+        cache = ChartCache()
+        cache.put("a", b"1", ttl=10)
+        cache.put("b", b"2")
+
+        with patch(
+            "modules.chart_cache.time.monotonic", return_value=time.monotonic() + 10
+        ):
+            self.assertNotIn("a", cache)
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get("b"), b"2")
+        self.assertEqual(len(cache), 1)
+
+
+class TestAnalyticsChartRoute(BaseTestCase):
+    """Tests para la ruta que sirve los gráficos con ETag"""
+
+    def setUp(self):
+        super().setUp()
+        admin = AdminUser(
+            first_name="Jefe",
+            last_name="Analytics",
+            email="head@test.com",
+            username="head",
+            admin_role=AdminRole.DEPARTMENT_HEAD,
+            department_id=self.sample_departments["dept1_id"],
+        )
+        admin.set_password("test123")
+        user = EndUser(
+            first_name="Analytics",
+            last_name="User",
+            email="analytics@test.com",
+            username="analyticsuser",
+            cloister=Cloister.STUDENT,
+        )
+        user.set_password("test123")
+        db.session.add_all([admin, user])
+        db.session.commit()
+
+        Claim.create(
+            user_id=user.id,
+            detail="La computadora está rota",
+            department_id=self.sample_departments["dept1_id"],
+        )
+        with self.client.session_transaction() as session:
+            session["_user_id"] = str(admin.id)
+        self.app.config["ANALYTICS_RENDER_WORKERS"] = 0
+        chart_cache.clear()
+
+    def _pie_url(self) -> str:
+        analytics = AnalyticsGenerator.get_full_analytics(
+            [self.sample_departments["dept1_id"]], inline_charts=False
+        )
+        return f"/admin/analytics/charts/pie/{analytics['pie_chart_key']}.png"
+
+    def test_serves_png_with_etag(self):
+        """La imagen se sirve con ETag y caché privada"""
+        response = self.client.get(self._pie_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "image/png")
+        self.assertIsNotNone(response.headers.get("ETag"))
+        self.assertIn("private", response.headers["Cache-Control"])
+
+    def test_if_none_match_returns_304(self):
+        """Con el mismo ETag el navegador recibe 304 sin cuerpo"""
+        url = self._pie_url()
+        etag = self.client.get(url).headers["ETag"]
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+    def test_rerenders_after_eviction(self):
+        """Si la imagen salió de la caché y los datos no cambiaron se redibuja"""
+        url = self._pie_url()
+        chart_cache.clear()
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_analytics_page_links_charts(self):
+        """La página de analíticas enlaza los gráficos en lugar de incrustarlos"""
+        response = self.client.get("/admin/analytics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self._pie_url().encode(), response.data)
+        self.assertNotIn(b"data:image/png;base64", response.data)
+
+    def test_pending_render_returns_202(self):
+        """Mientras el gráfico se dibuja la ruta responde 202"""
+        url = self._pie_url()
+        key = url.rsplit("/", 1)[1][: -len(".png")]
+        chart_cache.clear()
+
+        with patch.object(ChartRenderer, "status", return_value=ChartRenderer.PENDING):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        self.assertNotIn(key, chart_cache)
+
+    def test_unknown_key_returns_404(self):
+        """Una clave que no corresponde a los datos actuales da 404"""
+        response = self.client.get(f"/admin/analytics/charts/pie/{'0' * 64}.png")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_other_department_key_returns_404(self):
+        """Un gráfico en caché de otro departamento no se sirve"""
+        user = EndUser.query.filter_by(username="analyticsuser").one()
+        Claim.create(
+            user_id=user.id,
+            detail="El proyector del aula no enciende",
+            department_id=self.sample_departments["dept2_id"],
+        )
+        analytics = AnalyticsGenerator.get_full_analytics(
+            [self.sample_departments["dept2_id"]], inline_charts=False
+        )
+        key = analytics["pie_chart_key"]
+        chart_renderer.wait(key, timeout=60)
+        self.assertIn(key, chart_cache)
+
+        response = self.client.get(f"/admin/analytics/charts/pie/{key}.png")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestChartRenderer(BaseTestCase):
+    """Tests para el pool de dibujo de gráficos"""
+
+    def test_concurrent_requests_share_one_render(self):
+        """Pedidos del mismo gráfico en curso comparten un único dibujo"""
+        from concurrent.futures import Future
+
+        renderer = ChartRenderer(ChartCache())
+        future: Future = Future()
+        executor = Mock()
+        executor.submit.return_value = future
+
+        with patch.object(renderer, "_get_executor", return_value=executor):
+            key1 = renderer.submit("pie", {"Pendiente": 2})
+            key2 = renderer.submit("pie", {"Pendiente": 2})
+
+        self.assertEqual(key1, key2)
+        self.assertEqual(executor.submit.call_count, 1)
+        self.assertEqual(renderer.status(key1), ChartRenderer.PENDING)
+
+        future.set_result(b"png")
+
+        self.assertEqual(renderer.status(key1), ChartRenderer.READY)
+        self.assertEqual(renderer.cache.get(key1), b"png")
+
+    def test_failed_render_is_cached_then_retried(self):
+        """Un dibujo fallido queda sin imagen hasta que vence y se reintenta"""
+        from concurrent.futures import Future
+
+        renderer = ChartRenderer(ChartCache())
+        future: Future = Future()
+        executor = Mock()
+        executor.submit.return_value = future
+
+        with patch.object(renderer, "_get_executor", return_value=executor):
+            key = renderer.submit("pie", {"Pendiente": 2})
+            future.set_exception(RuntimeError("worker caído"))
+
+            # Las consultas siguientes no vuelven a encolar el dibujo
+            self.assertEqual(renderer.submit("pie", {"Pendiente": 2}), key)
+            self.assertEqual(executor.submit.call_count, 1)
+            self.assertEqual(renderer.status(key), ChartRenderer.READY)
+            self.assertEqual(renderer.cache.get(key), NO_IMAGE)
+
+            with patch(
+                "modules.chart_cache.time.monotonic",
+                return_value=time.monotonic() + ChartRenderer.FAILURE_TTL,
+            ):
+                self.assertEqual(renderer.status(key), ChartRenderer.MISSING)
+                renderer.submit("pie", {"Pendiente": 2})
+
+        self.assertEqual(executor.submit.call_count, 2)
+
+    def test_empty_data_is_not_submitted(self):
+        """Sin datos no se encola nada"""
+        renderer = ChartRenderer(ChartCache())
+
+        self.assertIsNone(renderer.submit("wordcloud", {}))
+
+    def test_pool_function_does_not_import_app(self):
+        """Los procesos del pool importan el dibujo sin crear la app"""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys\n"
+            "from rendering.charts import render_chart\n"
+            "assert render_chart('pie', {'Pendiente': 1}).startswith(b'\\x89PNG')\n"
+            "print('modules.config' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "False")
+        self.assertEqual(
+            ChartRenderer.submit.__globals__["render_chart"].__module__,
+            "rendering.charts",
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@ Verifica las funcionalidades de creación y consulta de reclamos
 """
 
 import unittest
+from datetime import datetime as Datetime
 
 from modules.config import db
 from modules.claim import Claim, ClaimStatus
@@ -160,6 +161,108 @@ class TestClaimStaticMethods(BaseTestCase):
         self.assertIn(claim.id, [c.id for c in pending_claims])
         self.assertTrue(all(c.status == ClaimStatus.PENDING for c in pending_claims))
 
+    def test_create_claim_stores_detail_tokens(self):
+        """Verifica que al crear el reclamo se guardan los tokens del detalle"""
+        claim, _ = Claim.create(
+            user_id=self.sample_user_id,
+            detail="El AÑO pasado se rompió la canilla",
+            department_id=self.sample_departments["dept1_id"],
+        )
+
+        self.assertEqual(claim.detail_tokens, "ano pasado rompio canilla")
+        self.assertEqual(claim.tokens, ["ano", "pasado", "rompio", "canilla"])
+
+    def test_backfill_text_fields(self):
+        """Verifica que el backfill completa reclamos sin tokens sin tocar updated_at"""
+        claim, _ = Claim.create(
+            user_id=self.sample_user_id,
+            detail="La calefacción no enciende",
+            department_id=self.sample_departments["dept1_id"],
+        )
+        updated_at = claim.updated_at
+        db.session.execute(
+            Claim.__table__.update().values(
+                detail_tokens=None,
+                updated_at=Claim.__table__.c.updated_at,
+            )
+        )
+        db.session.commit()
+
+        self.assertEqual(Claim.backfill_text_fields(batch_size=1), 1)
+        self.assertEqual(Claim.backfill_text_fields(), 0)
+
+        db.session.expire_all()
+        claim = Claim.get_by_id(claim.id)
+        self.assertEqual(claim.detail_tokens, "calefaccion enciende")
+        self.assertEqual(claim.updated_at, updated_at)
+
+    def _create_claims(self, count: int, department_key: str = "dept1_id") -> list[int]:
+        ids = []
+        for i in range(count):
+            claim, _ = Claim.create(
+                user_id=self.sample_user_id,
+                detail=f"Reclamo paginado {i}",
+                department_id=self.sample_departments[department_key],
+            )
+            ids.append(claim.id)
+        return ids
+
+    def test_get_all_with_filters_page_walks_all_claims(self):
+        """Verifica que recorrer las páginas devuelve cada reclamo una vez, del más nuevo al más viejo"""
+        ids = self._create_claims(7)
+        # Misma fecha para todos: el ID desempata
+        db.session.execute(
+            Claim.__table__.update().values(created_at=Datetime(2024, 1, 1, 12, 0))
+        )
+        db.session.commit()
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            claims, cursor = Claim.get_all_with_filters_page(cursor=cursor, page_size=3)
+            seen.extend(c.id for c in claims)
+            pages += 1
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, sorted(ids, reverse=True))
+
+    def test_get_all_with_filters_page_respects_filters(self):
+        """Verifica que los filtros se aplican en cada página"""
+        self._create_claims(3, "dept1_id")
+        dept2_ids = self._create_claims(2, "dept2_id")
+
+        claims, cursor = Claim.get_all_with_filters_page(
+            department_filter=self.sample_departments["dept2_id"], page_size=5
+        )
+
+        self.assertIsNone(cursor)
+        self.assertEqual({c.id for c in claims}, set(dept2_ids))
+
+    def test_get_by_user_page_and_departments_page(self):
+        """Verifica las variantes paginadas por usuario y por departamentos"""
+        self._create_claims(4)
+
+        claims, cursor = Claim.get_by_user_page(self.sample_user_id, page_size=3)
+        self.assertEqual(len(claims), 3)
+        rest, cursor = Claim.get_by_user_page(self.sample_user_id, cursor, 3)
+        self.assertEqual(len(rest), 1)
+        self.assertIsNone(cursor)
+
+        self.assertEqual(Claim.get_by_departments_page([]), ([], None))
+        claims, _ = Claim.get_by_departments_page(
+            [self.sample_departments["dept1_id"]], page_size=10
+        )
+        self.assertEqual(len(claims), 4)
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Verifica que un cursor inválido vuelve a la primera página"""
+        ids = self._create_claims(2)
+
+        claims, _ = Claim.get_all_with_filters_page(cursor="no-es-un-cursor")
+
+        self.assertEqual([c.id for c in claims], sorted(ids, reverse=True))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,8 +3,14 @@ Tests para el servicio de clasificación automática de reclamos.
 """
 
 import unittest
+import json
 import os
+import shutil
 import tempfile
+
+import joblib
+import numpy as np
+
 from modules.classifier import Classifier
 
 
@@ -58,6 +64,8 @@ class TestClassifierBase(unittest.TestCase):
             os.remove(self.classifier.model_path)
         if os.path.exists(self.classifier.vectorizer_path):
             os.remove(self.classifier.vectorizer_path)
+        if os.path.exists(self.classifier.manifest_path):
+            os.remove(self.classifier.manifest_path)
         if os.path.exists(self.temp_dir):
             os.rmdir(self.temp_dir)
 
@@ -188,6 +196,46 @@ class TestClassifierConfidence(TestClassifierBase):
         self.assertEqual(confidence, 0.0)
 
 
+class TestClassifierBatch(TestClassifierBase):
+    """Tests para clasificación por lotes"""
+
+    def setUp(self):
+        """Configuración con clasificador ya entrenado"""
+        super().setUp()
+        self.classifier.train(
+            self.sample_training_data["texts"], self.sample_training_data["labels"]
+        )
+
+    def test_classify_batch_matches_single_classification(self):
+        """Test que el lote coincide con clasificar texto por texto"""
+        texts = [
+            "El aire acondicionado hace ruido y no enfría",
+            "Las paredes tienen grietas grandes",
+            "No funciona el WiFi en el laboratorio",
+            "Texto sin relación alguna",
+        ]
+        labels, confidences = self.classifier.classify_batch(texts)
+
+        self.assertEqual(list(labels), [self.classifier.classify(t) for t in texts])
+        for text, confidence in zip(texts, confidences):
+            self.assertAlmostEqual(confidence, self.classifier.get_confidence(text))
+
+    def test_classify_batch_applies_fallback(self):
+        """Test que la baja confianza y los textos vacíos van a Secretaría Técnica"""
+        labels, confidences = self.classifier.classify_batch(["", "xyz"])
+
+        self.assertEqual(confidences[0], 0.0)
+        self.assertLess(confidences[1], Classifier.MIN_CONFIDENCE)
+        self.assertEqual(list(labels), ["secretaria_tecnica", "secretaria_tecnica"])
+
+    def test_classify_batch_with_empty_list(self):
+        """Test que un lote vacío retorna arreglos vacíos"""
+        labels, confidences = self.classifier.classify_batch([])
+
+        self.assertEqual(len(labels), 0)
+        self.assertEqual(len(confidences), 0)
+
+
 class TestClassifierAvailability(TestClassifierBase):
     """Tests para verificación de disponibilidad del modelo"""
 
@@ -203,6 +251,112 @@ class TestClassifierAvailability(TestClassifierBase):
         self.assertTrue(self.classifier.is_model_available())
 
 
+class TestClassifierReload(TestClassifierBase):
+    """Tests para la recarga del modelo desde disco"""
+
+    def setUp(self):
+        """Configuración con un modelo entrenado y otra instancia que lo carga"""
+        super().setUp()
+        self.classifier.train(
+            self.sample_training_data["texts"], self.sample_training_data["labels"]
+        )
+        self.worker = Classifier()
+        self.worker.model_path = self.classifier.model_path
+        self.worker.vectorizer_path = self.classifier.vectorizer_path
+        self.worker.refresh(force=True)
+
+    def test_refresh_loads_model_eagerly(self):
+        """Test que refresh carga el modelo antes de la primera clasificación"""
+        self.assertTrue(self.worker.is_trained)
+
+    def test_new_model_on_disk_is_swapped_in(self):
+        """Test que un reentrenamiento se recarga sin crear otra instancia"""
+        self.classifier.train(
+            ["Se rompió el ascensor", "No hay WiFi"], ["ascensores", "sistemas"]
+        )
+
+        # Dentro del intervalo se sigue usando el modelo cargado
+        self.assertNotIn("ascensores", self.worker.classifier.classes_)
+
+        self.worker.reload_interval = 0
+        self.assertEqual(self.worker.classify("Se rompió el ascensor"), "ascensores")
+
+    def test_availability_check_is_cached(self):
+        """Test que la disponibilidad no consulta el disco en cada llamada"""
+        os.remove(self.classifier.model_path)
+
+        self.worker.is_trained = False
+        self.assertTrue(self.worker.is_model_available())
+        self.assertFalse(self.worker.refresh(force=True))
+
+
+class TestClassifierArtifacts(TestClassifierBase):
+    """Tests para el formato versionado de artefactos"""
+
+    def setUp(self):
+        """Configuración con clasificador ya entrenado"""
+        super().setUp()
+        self.classifier.train(
+            self.sample_training_data["texts"], self.sample_training_data["labels"]
+        )
+
+    def _new_classifier(self):
+        new_classifier = Classifier()
+        new_classifier.model_path = self.classifier.model_path
+        new_classifier.vectorizer_path = self.classifier.vectorizer_path
+        return new_classifier
+
+    def test_manifest_describes_training_run(self):
+        """Test que el manifiesto registra versión, hash y etiquetas"""
+        with open(self.classifier.manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        self.assertEqual(manifest["format_version"], Classifier.ARTIFACT_VERSION)
+        self.assertEqual(len(manifest["training_set_hash"]), 64)
+        self.assertEqual(
+            manifest["labels"], ["infraestructura", "mantenimiento", "sistemas"]
+        )
+
+    def test_arrays_are_memory_mapped(self):
+        """Test que los arreglos del modelo se cargan con mmap"""
+        new_classifier = self._new_classifier()
+        new_classifier._load_model()
+
+        self.assertIsInstance(new_classifier.classifier.feature_log_prob_, np.memmap)
+        self.assertEqual(
+            new_classifier.vectorizer.vocabulary_,
+            self.classifier.vectorizer.vocabulary_,
+        )
+        self.assertEqual(
+            new_classifier.manifest["run_id"], self.classifier.manifest["run_id"]
+        )
+
+    def test_mismatched_training_runs_fail_fast(self):
+        """Test que archivos de entrenamientos distintos no se cargan"""
+        stale_path = os.path.join(self.temp_dir, "stale_vectorizer.joblib")
+        shutil.copy(self.classifier.vectorizer_path, stale_path)
+        self.classifier.train(
+            self.sample_training_data["texts"], self.sample_training_data["labels"]
+        )
+        os.replace(stale_path, self.classifier.vectorizer_path)
+
+        new_classifier = self._new_classifier()
+        with self.assertRaisesRegex(ValueError, "entrenamientos distintos"):
+            new_classifier.classify("El aire acondicionado no funciona")
+
+    def test_legacy_pickles_are_still_loaded(self):
+        """Test que se cargan los modelos guardados sin manifiesto"""
+        os.remove(self.classifier.manifest_path)
+        joblib.dump(self.classifier.classifier, self.classifier.model_path)
+        joblib.dump(self.classifier.vectorizer, self.classifier.vectorizer_path)
+
+        new_classifier = self._new_classifier()
+        result = new_classifier.classify("El aire acondicionado no funciona")
+
+        self.assertEqual(result, "mantenimiento")
+        self.assertIsNone(new_classifier.manifest)
+
+
 class TestClassifierIntegration(TestClassifierBase):
     """Tests de integración del clasificador"""
 
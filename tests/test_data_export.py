@@ -0,0 +1,165 @@
+"""
+Tests para las exportaciones de datos (CSVReport y ParquetReport)
+"""
+
+import csv
+import importlib.util
+import io
+import sys
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+
+from modules.config import db
+from modules.claim import Claim, ClaimStatus
+from modules.claim_transfer import ClaimTransfer
+from modules.report_generator import (
+    CSVReport,
+    ParquetReport,
+    create_report,
+)
+from tests.conftest import BaseTestCase
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestDataExport(BaseTestCase):
+    """Exportaciones planas, por lotes e incrementales"""
+
+    def setUp(self):
+        super().setUp()
+        self._create_sample_users()
+
+        self.dept1_id = self.sample_departments["dept1_id"]
+        self.dept2_id = self.sample_departments["dept2_id"]
+        self.claim_ids = []
+        for i, department_id in enumerate(
+            [self.dept1_id, self.dept1_id, self.dept2_id]
+        ):
+            claim, _ = Claim.create(
+                user_id=self.creator_id,
+                detail=f"Reclamo exportado número {i}",
+                department_id=department_id,
+            )
+            self.claim_ids.append(claim.id)
+
+    def _rows(self, report: CSVReport) -> list[dict]:
+        return list(csv.DictReader(io.StringIO(report.generate())))
+
+    def test_csv_claims_export(self):
+        """Una fila por reclamo de los departamentos, con el estado por nombre"""
+        rows = self._rows(CSVReport([self.dept1_id]))
+
+        self.assertEqual([int(row["id"]) for row in rows], self.claim_ids[:2])
+        self.assertEqual(rows[0]["status"], "PENDING")
+        self.assertEqual(rows[0]["detail"], "Reclamo exportado número 0")
+        self.assertIn("updated_at", rows[0])
+
+    def test_export_builds_no_orm_objects(self):
+        """Las filas salen del SELECT sin pasar por el mapa de identidades"""
+        db.session.expunge_all()
+
+        report = CSVReport(None, batch_size=1)
+        chunks = list(report.stream())
+
+        self.assertEqual(len(db.session.identity_map), 0)
+        # Encabezado y un fragmento por lote
+        self.assertEqual(len(chunks), 1 + 3)
+        self.assertEqual(report.exported_rows, 3)
+
+    def test_incremental_export_since_watermark(self):
+        """Con la marca de agua anterior solo se exporta lo modificado"""
+        first = CSVReport(None)
+        self.assertEqual(len(self._rows(first)), 3)
+        watermark = first.watermark
+
+        Claim.update_status(self.claim_ids[2], ClaimStatus.IN_PROGRESS, self.admin_id)
+
+        second = CSVReport(None, since=watermark, overlap=timedelta(0))
+        rows = self._rows(second)
+        self.assertEqual([int(row["id"]) for row in rows], [self.claim_ids[2]])
+        self.assertEqual(rows[0]["status"], "IN_PROGRESS")
+        self.assertGreater(second.watermark, watermark)
+
+        # Sin cambios no hay filas y la marca de agua se mantiene
+        third = CSVReport(None, since=second.watermark, overlap=timedelta(0))
+        self.assertEqual(self._rows(third), [])
+        self.assertEqual(third.watermark, second.watermark)
+
+    def test_incremental_export_overlaps_watermark(self):
+        """Un cambio fechado antes de la marca pero confirmado después no se pierde"""
+        first = CSVReport(None)
+        self._rows(first)
+
+        # Escritura con fecha anterior a la marca de agua (confirmada tarde)
+        late = first.watermark - timedelta(seconds=1)
+        db.session.execute(
+            Claim.__table__.update()
+            .where(Claim.__table__.c.id == self.claim_ids[0])
+            .values(detail="Reclamo confirmado tarde", updated_at=late)
+        )
+        db.session.commit()
+
+        second = CSVReport(None, since=first.watermark)
+        rows = {int(row["id"]): row for row in self._rows(second)}
+
+        # Las filas del margen se repiten (se deduplican por id)
+        self.assertEqual(rows[self.claim_ids[0]]["detail"], "Reclamo confirmado tarde")
+        self.assertEqual(len(rows), second.exported_rows)
+        self.assertEqual(second.watermark, first.watermark)
+
+    def test_related_datasets(self):
+        """Historial de estados, derivaciones y adhesiones"""
+        Claim.update_status(self.claim_ids[0], ClaimStatus.RESOLVED, self.admin_id)
+        ClaimTransfer.transfer(self.claim_ids[1], self.dept2_id, self.admin_id)
+        Claim.add_supporter(self.claim_ids[2], self.supporter_id)
+
+        history = self._rows(CSVReport([self.dept1_id], dataset="status_history"))
+        self.assertEqual(
+            (history[0]["old_status"], history[0]["new_status"]),
+            ("PENDING", "RESOLVED"),
+        )
+
+        transfers = self._rows(CSVReport([self.dept1_id], dataset="transfers"))
+        self.assertEqual(int(transfers[0]["from_department_id"]), self.dept1_id)
+        self.assertEqual(int(transfers[0]["to_department_id"]), self.dept2_id)
+
+        supporters = self._rows(CSVReport([self.dept2_id], dataset="supporters"))
+        self.assertEqual(int(supporters[0]["user_id"]), self.supporter_id)
+        self.assertEqual(
+            self._rows(CSVReport([self.dept1_id], dataset="supporters")), []
+        )
+
+    def test_invalid_dataset(self):
+        with self.assertRaises(ValueError):
+            CSVReport(None, dataset="users")
+
+    def test_create_report_export_formats(self):
+        self.assertIsInstance(create_report("csv", [self.dept1_id]), CSVReport)
+        self.assertIsInstance(
+            create_report("parquet", [self.dept1_id], dataset="transfers"),
+            ParquetReport,
+        )
+
+    def test_parquet_without_pyarrow(self):
+        """pyarrow es opcional: sin él no se genera el archivo"""
+        with patch.dict(sys.modules, {"pyarrow": None, "pyarrow.parquet": None}):
+            self.assertIsNone(ParquetReport(None).generate())
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow no está instalado")
+    def test_parquet_export(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        report = ParquetReport([self.dept1_id], batch_size=1)
+        table = pq.read_table(io.BytesIO(report.generate()))
+
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column("id").to_pylist(), self.claim_ids[:2])
+        self.assertEqual(table.column("status").to_pylist(), ["PENDING", "PENDING"])
+        self.assertEqual(table.schema.field("updated_at").type, pa.timestamp("us"))
+        self.assertEqual(report.exported_rows, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests para la tabla de palabras clave por departamento.
+"""
+
+import unittest
+from tests.conftest import BaseTestCase
+
+from modules.config import db
+from modules.admin_user import AdminRole, AdminUser
+from modules.analytics_generator import AnalyticsGenerator
+from modules.claim import Claim
+from modules.claim_transfer import ClaimTransfer
+from modules.department_keyword import DepartmentKeyword
+from modules.end_user import Cloister, EndUser
+
+
+class TestDepartmentKeyword(BaseTestCase):
+    """Tests para el mantenimiento incremental de department_keyword"""
+
+    def setUp(self):
+        """Configura el entorno de prueba"""
+        super().setUp()
+        user = EndUser(
+            first_name="Test",
+            last_name="User",
+            email="keywords@test.com",
+            username="keywordsuser",
+            cloister=Cloister.STUDENT,
+        )
+        user.set_password("test123")
+        admin = AdminUser(
+            first_name="Admin",
+            last_name="Keywords",
+            email="admin.keywords@test.com",
+            username="adminkeywords",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            department_id=self.sample_departments["st_id"],
+        )
+        admin.set_password("admin123")
+        db.session.add_all([user, admin])
+        db.session.commit()
+        self.user_id = user.id
+        self.admin_id = admin.id
+        self.dept1_id = self.sample_departments["dept1_id"]
+        self.dept2_id = self.sample_departments["dept2_id"]
+
+        self.claim, _ = Claim.create(
+            user_id=self.user_id,
+            detail="La impresora de la biblioteca no imprime, impresora rota",
+            department_id=self.dept1_id,
+        )
+        Claim.create(
+            user_id=self.user_id,
+            detail="El proyector del aula 301 está roto",
+            department_id=self.dept2_id,
+        )
+
+    def test_create_claim_updates_counts(self):
+        """Crear un reclamo suma sus palabras al departamento"""
+        self.assertEqual(
+            DepartmentKeyword.get_top([self.dept1_id], top_n=10),
+            {"impresora": 2, "biblioteca": 1, "imprime": 1, "rota": 1},
+        )
+
+    def test_transfer_moves_counts_between_departments(self):
+        """Derivar un reclamo mueve sus palabras al nuevo departamento"""
+        ClaimTransfer.transfer(self.claim.id, self.dept2_id, self.admin_id)
+
+        self.assertEqual(DepartmentKeyword.get_top([self.dept1_id], top_n=10), {})
+        self.assertEqual(
+            DepartmentKeyword.get_top([self.dept2_id], top_n=2),
+            {"impresora": 2, "aula": 1},
+        )
+
+    def test_delete_claim_removes_counts(self):
+        """Eliminar un reclamo resta sus palabras"""
+        db.session.delete(self.claim)
+        db.session.commit()
+
+        self.assertEqual(DepartmentKeyword.get_top([self.dept1_id], top_n=10), {})
+
+    def test_top_across_departments_sums_counts(self):
+        """Sin filtro se suman las frecuencias de todos los departamentos"""
+        keywords = AnalyticsGenerator.get_keyword_frequencies(department_ids=None)
+
+        self.assertEqual(list(keywords)[0], "impresora")
+        self.assertEqual(keywords["rota"], 1)
+        self.assertEqual(keywords["roto"], 1)
+
+    def test_table_matches_live_computation(self):
+        """La tabla coincide con el recálculo completo desde los reclamos"""
+        ClaimTransfer.transfer(self.claim.id, self.dept2_id, self.admin_id)
+
+        self.assertEqual(DepartmentKeyword.find_differences(), {})
+
+    def test_rebuild_repairs_differences(self):
+        """La reconstrucción corrige una tabla desincronizada"""
+        db.session.execute(DepartmentKeyword.__table__.delete())
+        db.session.commit()
+        self.assertNotEqual(DepartmentKeyword.find_differences(), {})
+
+        DepartmentKeyword.rebuild()
+
+        self.assertEqual(DepartmentKeyword.find_differences(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
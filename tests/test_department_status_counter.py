@@ -0,0 +1,134 @@
+"""
+Tests para los contadores de reclamos por departamento y estado.
+"""
+
+import unittest
+from tests.conftest import BaseTestCase
+
+from modules.config import db
+from modules.admin_user import AdminRole, AdminUser
+from modules.claim import Claim, ClaimStatus
+from modules.claim_transfer import ClaimTransfer
+from modules.department_status_counter import DepartmentStatusCounter
+from modules.end_user import Cloister, EndUser
+
+
+class TestDepartmentStatusCounter(BaseTestCase):
+    """Tests para el mantenimiento incremental de department_status_counter"""
+
+    def setUp(self):
+        """Configura el entorno de prueba"""
+        super().setUp()
+        user = EndUser(
+            first_name="Test",
+            last_name="User",
+            email="counters@test.com",
+            username="countersuser",
+            cloister=Cloister.STUDENT,
+        )
+        user.set_password("test123")
+        admin = AdminUser(
+            first_name="Admin",
+            last_name="Counters",
+            email="admin.counters@test.com",
+            username="admincounters",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            department_id=self.sample_departments["st_id"],
+        )
+        admin.set_password("admin123")
+        db.session.add_all([user, admin])
+        db.session.commit()
+        self.user_id = user.id
+        self.admin_id = admin.id
+        self.dept1_id = self.sample_departments["dept1_id"]
+        self.dept2_id = self.sample_departments["dept2_id"]
+
+        self.claim, _ = Claim.create(
+            user_id=self.user_id,
+            detail="La impresora no imprime",
+            department_id=self.dept1_id,
+        )
+        Claim.create(
+            user_id=self.user_id,
+            detail="El proyector está roto",
+            department_id=self.dept1_id,
+        )
+        Claim.create(
+            user_id=self.user_id,
+            detail="Falta agua en el bebedero",
+            department_id=self.dept2_id,
+        )
+
+    def test_create_claim_increments_pending(self):
+        """Crear reclamos suma al contador de pendientes del departamento"""
+        counts = DepartmentStatusCounter.get_counts([self.dept1_id])
+
+        self.assertEqual(counts[ClaimStatus.PENDING], 2)
+        self.assertEqual(counts[ClaimStatus.RESOLVED], 0)
+
+    def test_update_status_moves_count(self):
+        """Cambiar el estado mueve el reclamo entre contadores"""
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+
+        counts = DepartmentStatusCounter.get_counts([self.dept1_id])
+        self.assertEqual(counts[ClaimStatus.PENDING], 1)
+        self.assertEqual(counts[ClaimStatus.RESOLVED], 1)
+
+    def test_transfer_moves_count_between_departments(self):
+        """Derivar un reclamo lo mueve al contador del nuevo departamento"""
+        ClaimTransfer.transfer(self.claim.id, self.dept2_id, self.admin_id)
+
+        by_department = DepartmentStatusCounter.get_counts_by_department(
+            [self.dept1_id, self.dept2_id]
+        )
+        self.assertEqual(by_department[self.dept1_id][ClaimStatus.PENDING], 1)
+        self.assertEqual(by_department[self.dept2_id][ClaimStatus.PENDING], 2)
+
+    def test_delete_claim_decrements(self):
+        """Eliminar un reclamo resta del contador"""
+        db.session.delete(self.claim)
+        db.session.commit()
+
+        self.assertEqual(
+            DepartmentStatusCounter.get_counts([self.dept1_id])[ClaimStatus.PENDING], 1
+        )
+
+    def test_dashboard_counts_read_counters(self):
+        """Los conteos del dashboard salen de los contadores"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+
+        self.assertEqual(
+            Claim.get_dashboard_counts(),
+            {
+                "total_claims": 3,
+                "pending_claims": 2,
+                "in_progress_claims": 1,
+                "resolved_claims": 0,
+                "invalid_claims": 0,
+            },
+        )
+        self.assertEqual(
+            Claim.get_department_dashboard_counts([self.dept1_id])[self.dept1_id],
+            {"total": 2, "pending": 1, "in_progress": 1, "resolved": 0, "invalid": 0},
+        )
+
+    def test_counters_match_live_aggregate(self):
+        """Los contadores coinciden con el agregado en vivo"""
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+        ClaimTransfer.transfer(self.claim.id, self.dept2_id, self.admin_id)
+
+        self.assertEqual(DepartmentStatusCounter.find_differences(), {})
+
+    def test_rebuild_repairs_differences(self):
+        """La reconstrucción corrige contadores desincronizados"""
+        db.session.execute(DepartmentStatusCounter.__table__.delete())
+        db.session.commit()
+        self.assertNotEqual(DepartmentStatusCounter.find_differences(), {})
+
+        DepartmentStatusCounter.rebuild()
+
+        self.assertEqual(DepartmentStatusCounter.find_differences(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
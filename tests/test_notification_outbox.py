@@ -0,0 +1,244 @@
+"""
+Tests para la cola de notificaciones (NotificationOutbox y NotificationDispatcher)
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime as Datetime, timedelta
+from unittest.mock import Mock, patch
+
+from modules.config import db
+from modules.claim import Claim, ClaimStatus
+from modules.claim_status_history import ClaimStatusHistory
+from modules.department import Department
+from modules.end_user import EndUser
+from modules.notification_dispatcher import NotificationDispatcher
+from modules.notification_outbox import NotificationOutbox
+from modules.user_notification import UserNotification
+from tests.conftest import BaseTestCase, create_sample_users
+
+
+def create_users_and_claim(department_id: int) -> tuple[int, int, int, int]:
+    """Crea creador, adherente, administrador y un reclamo adherido"""
+    users = create_sample_users(department_id)
+    claim, _ = Claim.create(
+        user_id=users["creator_id"],
+        detail="Reclamo con notificaciones",
+        department_id=department_id,
+    )
+    Claim.add_supporter(claim.id, users["supporter_id"])
+    return users["creator_id"], users["supporter_id"], users["admin_id"], claim.id
+
+
+class TestNotificationOutbox(BaseTestCase):
+    """Eventos de cambio de estado procesados fuera de la transacción"""
+
+    def setUp(self):
+        super().setUp()
+        # Sin worker: los eventos quedan en la cola hasta procesarlos a mano
+        self.app.config["NOTIFICATION_DISPATCH_INLINE"] = False
+        self.app.config["NOTIFICATION_DISPATCH_WORKER"] = False
+        self.creator_id, self.supporter_id, self.admin_id, self.claim_id = (
+            create_users_and_claim(self.sample_departments["st_id"])
+        )
+
+    def _notification_count(self) -> int:
+        return db.session.query(UserNotification).count()
+
+    def test_update_status_only_enqueues(self):
+        """El cambio de estado guarda el historial y un evento, sin notificaciones"""
+        success, error = Claim.update_status(
+            self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id
+        )
+
+        self.assertTrue(success)
+        self.assertIsNone(error)
+        self.assertEqual(self._notification_count(), 0)
+        self.assertEqual(db.session.query(ClaimStatusHistory).count(), 1)
+        self.assertEqual(NotificationOutbox.get_lag()["pending"], 1)
+
+    def test_dispatch_creates_notifications(self):
+        """El worker crea una notificación por destinatario y vacía la cola"""
+        Claim.update_status(self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id)
+
+        self.assertEqual(NotificationOutbox.dispatch_pending(), 1)
+
+        self.assertEqual(UserNotification.get_unread_count(self.creator_id), 1)
+        self.assertEqual(UserNotification.get_unread_count(self.supporter_id), 1)
+        self.assertEqual(
+            db.session.get(EndUser, self.supporter_id).unread_notifications_count, 1
+        )
+        lag = NotificationOutbox.get_lag()
+        self.assertEqual((lag["pending"], lag["lag_seconds"]), (0, 0.0))
+
+    def test_dispatch_is_idempotent(self):
+        """Un worker que leyó el evento antes de que otro lo procesara no lo
+        vuelve a notificar"""
+        Claim.update_status(self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        event = db.session.query(NotificationOutbox).one()
+        stale_rows = [(event.id, event.claim_status_history_id, self.claim_id)]
+
+        self.assertEqual(NotificationOutbox.dispatch_pending(), 1)
+
+        # El segundo worker recibe la lectura anterior al procesamiento
+        execute = db.session.execute
+        calls = []
+
+        def stale_execute(statement, *args, **kwargs):
+            calls.append(statement)
+            if len(calls) == 1:
+                return Mock(all=Mock(return_value=stale_rows))
+            return execute(statement, *args, **kwargs)
+
+        with patch.object(db.session, "execute", side_effect=stale_execute):
+            self.assertEqual(NotificationOutbox.dispatch_pending(), 0)
+
+        self.assertEqual(self._notification_count(), 2)
+        self.assertEqual(
+            db.session.get(EndUser, self.creator_id).unread_notifications_count, 1
+        )
+
+    def test_failed_event_is_retried(self):
+        """Un error posterga el evento; el siguiente intento lo procesa"""
+        Claim.update_status(self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id)
+
+        with patch.object(
+            UserNotification,
+            "create_for_status_change",
+            side_effect=RuntimeError("base bloqueada"),
+        ):
+            self.assertEqual(NotificationOutbox.dispatch_pending(), 0)
+
+        event = db.session.query(NotificationOutbox).one()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn("base bloqueada", event.last_error)
+        self.assertGreater(event.available_at, Datetime.now())
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(self._notification_count(), 0)
+
+        # Todavía no venció la espera
+        self.assertEqual(NotificationOutbox.dispatch_pending(), 0)
+
+        event.available_at = Datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+        self.assertEqual(NotificationOutbox.dispatch_pending(), 1)
+        self.assertEqual(self._notification_count(), 2)
+
+    def test_exhausted_event_is_reported_as_failed(self):
+        """Los eventos que agotaron los intentos no se procesan y se informan"""
+        Claim.update_status(self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        event = db.session.query(NotificationOutbox).one()
+        event.attempts = 5
+        db.session.commit()
+
+        self.assertEqual(NotificationOutbox.dispatch_pending(max_attempts=5), 0)
+        lag = NotificationOutbox.get_lag(max_attempts=5)
+        self.assertEqual((lag["pending"], lag["failed"]), (0, 1))
+
+    def test_lag_reports_oldest_pending(self):
+        """El retraso es la antigüedad del evento pendiente más viejo"""
+        Claim.update_status(self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        event = db.session.query(NotificationOutbox).one()
+        event.created_at = Datetime.now() - timedelta(seconds=90)
+        db.session.commit()
+
+        lag = NotificationOutbox.get_lag()
+
+        self.assertEqual(lag["pending"], 1)
+        self.assertGreaterEqual(lag["lag_seconds"], 90)
+
+    def test_inline_dispatch(self):
+        """Con NOTIFICATION_DISPATCH_INLINE las notificaciones se crean en la petición"""
+        self.app.config["NOTIFICATION_DISPATCH_INLINE"] = True
+
+        Claim.update_status(self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id)
+
+        self.assertEqual(self._notification_count(), 2)
+        self.assertEqual(NotificationOutbox.get_lag()["pending"], 0)
+
+
+class TestNotificationDispatcherThread(unittest.TestCase):
+    """El hilo del worker procesa los eventos luego del commit"""
+
+    def setUp(self):
+        from modules.config import create_app
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///"
+                + os.path.join(self.temp_dir.name, "test.db"),
+                "SIMILARITY_INDEX_PATH": None,
+                "NOTIFICATION_DISPATCH_INLINE": False,
+                "NOTIFICATION_DISPATCH_WORKER": True,
+                "NOTIFICATION_DISPATCH_INTERVAL": 0.05,
+            }
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        department = Department(
+            name="secretaria_tecnica",
+            display_name="Secretaría Técnica",
+            is_technical_secretariat=True,
+        )
+        db.session.add(department)
+        db.session.commit()
+        self.department_id = department.id
+        self.dispatcher = NotificationDispatcher()
+
+    def tearDown(self):
+        self.dispatcher.shutdown(timeout=5)
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        self.temp_dir.cleanup()
+
+    def _wait_until_dispatched(self) -> None:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            db.session.rollback()
+            if NotificationOutbox.get_lag()["pending"] == 0:
+                break
+            time.sleep(0.05)
+
+    def test_worker_dispatches_after_commit(self):
+        _, supporter_id, admin_id, claim_id = create_users_and_claim(self.department_id)
+
+        with patch(
+            "modules.notification_dispatcher.notification_dispatcher", self.dispatcher
+        ):
+            Claim.update_status(claim_id, ClaimStatus.IN_PROGRESS, admin_id)
+
+        self._wait_until_dispatched()
+        self.assertEqual(NotificationOutbox.get_lag()["pending"], 0)
+        self.assertEqual(UserNotification.get_unread_count(supporter_id), 1)
+
+    def test_worker_started_with_app_drains_backlog(self):
+        """Al iniciar se procesan los eventos que quedaron de antes del reinicio"""
+        _, supporter_id, admin_id, claim_id = create_users_and_claim(self.department_id)
+        self.app.config["NOTIFICATION_DISPATCH_WORKER"] = False
+        Claim.update_status(claim_id, ClaimStatus.IN_PROGRESS, admin_id)
+        self.assertEqual(NotificationOutbox.get_lag()["pending"], 1)
+
+        self.app.config["NOTIFICATION_DISPATCH_WORKER"] = True
+        self.dispatcher.init_app(self.app)
+
+        self._wait_until_dispatched()
+        self.assertEqual(NotificationOutbox.get_lag()["pending"], 0)
+        self.assertEqual(UserNotification.get_unread_count(supporter_id), 1)
+
+    def test_worker_disabled_is_not_started(self):
+        self.app.config["NOTIFICATION_DISPATCH_WORKER"] = False
+
+        self.dispatcher.init_app(self.app)
+
+        self.assertIsNone(self.dispatcher._thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
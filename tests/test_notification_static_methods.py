@@ -5,6 +5,8 @@ Verifica las funcionalidades del sistema de notificaciones
 
 import unittest
 
+from sqlalchemy import event
+
 from modules.config import db
 from modules.claim import Claim, ClaimStatus
 from modules.claim_status_history import ClaimStatusHistory
@@ -363,5 +365,347 @@ class TestNotificationStaticMethods(BaseTestCase):
         self.assertEqual(UserNotification.get_unread_count(self.user2_id), 0)
 
 
+class TestUnreadNotificationsCounter(BaseTestCase):
+    """Contador de notificaciones pendientes guardado en el usuario"""
+
+    def setUp(self):
+        super().setUp()
+        creator = EndUser(
+            first_name="Usuario",
+            last_name="Uno",
+            email="user1@test.com",
+            username="user1",
+            cloister=Cloister.STUDENT,
+        )
+        supporter = EndUser(
+            first_name="Usuario",
+            last_name="Dos",
+            email="user2@test.com",
+            username="user2",
+            cloister=Cloister.TEACHER,
+        )
+        creator.set_password("password123")
+        supporter.set_password("password123")
+        db.session.add_all([creator, supporter])
+        db.session.commit()
+
+        admin, _ = AdminUser.create(
+            first_name="Admin",
+            last_name="Test",
+            email="admin@test.com",
+            username="admin",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            password="admin123",
+            department_id=self.sample_departments["st_id"],
+        )
+
+        self.creator_id = creator.id
+        self.supporter_id = supporter.id
+        self.admin_id = admin.id
+        self.claim, _ = Claim.create(
+            user_id=self.creator_id, detail="Reclamo con contador", department_id=1
+        )
+        Claim.add_supporter(self.claim.id, self.supporter_id)
+
+    def _counter(self, user_id: int) -> int:
+        db.session.expire_all()
+        return db.session.get(EndUser, user_id).unread_notifications_count
+
+    def _assert_matches_live_count(self):
+        for user_id in (self.creator_id, self.supporter_id):
+            self.assertEqual(
+                self._counter(user_id), UserNotification.get_unread_count(user_id)
+            )
+
+    def test_update_status_increments_recipients(self):
+        """El cambio de estado suma una pendiente al creador y a cada adherente"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+
+        self.assertEqual(self._counter(self.creator_id), 2)
+        self.assertEqual(self._counter(self.supporter_id), 2)
+        self._assert_matches_live_count()
+
+    def test_mark_as_read_decrements_once(self):
+        """Marcar dos veces la misma notificación descuenta una sola vez"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        notification = UserNotification.get_pending_for_user(self.creator_id)[0]
+
+        UserNotification.mark_notification_as_read(notification.id, self.creator_id)
+        UserNotification.mark_notification_as_read(notification.id, self.creator_id)
+
+        self.assertEqual(self._counter(self.creator_id), 0)
+        self.assertEqual(self._counter(self.supporter_id), 1)
+        self._assert_matches_live_count()
+
+    def test_mark_all_resets_counter(self):
+        """Marcar todas deja el contador en 0 solo para ese usuario"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+
+        UserNotification.mark_all_as_read_for_user(self.supporter_id)
+
+        self.assertEqual(self._counter(self.supporter_id), 0)
+        self.assertEqual(self._counter(self.creator_id), 2)
+        self._assert_matches_live_count()
+
+    def test_rebuild_unread_counts(self):
+        """La reconstrucción corrige contadores desincronizados"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        db.session.get(EndUser, self.creator_id).unread_notifications_count = 7
+        db.session.commit()
+
+        UserNotification.rebuild_unread_counts()
+
+        self._assert_matches_live_count()
+
+    def test_fan_out_is_single_insert(self):
+        """Las notificaciones se insertan con una sola sentencia sin importar
+        la cantidad de adherentes"""
+        for i in range(3, 8):
+            user = EndUser(
+                first_name="Usuario",
+                last_name=f"Adherente {i}",
+                email=f"user{i}@test.com",
+                username=f"user{i}",
+                cloister=Cloister.STUDENT,
+            )
+            user.set_password("password123")
+            db.session.add(user)
+            db.session.commit()
+            Claim.add_supporter(self.claim.id, user.id)
+
+        inserts: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            if "INSERT INTO user_notification" in statement:
+                inserts.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+        self.assertEqual(len(inserts), 1)
+        notifications = db.session.query(UserNotification).all()
+        self.assertEqual(len(notifications), 7)
+        self.assertTrue(all(n.created_at is not None for n in notifications))
+        self.assertEqual(
+            {n.claim_status_history_id for n in notifications},
+            {self.claim.status_history[-1].id},
+        )
+        self._assert_matches_live_count()
+
+    def _capture_statements(self, func):
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+        return result, statements
+
+    def test_mark_all_is_single_update(self):
+        """Marcar todas no carga las notificaciones: un solo UPDATE"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+
+        marked, statements = self._capture_statements(
+            lambda: UserNotification.mark_all_as_read_for_user(self.creator_id)
+        )
+
+        self.assertEqual(marked, 2)
+        notification_statements = [s for s in statements if "user_notification" in s]
+        self.assertEqual(len(notification_statements), 1)
+        self.assertTrue(notification_statements[0].lstrip().startswith("UPDATE"))
+        self.assertEqual(UserNotification.mark_all_as_read_for_user(self.creator_id), 0)
+
+    def test_mark_as_read_by_ids(self):
+        """Marca solo las notificaciones propias y pendientes de la lista"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+        own = [n.id for n in UserNotification.get_pending_for_user(self.creator_id)]
+        other = UserNotification.get_pending_for_user(self.supporter_id)[0].id
+
+        marked = UserNotification.mark_as_read_by_ids(
+            self.creator_id, [own[0], own[0], other]
+        )
+
+        self.assertEqual(marked, 1)
+        self.assertEqual(UserNotification.get_unread_count(self.creator_id), 1)
+        self.assertEqual(UserNotification.get_unread_count(self.supporter_id), 2)
+        self._assert_matches_live_count()
+
+        # Ya leída: no vuelve a descontar
+        self.assertEqual(UserNotification.mark_as_read_by_ids(self.creator_id, own), 1)
+        self.assertEqual(UserNotification.mark_as_read_by_ids(self.creator_id, []), 0)
+        self._assert_matches_live_count()
+
+    def test_mark_selected_route(self):
+        """La ruta marca las notificaciones seleccionadas en la página"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        Claim.update_status(self.claim.id, ClaimStatus.RESOLVED, self.admin_id)
+        selected = UserNotification.get_pending_for_user(self.supporter_id)[0].id
+        self.client.post(
+            "/login", data={"username": "user2", "password": "password123"}
+        )
+
+        response = self.client.post(
+            "/users/me/notifications/mark-read",
+            data={"notification_ids": [str(selected)]},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        pending = UserNotification.get_pending_for_user(self.supporter_id)
+        self.assertEqual(len(pending), 1)
+        self.assertNotEqual(pending[0].id, selected)
+
+    def test_badge_does_not_query_notifications(self):
+        """La barra de navegación muestra el contador sin consultar notificaciones"""
+        Claim.update_status(self.claim.id, ClaimStatus.IN_PROGRESS, self.admin_id)
+        self.client.post(
+            "/login", data={"username": "user1", "password": "password123"}
+        )
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = self.client.get("/users/me/claims")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"badge-error", response.data)
+        self.assertFalse(
+            [statement for statement in statements if "user_notification" in statement]
+        )
+
+
+class TestNotificationsFeed(BaseTestCase):
+    """Listado paginado de notificaciones con solo las columnas necesarias"""
+
+    def setUp(self):
+        super().setUp()
+        user = EndUser(
+            first_name="Usuario",
+            last_name="Uno",
+            email="user1@test.com",
+            username="user1",
+            cloister=Cloister.STUDENT,
+        )
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.commit()
+        admin, _ = AdminUser.create(
+            first_name="Admin",
+            last_name="Test",
+            email="admin@test.com",
+            username="admin",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            password="admin123",
+            department_id=self.sample_departments["st_id"],
+        )
+        self.user_id = user.id
+        self.admin_id = admin.id
+        self.detail = "La calefacción del aula magna no funciona " * 5
+        self.claim, _ = Claim.create(
+            user_id=self.user_id, detail=self.detail, department_id=1
+        )
+
+    def _change_status(self, times: int) -> None:
+        statuses = [ClaimStatus.IN_PROGRESS, ClaimStatus.PENDING]
+        for i in range(times):
+            Claim.update_status(self.claim.id, statuses[i % 2], self.admin_id)
+
+    def test_feed_row_fields(self):
+        """Cada fila trae los datos del listado con el detalle truncado en SQL"""
+        self._change_status(1)
+
+        rows, next_cursor = UserNotification.get_feed_for_user(self.user_id)
+
+        self.assertIsNone(next_cursor)
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertNotIsInstance(row, UserNotification)
+        self.assertEqual(row.claim_id, self.claim.id)
+        self.assertEqual(row.detail_preview, self.detail[:100])
+        self.assertTrue(row.detail_truncated)
+        self.assertEqual(row.old_status, ClaimStatus.PENDING)
+        self.assertEqual(row.new_status, ClaimStatus.IN_PROGRESS)
+        self.assertEqual(row.changed_by_email, "admin@test.com")
+        self.assertIsNotNone(row.changed_at)
+
+    def test_feed_pages_cover_pending_once(self):
+        """Las páginas recorren todas las pendientes, de la más nueva a la más vieja"""
+        self._change_status(7)
+        read = UserNotification.get_pending_for_user(self.user_id)[0].id
+        UserNotification.mark_notification_as_read(read, self.user_id)
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = UserNotification.get_feed_for_user(
+                self.user_id, cursor=cursor, page_size=3
+            )
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+
+        expected = [n.id for n in UserNotification.get_pending_for_user(self.user_id)]
+        self.assertEqual(seen, expected)
+        self.assertNotIn(read, seen)
+
+    def test_feed_is_single_query(self):
+        """Una página es una sola consulta sin importar cuántas notificaciones tenga"""
+        self._change_status(6)
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.session.expire_all()
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            rows, _ = UserNotification.get_feed_for_user(self.user_id, page_size=5)
+            [(row.claim_id, row.changed_by_email) for row in rows]
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len(statements), 1)
+
+    def test_feed_routes(self):
+        """La página y el endpoint JSON muestran el listado paginado"""
+        self._change_status(3)
+        self.client.post(
+            "/login", data={"username": "user1", "password": "password123"}
+        )
+
+        page = self.client.get("/users/me/notifications")
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(f"Reclamo #{self.claim.id}".encode(), page.data)
+
+        response = self.client.get("/users/me/notifications/feed?page_size=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(len(data["notifications"]), 2)
+        self.assertEqual(data["notifications"][0]["changed_by"], "admin@test.com")
+        self.assertIsNotNone(data["next_cursor"])
+
+        response = self.client.get(
+            f"/users/me/notifications/feed?page_size=2&cursor={data['next_cursor']}"
+        )
+        data = response.get_json()
+        self.assertEqual(len(data["notifications"]), 1)
+        self.assertIsNone(data["next_cursor"])
+
+
 if __name__ == "__main__":
     unittest.main()
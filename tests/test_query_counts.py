@@ -0,0 +1,137 @@
+"""
+Tests de regresión de N+1: la cantidad de consultas de cada listado no debe
+crecer con la cantidad de reclamos de la página.
+"""
+
+import unittest
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from modules.config import db
+from modules.admin_user import AdminRole, AdminUser
+from modules.claim import Claim
+from modules.end_user import Cloister, EndUser
+from tests.conftest import BaseTestCase
+
+
+class TestListingQueryCounts(BaseTestCase):
+    """Cantidad de consultas por página de listados de reclamos"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = []
+        for i in range(3):
+            user = EndUser(
+                first_name=f"Usuario{i}",
+                last_name="Test",
+                email=f"user{i}@test.com",
+                username=f"user{i}",
+                cloister=Cloister.STUDENT,
+            )
+            user.set_password("test123")
+            self.users.append(user)
+        db.session.add_all(self.users)
+
+        admin, error = AdminUser.create(
+            first_name="Secretario",
+            last_name="Técnico",
+            email="secretary@test.com",
+            username="secretary",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            password="admin123",
+            department_id=self.sample_departments["st_id"],
+        )
+        self.assertIsNone(error)
+        db.session.commit()
+
+    def _add_claims(self, count: int) -> None:
+        """Crea reclamos de distintos creadores, con adherentes, en varios departamentos"""
+        departments = [
+            self.sample_departments["dept1_id"],
+            self.sample_departments["dept2_id"],
+        ]
+        for i in range(count):
+            creator = self.users[1 + i % 2]
+            claim, _ = Claim.create(
+                user_id=creator.id,
+                detail=f"Reclamo de prueba número {i}",
+                department_id=departments[i % 2],
+            )
+            Claim.add_supporter(claim.id, self.users[0].id)
+            if creator.id != self.users[1].id:
+                Claim.add_supporter(claim.id, self.users[1].id)
+
+    @contextmanager
+    def _count_queries(self):
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    def _queries_for(self, url: str) -> int:
+        db.session.expire_all()
+        with self._count_queries() as statements:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def _login(self, username: str, admin: bool = False):
+        password = "admin123" if admin else "test123"
+        self.client.post(
+            "/admin/login" if admin else "/login",
+            data={"username": username, "password": password},
+        )
+
+    def _assert_flat(self, url: str, login: tuple[str, bool]) -> None:
+        """Misma cantidad de consultas con 2 y con 8 reclamos en la página"""
+        self._login(*login)
+        self._add_claims(2)
+        few = self._queries_for(url)
+        self._add_claims(6)
+        many = self._queries_for(url)
+        self.assertEqual(few, many)
+
+    def test_claims_list(self):
+        self._assert_flat("/claims", ("user0", False))
+
+    def test_my_claims(self):
+        # user2 crea la mitad de los reclamos
+        self._assert_flat("/users/me/claims", ("user2", False))
+
+    def test_my_supported_claims(self):
+        self._assert_flat("/users/me/supported-claims", ("user0", False))
+
+    def test_admin_claims_list(self):
+        self._assert_flat("/admin/claims", ("secretary", True))
+
+    def test_supporters_count_matches_collection(self):
+        """El conteo por subconsulta coincide con la colección de adherentes"""
+        self._add_claims(4)
+        claims, _ = Claim.get_all_with_filters_page()
+
+        for claim in claims:
+            self.assertEqual(claim.supporters_count, len(claim.supporters))
+
+    def test_supporter_ids_by_claim(self):
+        """Los IDs de adherentes de varios reclamos salen de una sola consulta"""
+        self._add_claims(2)
+        claims, _ = Claim.get_all_with_filters_page()
+        claim_ids = [claim.id for claim in claims]
+
+        with self._count_queries() as statements:
+            result = Claim.get_supporter_ids_by_claim(claim_ids)
+
+        self.assertEqual(len(statements), 1)
+        for claim_id in claim_ids:
+            self.assertEqual(result[claim_id], Claim.get_supporter_ids(claim_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
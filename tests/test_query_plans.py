@@ -0,0 +1,61 @@
+"""
+Tests para los índices de los modelos: migración y planes de consulta.
+"""
+
+import unittest
+
+from sqlalchemy import inspect, text
+
+from modules.config import db
+from tests.conftest import BaseTestCase
+
+
+class TestQueryPlans(BaseTestCase):
+    """Las consultas de los modelos no recorren tablas completas"""
+
+    def setUp(self):
+        super().setUp()
+        # Datos propios del script (departamentos incluidos)
+        db.session.execute(text("DELETE FROM department"))
+        db.session.commit()
+
+    def test_queries_use_indexes(self):
+        """Ninguna consulta de Claim, UserNotification o AdminHelper hace SCAN"""
+        import check_query_plans
+
+        cases = check_query_plans.query_cases(check_query_plans.seed_sample_data())
+        failures = check_query_plans.find_full_scans(cases)
+
+        self.assertEqual(failures, {})
+
+    def test_detects_missing_index(self):
+        """Sin el índice de notificaciones el chequeo falla"""
+        import check_query_plans
+
+        ids = check_query_plans.seed_sample_data()
+        db.session.execute(text("DROP INDEX ix_user_notification_user_read_created"))
+
+        failures = check_query_plans.find_full_scans(check_query_plans.query_cases(ids))
+
+        self.assertIn("UserNotification.get_unread_count", failures)
+
+
+class TestIndexMigration(BaseTestCase):
+    """Creación de índices en bases existentes"""
+
+    def test_add_missing_indexes(self):
+        """Los índices que faltan se crean y una segunda pasada no hace nada"""
+        from migrate_db import add_missing_indexes
+
+        db.session.execute(text("DROP INDEX ix_claim_department_created_at"))
+        db.session.commit()
+
+        self.assertEqual(add_missing_indexes(), ["ix_claim_department_created_at"])
+        self.assertEqual(add_missing_indexes(), [])
+
+        names = {index["name"] for index in inspect(db.engine).get_indexes("claim")}
+        self.assertIn("ix_claim_department_created_at", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Tests para la versión de los datos (DataVersion) y la caché de reportes en disco
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from modules.config import db
+from modules.admin_user import AdminRole
+from modules.claim import Claim, ClaimStatus
+from modules.claim_transfer import ClaimTransfer
+from modules.data_version import DataVersion
+from modules.report_cache import ReportCache, report_cache
+from modules.report_generator import HTMLReport
+from modules.report_job import ReportJob
+from tests.conftest import BaseTestCase
+
+
+class ReportCacheTestCase(BaseTestCase):
+    """Usuario, jefe de departamento y un reclamo, con la caché habilitada"""
+
+    def setUp(self):
+        super().setUp()
+        self.app.config["REPORT_CACHE_MAX_BYTES"] = 1024 * 1024
+        self.app.config["REPORT_WORKERS"] = 0
+
+        self._create_sample_users(
+            self.sample_departments["dept1_id"],
+            AdminRole.DEPARTMENT_HEAD,
+            admin_username="jefe",
+        )
+        claim, _ = Claim.create(
+            user_id=self.creator_id,
+            detail="Reclamo para la caché de reportes",
+            department_id=self.sample_departments["dept1_id"],
+        )
+        self.claim_id = claim.id
+
+
+class TestDataVersion(ReportCacheTestCase):
+    """Las escrituras de reclamos incrementan la versión"""
+
+    def test_claim_writes_bump_version(self):
+        writes = [
+            lambda: Claim.create(
+                user_id=self.creator_id,
+                detail="Otro reclamo",
+                department_id=self.sample_departments["dept1_id"],
+            ),
+            lambda: Claim.update_status(
+                self.claim_id, ClaimStatus.IN_PROGRESS, self.admin_id
+            ),
+            lambda: Claim.add_supporter(self.claim_id, self.supporter_id),
+            lambda: Claim.remove_supporter(self.claim_id, self.supporter_id),
+            lambda: ClaimTransfer.transfer(
+                self.claim_id, self.sample_departments["dept2_id"], self.admin_id
+            ),
+        ]
+        for write in writes:
+            before = DataVersion.get()
+            write()
+            self.assertEqual(DataVersion.get(), before + 1)
+
+    def test_rejected_write_keeps_version(self):
+        """Una operación rechazada no invalida los reportes"""
+        before = DataVersion.get()
+
+        Claim.update_status(self.claim_id, ClaimStatus.PENDING, self.admin_id)
+        Claim.add_supporter(self.claim_id, self.creator_id)
+
+        self.assertEqual(DataVersion.get(), before)
+
+
+class TestReportCache(ReportCacheTestCase):
+    """Reportes guardados por formato, alcance y versión de los datos"""
+
+    def test_key_depends_on_scope_and_version(self):
+        key = ReportCache.make_key("pdf", [2, 1], False, 7)
+
+        self.assertEqual(key, ReportCache.make_key("pdf", [1, 2], False, 7))
+        self.assertTrue(key.endswith(".pdf"))
+        self.assertNotEqual(key, ReportCache.make_key("pdf", [1, 2], False, 8))
+        self.assertNotEqual(key, ReportCache.make_key("pdf", [1, 2], True, 7))
+        self.assertNotEqual(key, ReportCache.make_key("html", [1, 2], False, 7))
+
+    def test_put_and_open(self):
+        report_cache.put("a.html", "<p>reporte</p>")
+
+        with report_cache.open("a.html") as file:
+            self.assertEqual(file.read(), b"<p>reporte</p>")
+        self.assertIsNone(report_cache.open("b.html"))
+
+    def test_evicts_least_recently_used(self):
+        """Al superar el límite se borran los reportes usados hace más tiempo"""
+        self.app.config["REPORT_CACHE_MAX_BYTES"] = 250
+        directory = self.app.config["REPORT_CACHE_DIR"]
+        report_cache.put("a.pdf", b"a" * 100)
+        report_cache.put("b.pdf", b"b" * 100)
+        os.utime(os.path.join(directory, "a.pdf"), (1000, 1000))
+        os.utime(os.path.join(directory, "b.pdf"), (2000, 2000))
+
+        report_cache.open("a.pdf").close()  # "a" pasa a ser el más reciente
+        report_cache.put("c.pdf", b"c" * 100)
+
+        self.assertIsNone(report_cache.open("b.pdf"))
+        self.assertIsNotNone(report_cache.open("a.pdf"))
+        self.assertIsNotNone(report_cache.open("c.pdf"))
+        self.assertLessEqual(report_cache.size(), 250)
+
+    def test_interrupted_stream_is_not_stored(self):
+        """Solo se guarda un reporte transmitido completo"""
+        chunks = report_cache.store_stream("a.html", iter(["<html>", "</html>"]))
+        next(chunks)
+        chunks.close()
+
+        self.assertIsNone(report_cache.open("a.html"))
+        self.assertEqual(os.listdir(self.app.config["REPORT_CACHE_DIR"]), [])
+
+        self.assertEqual(
+            "".join(report_cache.store_stream("a.html", ["<html>", "</html>"])),
+            "<html></html>",
+        )
+        with report_cache.open("a.html") as file:
+            self.assertEqual(file.read(), b"<html></html>")
+
+    def test_disabled_cache(self):
+        self.app.config["REPORT_CACHE_MAX_BYTES"] = 0
+
+        report_cache.put("a.html", "<p>reporte</p>")
+
+        self.assertIsNone(report_cache.open("a.html"))
+
+    def test_repeat_download_is_served_from_cache(self):
+        """Sin cambios en los reclamos, la segunda descarga no genera el reporte"""
+        self.client.post(
+            "/admin/login", data={"username": "jefe", "password": "admin123"}
+        )
+        stream = HTMLReport.stream
+
+        with patch.object(
+            HTMLReport, "stream", autospec=True, side_effect=stream
+        ) as mock_stream:
+            first = self.client.get("/admin/reports/download?format=html")
+            first_body = first.get_data()
+            first.close()
+            second = self.client.get("/admin/reports/download?format=html")
+            second_body = second.get_data()
+            second.close()
+
+            self.assertEqual(mock_stream.call_count, 1)
+            self.assertEqual(second_body, first_body)
+            self.assertIn("attachment", second.headers["Content-Disposition"])
+
+            Claim.create(
+                user_id=self.creator_id,
+                detail="Reclamo nuevo después del reporte",
+                department_id=self.sample_departments["dept1_id"],
+            )
+            third = self.client.get("/admin/reports/download?format=html")
+            self.assertIn(b"Reclamo nuevo", third.get_data())
+            third.close()
+            self.assertEqual(mock_stream.call_count, 2)
+
+    def test_report_job_reuses_cached_report(self):
+        """Un pedido con los mismos datos copia el reporte guardado"""
+        department_ids = [self.sample_departments["dept1_id"]]
+        first, _ = ReportJob.enqueue("html", department_ids, False, self.admin_id)
+        ReportJob.run(first.id, self.app.config["REPORT_JOBS_DIR"])
+
+        second, _ = ReportJob.enqueue("html", department_ids, False, self.admin_id)
+        with patch.object(HTMLReport, "stream") as mock_stream:
+            ReportJob.run(second.id, self.app.config["REPORT_JOBS_DIR"])
+
+        mock_stream.assert_not_called()
+        db.session.refresh(second)
+        with open(first.file_path, "rb") as a, open(second.file_path, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,9 @@ Tests para ReportGenerator - Fase 12
 """
 
 import unittest
+from datetime import datetime
+from unittest.mock import patch
+
 from tests.conftest import BaseTestCase
 
 from modules.config import db
@@ -10,6 +13,7 @@ from modules.claim import Claim, ClaimStatus
 from modules.department import Department
 from modules.end_user import Cloister, EndUser
 from modules.analytics_generator import AnalyticsGenerator
+from modules.report_generator import HTMLReport, PDFReport
 
 
 class TestReportGenerator(BaseTestCase):
@@ -156,6 +160,175 @@ class TestReportGenerator(BaseTestCase):
         self.assertEqual(stats["total_claims"], 6)
         self.assertEqual(stats["status_counts"]["Inválido"], 1)
 
+    # ============================================================
+    # Tests para HTMLReport.stream (reporte transmitido de a bloques)
+    # ============================================================
+
+    def test_iter_report_rows_projection(self):
+        """Las filas del reporte traen solo las columnas de la tabla"""
+        long_claim, _ = Claim.create(
+            user_id=self.user_id,
+            detail="x" * 300,
+            department_id=self.dept1_id,
+        )
+
+        rows = list(Claim.iter_report_rows([self.dept1_id], batch_size=2))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0].id, long_claim.id)
+        # Un carácter más que el recorte de la plantilla, para saber si agregar "..."
+        self.assertEqual(len(rows[0].detail), 101)
+        self.assertEqual(list(Claim.iter_report_rows([])), [])
+
+    def test_stream_matches_generate(self):
+        """El reporte transmitido es igual al generado de una vez"""
+        report = HTMLReport([self.dept1_id, self.dept2_id], True)
+
+        with patch("modules.report_generator.datetime") as mock_datetime:
+            mock_datetime.now.return_value = datetime(2024, 5, 1, 10, 30)
+            with self.app.test_request_context():
+                generated = report.generate()
+                streamed = "".join(report.stream())
+
+        self.assertEqual(streamed, generated)
+        self.assertIn("Reclamo Pendiente en humanidades", streamed)
+
+    def test_stream_sends_header_before_reading_claims(self):
+        """El primer bloque sale antes de recorrer todos los reclamos"""
+        rows_read = []
+        iter_report_rows = Claim.iter_report_rows
+
+        def tracked_rows(department_ids):
+            for row in iter_report_rows(department_ids):
+                rows_read.append(row.id)
+                yield row
+
+        report = HTMLReport([self.dept1_id], False)
+        with patch.object(Claim, "iter_report_rows", side_effect=tracked_rows):
+            with self.app.test_request_context():
+                chunks = report.stream()
+                first = next(chunks)
+                self.assertIn("<html", first)
+                self.assertLess(len(rows_read), 4)
+                rest = "".join(chunks)
+
+        self.assertEqual(len(rows_read), 4)
+        self.assertIn("</html>", rest)
+
+    def test_download_route_streams_html(self):
+        """La descarga HTML se envía como respuesta transmitida"""
+        from modules.admin_user import AdminRole, AdminUser
+
+        AdminUser.create(
+            first_name="Jefe",
+            last_name="Ciencias",
+            email="jefe@test.com",
+            username="jefe",
+            admin_role=AdminRole.DEPARTMENT_HEAD,
+            password="admin123",
+            department_id=self.dept1_id,
+        )
+        self.client.post(
+            "/admin/login", data={"username": "jefe", "password": "admin123"}
+        )
+
+        response = self.client.get("/admin/reports/download?format=html")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertIn(".html", response.headers["Content-Disposition"])
+        self.assertIn("Reclamo Resuelto satisfactoriamente", response.get_data(True))
+        self.assertNotIn("humanidades", response.get_data(True))
+        response.close()
+
+    # ============================================================
+    # Tests para PDFReport (partes convertidas por separado y unidas)
+    # ============================================================
+
+    def _pdf_text(self, pdf_bytes: bytes) -> list[str]:
+        from io import BytesIO
+
+        from pypdf import PdfReader
+
+        # Normalizar espacios: las celdas largas se parten en varias líneas
+        return [
+            " ".join(page.extract_text().split())
+            for page in PdfReader(BytesIO(pdf_bytes)).pages
+        ]
+
+    def test_pdf_parts_split_summary_and_footer(self):
+        """Solo la primera parte tiene el resumen y solo la última el pie"""
+        report = PDFReport([self.dept1_id, self.dept2_id], True)
+
+        parts = list(report._render_parts(report._get_part_context(), chunk_size=4))
+
+        self.assertEqual(len(parts), 2)
+        self.assertIn("Resumen Estadístico", parts[0])
+        self.assertNotIn("Resumen Estadístico", parts[1])
+        self.assertNotIn("generado automáticamente", parts[0])
+        self.assertIn("generado automáticamente", parts[1])
+        self.assertEqual(sum(part.count("<tr>") for part in parts), 6 + 2 + 1)
+
+    def test_pdf_merges_parts_with_page_numbers(self):
+        """Las partes se unen en orden y todas las páginas quedan numeradas"""
+        self.app.config["PDF_CHUNK_SIZE"] = 2
+        self.app.config["PDF_RENDER_WORKERS"] = 1
+
+        pdf_bytes = PDFReport([self.dept1_id, self.dept2_id], True).generate()
+
+        self.assertIsNotNone(pdf_bytes)
+        pages = self._pdf_text(pdf_bytes)
+        self.assertGreaterEqual(len(pages), 3)
+        for number, text in enumerate(pages, start=1):
+            self.assertIn(f"Página {number} de {len(pages)}", text)
+        text = "".join(pages)
+        self.assertEqual(text.count("Resumen Estadístico"), 1)
+        self.assertIn("Reclamo Pendiente en humanidades", text)
+        self.assertIn("Reporte de Reclamos - Vista Global", pages[-1])
+
+    def test_pdf_parts_in_process_pool(self):
+        """Con varios workers las partes se convierten en otros procesos"""
+        self.app.config["PDF_CHUNK_SIZE"] = 3
+        self.app.config["PDF_RENDER_WORKERS"] = 2
+
+        pdf_bytes = PDFReport([self.dept1_id], False).generate()
+
+        self.assertIsNotNone(pdf_bytes)
+        text = "".join(self._pdf_text(pdf_bytes))
+        self.assertIn("Reclamo Resuelto satisfactoriamente", text)
+        self.assertIn("Segundo reclamo Pendiente en ciencias", text)
+
+    def test_pdf_pool_is_shared_between_reports(self):
+        """Los reportes siguientes reutilizan los procesos del primero"""
+        from modules.pdf_renderer import pdf_renderer
+
+        self.app.config["PDF_CHUNK_SIZE"] = 3
+        self.app.config["PDF_RENDER_WORKERS"] = 2
+
+        self.assertIsNotNone(PDFReport([self.dept1_id], False).generate())
+        executor = pdf_renderer._executor
+        self.assertIsNotNone(PDFReport([self.dept1_id], False).generate())
+
+        self.assertIsNotNone(executor)
+        self.assertIs(pdf_renderer._executor, executor)
+
+    def test_pdf_pool_function_does_not_import_app(self):
+        """Los procesos del pool importan html_to_pdf sin crear la app"""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys\n"
+            "from rendering.pdf import html_to_pdf\n"
+            "assert html_to_pdf('<p>hola</p>').startswith(b'%PDF')\n"
+            "print('modules.config' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "False")
+
 
 if __name__ == "__main__":
     unittest.main()
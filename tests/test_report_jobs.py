@@ -0,0 +1,309 @@
+"""
+Tests para los pedidos de reportes en segundo plano (ReportJob y ReportJobRunner)
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime as Datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import update
+
+from modules.config import db
+from modules.admin_user import AdminRole, AdminUser
+from modules.claim import Claim
+from modules.department import Department
+from modules.end_user import Cloister, EndUser
+from modules.report_generator import HTMLReport
+from modules.report_job import ReportJob, ReportJobStatus
+from modules.report_runner import ReportJobRunner
+from tests.conftest import BaseTestCase
+
+
+class TestReportJobs(BaseTestCase):
+    """Pedidos de reportes: deduplicación, generación y descarga"""
+
+    def setUp(self):
+        super().setUp()
+        self.app.config["REPORT_WORKERS"] = 0
+        self.jobs_dir = self.app.config["REPORT_JOBS_DIR"]
+
+        user = EndUser(
+            first_name="Report",
+            last_name="User",
+            email="report@test.com",
+            username="reportuser",
+            cloister=Cloister.STUDENT,
+        )
+        user.set_password("test123")
+        db.session.add(user)
+        db.session.commit()
+        Claim.create(
+            user_id=user.id,
+            detail="Reclamo para el reporte de ciencias",
+            department_id=self.sample_departments["dept1_id"],
+        )
+
+        self.head, _ = AdminUser.create(
+            first_name="Jefe",
+            last_name="Ciencias",
+            email="jefe@test.com",
+            username="jefe",
+            admin_role=AdminRole.DEPARTMENT_HEAD,
+            password="admin123",
+            department_id=self.sample_departments["dept1_id"],
+        )
+        self.other_head, _ = AdminUser.create(
+            first_name="Jefe",
+            last_name="Humanidades",
+            email="jefe2@test.com",
+            username="jefe2",
+            admin_role=AdminRole.DEPARTMENT_HEAD,
+            password="admin123",
+            department_id=self.sample_departments["dept2_id"],
+        )
+        self.head_department_ids = [self.sample_departments["dept1_id"]]
+
+    def _login(self, username: str):
+        self.client.post(
+            "/admin/login", data={"username": username, "password": "admin123"}
+        )
+
+    def _enqueue(self, report_format: str = "html") -> ReportJob:
+        job, error = ReportJob.enqueue(
+            report_format, self.head_department_ids, False, self.head.id
+        )
+        self.assertIsNone(error)
+        return job
+
+    def test_identical_pending_requests_share_job(self):
+        """Un pedido idéntico a uno en curso se une a él"""
+        first = self._enqueue()
+        second = self._enqueue()
+        pdf = self._enqueue("pdf")
+
+        self.assertEqual(first.id, second.id)
+        self.assertNotEqual(first.id, pdf.id)
+        self.assertEqual(db.session.query(ReportJob).count(), 2)
+
+    def test_finished_job_is_not_reused(self):
+        """Una vez generado, un nuevo pedido crea otro trabajo (datos nuevos)"""
+        first = self._enqueue()
+        ReportJob.run(first.id, self.jobs_dir)
+
+        second = self._enqueue()
+
+        self.assertNotEqual(first.id, second.id)
+
+    def test_invalid_format(self):
+        job, error = ReportJob.enqueue("docx", self.head_department_ids, False, 1)
+
+        self.assertIsNone(job)
+        self.assertIn("Formato", error)
+
+    def test_run_writes_report_file(self):
+        """El worker genera el archivo y marca el pedido como listo"""
+        job = self._enqueue()
+
+        self.assertTrue(ReportJob.run(job.id, self.jobs_dir))
+
+        db.session.refresh(job)
+        self.assertEqual(job.status, ReportJobStatus.DONE)
+        self.assertIsNotNone(job.finished_at)
+        self.assertTrue(job.file_path.startswith(self.jobs_dir))
+        with open(job.file_path, encoding="utf-8") as file:
+            self.assertIn("Reclamo para el reporte de ciencias", file.read())
+
+    def test_job_is_claimed_once(self):
+        """Un pedido ya tomado no se vuelve a generar"""
+        job = self._enqueue()
+
+        self.assertTrue(ReportJob.claim(job.id, stale_after=600))
+        self.assertFalse(ReportJob.claim(job.id, stale_after=600))
+        self.assertFalse(ReportJob.run(job.id, self.jobs_dir))
+
+    def test_stale_running_job_is_retried(self):
+        """Un pedido en curso abandonado (worker caído) se puede volver a tomar"""
+        job = self._enqueue()
+        ReportJob.claim(job.id, stale_after=600)
+        job.started_at = Datetime.now() - timedelta(minutes=20)
+        db.session.commit()
+
+        self.assertTrue(ReportJob.run(job.id, self.jobs_dir, stale_after=600))
+        db.session.refresh(job)
+        self.assertEqual(job.status, ReportJobStatus.DONE)
+
+    def test_retaken_job_discards_previous_attempt(self):
+        """Si otro worker retomó el pedido, el intento anterior no lo pisa"""
+        job = self._enqueue()
+        stream = HTMLReport.stream
+
+        def retaken_while_writing(report):
+            # Otro worker toma el pedido abandonado mientras este escribe
+            db.session.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job.id)
+                .values(started_at=Datetime.now() + timedelta(seconds=1))
+            )
+            db.session.commit()
+            yield from stream(report)
+
+        with patch.object(
+            HTMLReport, "stream", autospec=True, side_effect=retaken_while_writing
+        ):
+            self.assertFalse(ReportJob.run(job.id, self.jobs_dir))
+
+        db.session.refresh(job)
+        self.assertEqual(job.status, ReportJobStatus.RUNNING)
+        self.assertIsNone(job.file_path)
+        self.assertEqual(os.listdir(self.jobs_dir), [])
+
+    def test_failed_generation(self):
+        """Si el reporte no se puede generar el pedido queda con error"""
+        job = self._enqueue("pdf")
+
+        with patch("modules.report_generator.PDFReport.generate", return_value=None):
+            ReportJob.run(job.id, self.jobs_dir)
+
+        db.session.refresh(job)
+        self.assertEqual(job.status, ReportJobStatus.FAILED)
+        self.assertIn("No se pudo generar", job.error)
+        self.assertIsNone(job.file_path)
+
+    def test_expired_jobs_are_purged_with_their_files(self):
+        """Los pedidos terminados hace más que la retención se borran"""
+        old = self._enqueue()
+        ReportJob.run(old.id, self.jobs_dir)
+        db.session.refresh(old)
+        old.finished_at = Datetime.now() - timedelta(days=2)
+        db.session.commit()
+        old_path = old.file_path
+        recent = self._enqueue()
+        ReportJob.run(recent.id, self.jobs_dir)
+
+        self.assertEqual(ReportJob.purge_expired(max_age=24 * 3600), 1)
+
+        self.assertFalse(os.path.exists(old_path))
+        self.assertIsNone(db.session.get(ReportJob, old.id))
+        db.session.refresh(recent)
+        self.assertTrue(os.path.exists(recent.file_path))
+
+    def test_pending_jobs_are_resumed_on_start(self):
+        """Los pedidos que quedaron pendientes se generan al iniciar"""
+        job = self._enqueue()
+
+        ReportJobRunner().init_app(self.app)
+
+        db.session.refresh(job)
+        self.assertEqual(job.status, ReportJobStatus.DONE)
+        self.assertEqual(ReportJob.get_resumable_ids(stale_after=600), [])
+
+    def test_stale_running_jobs_are_resumed_on_start(self):
+        """Un pedido que quedó en curso más que el timeout se retoma al iniciar"""
+        stale = self._enqueue()
+        ReportJob.claim(stale.id, stale_after=600)
+        stale.started_at = Datetime.now() - timedelta(minutes=20)
+        running = self._enqueue("pdf")
+        ReportJob.claim(running.id, stale_after=600)
+        db.session.commit()
+
+        self.assertEqual(ReportJob.get_resumable_ids(stale_after=600), [stale.id])
+        ReportJobRunner().init_app(self.app)
+
+        db.session.refresh(stale)
+        db.session.refresh(running)
+        self.assertEqual(stale.status, ReportJobStatus.DONE)
+        self.assertEqual(running.status, ReportJobStatus.RUNNING)
+
+    def test_routes_enqueue_status_and_download(self):
+        """Pedir, consultar el estado y descargar el reporte"""
+        self._login("jefe")
+
+        response = self.client.post("/admin/reports/jobs", data={"format": "html"})
+        self.assertEqual(response.status_code, 302)
+        job = db.session.query(ReportJob).one()
+
+        status = self.client.get(f"/admin/reports/jobs/{job.id}").get_json()
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(
+            status["download_url"], f"/admin/reports/jobs/{job.id}/download"
+        )
+
+        download = self.client.get(status["download_url"])
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(download.mimetype, "text/html")
+        self.assertIn("attachment", download.headers["Content-Disposition"])
+        self.assertIn(b"Reclamo para el reporte de ciencias", download.data)
+        download.close()
+
+        page = self.client.get("/admin/reports")
+        self.assertIn(b"Reportes Solicitados", page.data)
+
+    def test_other_scope_cannot_see_job(self):
+        """Un jefe de otro departamento no ve el pedido"""
+        job = self._enqueue()
+        ReportJob.run(job.id, self.jobs_dir)
+        self._login("jefe2")
+
+        self.assertEqual(
+            self.client.get(f"/admin/reports/jobs/{job.id}").status_code, 404
+        )
+        response = self.client.get(f"/admin/reports/jobs/{job.id}/download")
+        self.assertEqual(response.status_code, 302)
+
+
+class TestReportJobRunner(unittest.TestCase):
+    """El pool genera los pedidos fuera de la petición"""
+
+    def setUp(self):
+        from modules.config import create_app
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///"
+                + os.path.join(self.temp_dir.name, "test.db"),
+                "SIMILARITY_INDEX_PATH": None,
+                "REPORT_JOBS_DIR": os.path.join(self.temp_dir.name, "reports"),
+                "REPORT_WORKERS": 2,
+                "REPORT_CACHE_MAX_BYTES": 0,
+            }
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        department = Department(name="ciencias", display_name="Ciencias")
+        db.session.add(department)
+        db.session.commit()
+        self.department_id = department.id
+        self.runner = ReportJobRunner()
+
+    def tearDown(self):
+        self.runner.shutdown()
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        self.temp_dir.cleanup()
+
+    def test_runner_generates_in_background(self):
+        job, _ = ReportJob.enqueue("html", [self.department_id], False, 1)
+
+        self.runner.submit(job.id)
+        self.runner.submit(job.id)  # ya en curso: no se encola de nuevo
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and self.runner.is_running(job.id):
+            time.sleep(0.05)
+
+        db.session.expire_all()
+        job = db.session.get(ReportJob, job.id)
+        self.assertEqual(job.status, ReportJobStatus.DONE)
+        self.assertTrue(os.path.exists(job.file_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,14 +2,22 @@
 Tests para el servicio de detección de reclamos similares.
 """
 
+import os
+import tempfile
 import unittest
 from tests.conftest import BaseTestCase
 
 from modules.config import db
+from modules.admin_user import AdminRole, AdminUser
 from modules.claim import Claim, ClaimStatus
+from modules.claim_transfer import ClaimTransfer
 from modules.department import Department
 from modules.end_user import Cloister, EndUser
-from modules.similarity import similarity_finder
+from modules.similarity import (
+    RandomProjectionBackend,
+    SimilarityIndex,
+    similarity_finder,
+)
 
 
 class TestFindSimilarClaims(BaseTestCase):
@@ -302,5 +310,198 @@ class TestSimilarityScoring(BaseTestCase):
             self.assertGreaterEqual(first_score, last_score)
 
 
+class TestSimilarityIndex(BaseTestCase):
+    """Tests para el índice incremental de similitud"""
+
+    def setUp(self):
+        """Configura el entorno de prueba"""
+        super().setUp()
+        user = EndUser(
+            username="indexuser",
+            email="index@example.com",
+            first_name="Index",
+            last_name="User",
+            cloister=Cloister.STUDENT,
+        )
+        user.set_password("test123")
+        admin = AdminUser(
+            first_name="Admin",
+            last_name="Index",
+            email="admin.index@example.com",
+            username="adminindex",
+            admin_role=AdminRole.TECHNICAL_SECRETARY,
+            department_id=self.sample_departments["st_id"],
+        )
+        admin.set_password("admin123")
+        db.session.add_all([user, admin])
+        db.session.commit()
+        self.user_id = user.id
+        self.admin_id = admin.id
+
+        self.dept1_id = self.sample_departments["dept1_id"]
+        self.dept2_id = self.sample_departments["dept2_id"]
+        self.base_claim, _ = Claim.create(
+            user_id=self.user_id,
+            detail="La impresora de la biblioteca no imprime",
+            department_id=self.dept1_id,
+        )
+        # Construir el índice antes de los cambios incrementales
+        similarity_finder.find_similar_claims(text="impresora")
+
+    def _find_ids(self, text, department_id=None):
+        similar = similarity_finder.find_similar_claims(
+            text=text, department_id=department_id, threshold=0.1, limit=10
+        )
+        return [claim.id for claim, _ in similar]
+
+    def test_created_claim_is_indexed_incrementally(self):
+        """Un reclamo creado se agrega al índice sin reconstruirlo"""
+        index = similarity_finder._get_index()
+        claim, _ = Claim.create(
+            user_id=self.user_id,
+            detail="La impresora del aula no imprime nada",
+            department_id=self.dept1_id,
+        )
+
+        self.assertIn(claim.id, self._find_ids("La impresora no imprime"))
+        self.assertIs(similarity_finder._get_index(), index)
+
+    def test_status_change_removes_claim_from_index(self):
+        """Un reclamo que deja de estar pendiente ya no se sugiere"""
+        Claim.update_status(self.base_claim.id, ClaimStatus.RESOLVED, self.admin_id)
+
+        self.assertNotIn(self.base_claim.id, self._find_ids("La impresora no imprime"))
+
+    def test_transfer_moves_claim_between_departments(self):
+        """Una derivación actualiza el departamento indexado"""
+        ClaimTransfer.transfer(self.base_claim.id, self.dept2_id, self.admin_id)
+
+        self.assertNotIn(
+            self.base_claim.id,
+            self._find_ids("La impresora no imprime", department_id=self.dept1_id),
+        )
+        self.assertIn(
+            self.base_claim.id,
+            self._find_ids("La impresora no imprime", department_id=self.dept2_id),
+        )
+
+    def test_transfer_moves_vector_without_rebuild(self):
+        """La derivación traslada el vector al shard destino sin reconstruir"""
+        index = similarity_finder._get_index()
+        vocabulary = index.vectorizer.vocabulary_
+
+        ClaimTransfer.transfer(self.base_claim.id, self.dept2_id, self.admin_id)
+
+        self.assertIs(similarity_finder._get_index(), index)
+        self.assertIs(index.vectorizer.vocabulary_, vocabulary)
+        self.assertNotIn(self.base_claim.id, index.shards[self.dept1_id])
+        self.assertIn(self.base_claim.id, index.shards[self.dept2_id])
+
+    def test_unfiltered_query_merges_all_shards(self):
+        """Sin filtro se combinan los mejores resultados de cada departamento"""
+        other, _ = Claim.create(
+            user_id=self.user_id,
+            detail="La impresora de la biblioteca no imprime nada",
+            department_id=self.dept2_id,
+        )
+        similar = similarity_finder.find_similar_claims(
+            text="La impresora de la biblioteca no imprime", threshold=0.1, limit=2
+        )
+
+        self.assertEqual(
+            {claim.id for claim, _ in similar}, {self.base_claim.id, other.id}
+        )
+        self.assertGreaterEqual(similar[0][1], similar[1][1])
+        index = similarity_finder._get_index()
+        self.assertEqual(set(index.shards), {self.dept1_id, self.dept2_id})
+
+    def test_external_changes_are_synchronized(self):
+        """Los cambios hechos sin pasar por los hooks se detectan por huella"""
+        self.app.config["SIMILARITY_SYNC_INTERVAL"] = 0
+        claim = Claim(
+            detail="La impresora del laboratorio no imprime",
+            department_id=self.dept2_id,
+            creator_id=self.user_id,
+        )
+        db.session.add(claim)
+        db.session.commit()
+
+        self.assertIn(claim.id, self._find_ids("La impresora no imprime"))
+
+    def test_index_persists_to_disk(self):
+        """El índice guardado puede volver a cargarse"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "similarity_index.joblib")
+            self.app.config["SIMILARITY_INDEX_PATH"] = path
+            similarity_finder.rebuild(save=True)
+
+            loaded = SimilarityIndex.load(path)
+
+        self.assertIsNotNone(loaded)
+        self.assertIn(self.base_claim.id, loaded)
+
+    def test_lsh_backend_keeps_threshold_and_limit_semantics(self):
+        """El backend aproximado solo devuelve resultados que también da el exacto"""
+        for i in range(20):
+            Claim.create(
+                user_id=self.user_id,
+                detail=f"La impresora {i} del aula no imprime",
+                department_id=self.dept1_id,
+            )
+        text = "La impresora de la biblioteca no imprime"
+        exact = similarity_finder.find_similar_claims(text=text, threshold=0.3, limit=5)
+
+        self.app.config["SIMILARITY_BACKEND"] = "lsh"
+        index = similarity_finder.rebuild()
+        approximate = similarity_finder.find_similar_claims(
+            text=text, threshold=0.3, limit=5
+        )
+
+        self.assertIsInstance(index.backend, RandomProjectionBackend)
+        self.assertLessEqual(len(approximate), 5)
+        self.assertTrue(all(score > 0.3 for _, score in approximate))
+        # El texto idéntico siempre colisiona y tiene la máxima similitud
+        self.assertEqual(approximate[0][0].id, self.base_claim.id)
+        self.assertEqual(approximate[0][0].id, exact[0][0].id)
+        self.assertAlmostEqual(approximate[0][1], exact[0][1])
+
+    def _use_lsh_backend(self):
+        """Reconstruye el índice con el backend aproximado"""
+        self.app.config["SIMILARITY_BACKEND"] = "lsh"
+        index = similarity_finder.rebuild()
+        self.assertEqual(set(index.shards), {self.dept1_id})
+        return index
+
+    def test_lsh_backend_indexes_claim_in_new_department(self):
+        """Un departamento sin shard al construir el índice recibe altas"""
+        index = self._use_lsh_backend()
+        claim, _ = Claim.create(
+            user_id=self.user_id,
+            detail="La impresora de la biblioteca no imprime",
+            department_id=self.dept2_id,
+        )
+
+        self.assertIs(similarity_finder._get_index(), index)
+        self.assertIn(
+            claim.id,
+            self._find_ids("La impresora no imprime", department_id=self.dept2_id),
+        )
+
+    def test_lsh_backend_transfer_into_empty_department(self):
+        """Derivar a un departamento sin shard traslada el vector"""
+        index = self._use_lsh_backend()
+        ClaimTransfer.transfer(self.base_claim.id, self.dept2_id, self.admin_id)
+
+        self.assertIs(similarity_finder._get_index(), index)
+        self.assertIn(
+            self.base_claim.id,
+            self._find_ids("La impresora no imprime", department_id=self.dept2_id),
+        )
+        self.assertNotIn(
+            self.base_claim.id,
+            self._find_ids("La impresora no imprime", department_id=self.dept1_id),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests para las utilidades de normalización de texto.
+"""
+
+import unittest
+
+from modules.utils.text import _normalize_exact, normalize_text, normalize_texts
+
+
+class TestNormalizeText(unittest.TestCase):
+    """Tests para normalize_text"""
+
+    def test_removes_spanish_accents_and_lowercases(self):
+        """Test que quita tildes, diéresis y eñes"""
+        self.assertEqual(
+            normalize_text("El AÑO pasó: pingüino, acción"),
+            "el ano paso: pinguino, accion",
+        )
+
+    def test_matches_reference_implementation(self):
+        """Test que coincide con NFD + descarte de marcas en casos poco comunes"""
+        texts = [
+            "Ça va à l'hôpital",
+            "İstanbul ǅemal",
+            "straße, Øre, Łódź",
+            "á ẽ combinados",
+            "Ωμέγα 東京 №5 ﬁn",
+            "",
+        ]
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(normalize_text(text), _normalize_exact(text))
+
+    def test_repeated_texts_use_cache(self):
+        """Test que los textos repetidos se resuelven desde la caché"""
+        normalize_text.cache_clear()
+        normalize_text("La impresora no imprime")
+        normalize_text("La impresora no imprime")
+
+        self.assertEqual(normalize_text.cache_info().hits, 1)
+
+
+class TestNormalizeTexts(unittest.TestCase):
+    """Tests para la normalización por lotes"""
+
+    def test_batch_matches_single_normalization(self):
+        """Test que el lote coincide con normalizar texto por texto"""
+        texts = ["Acción rápida", "straße", "東京 está lejos", "ASCII puro"]
+
+        self.assertEqual(normalize_texts(texts), [normalize_text(t) for t in texts])
+
+    def test_batch_with_separator_character(self):
+        """Test que textos con el carácter separador se normalizan igual"""
+        texts = ["uno\x00dos", "Tres"]
+
+        self.assertEqual(normalize_texts(texts), ["uno\x00dos", "tres"])
+
+    def test_empty_batch(self):
+        """Test que un lote vacío retorna una lista vacía"""
+        self.assertEqual(normalize_texts([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,8 @@ Script para entrenar el modelo de clasificación automática de reclamos.
 Ejecutar: python train_classifier.py
 """
 
+import os
+
 from modules.config import create_app, db
 from modules.classifier import classifier
 from modules.department import Department
@@ -143,7 +145,8 @@ def train_model():
         classifier.train(list(texts), list(labels))
 
         print("\n✅ Modelo entrenado exitosamente")
-        print(f"   Archivos guardados en: models/")
+        print(f"   Archivos guardados en: {os.path.dirname(classifier.model_path)}/")
+        print(f"   Entrenamiento: {classifier.manifest['run_id']}")
 
         # Probar clasificación con ejemplos
         print("\n=== Pruebas de Clasificación ===\n")